@@ -5,6 +5,7 @@ Script automático para resetar a database e gerar dados de teste
 
 import os
 import json
+import shutil
 from datetime import datetime, timedelta
 from models import InventoryManager
 
@@ -26,6 +27,12 @@ def reset_database():
             os.remove(file_path)
             print(f"   ✅ {file_path} removido")
     
+    # Partições mensais e arquivo de movimentações antigas
+    for dir_path in ['data/movements', 'data/archive']:
+        if os.path.isdir(dir_path):
+            shutil.rmtree(dir_path)
+            print(f"   ✅ {dir_path} removido")
+    
     print("✅ Database limpa!")
 
 def generate_sample_data():
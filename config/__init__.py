@@ -12,11 +12,17 @@ ASSETS_DIR = "assets"
 
 # Arquivos de dados
 PRODUCTS_FILE = os.path.join(DATA_DIR, "products.json")
-MOVEMENTS_FILE = os.path.join(DATA_DIR, "movements.json")
+MOVEMENTS_FILE = os.path.join(DATA_DIR, "movements.json")  # formato antigo, convertido em partições
 SUPPLIERS_FILE = os.path.join(DATA_DIR, "suppliers.json")
 CATEGORIES_FILE = os.path.join(DATA_DIR, "categories.json")
 SETTINGS_FILE = os.path.join(DATA_DIR, "settings.json")
 
+# Movimentações: uma partição .json por mês e o manifest.json
+MOVEMENTS_DIR = os.path.join(DATA_DIR, "movements")
+
+# Movimentações arquivadas: um .json.gz por mês e o index.json
+ARCHIVE_DIR = os.path.join(DATA_DIR, "archive")
+
 # Configurações da aplicação
 APP_TITLE = "Sistema de Controle de Estoque Avançado v2.0"
 APP_VERSION = "2.0.0"
@@ -63,4 +69,21 @@ DEFAULT_SETTINGS = {
     "default_category": "",
     "theme_mode": "dark",
     "color_theme": "blue"
+}
+
+# Análise de estoque (curva ABC, giro, cobertura e estoque parado)
+ANALYTICS_CONFIG = {
+    "period_days": 365,  # janela de consumo analisada
+    "class_a_share": 0.80,  # fatia acumulada do valor consumido que forma a classe A
+    "class_b_share": 0.95,  # até aqui, classe B; o restante é C
+    "dead_stock_days": 180  # dias sem saída para considerar o estoque parado
+}
+
+# Reposição (previsão de demanda, ponto de pedido e sugestão de compra)
+REPLENISHMENT_CONFIG = {
+    "history_days": 90,  # dias de saídas usados na previsão
+    "smoothing_alpha": 0.2,  # peso do dia mais recente na suavização exponencial
+    "lead_time_days": 7,  # dias entre o pedido e a chegada
+    "cover_days": 30,  # dias de demanda cobertos por pedido, além do ponto de pedido
+    "safety_factor": 1.65  # desvios-padrão do estoque de segurança (1,65 ≈ 95% de atendimento)
 } 
\ No newline at end of file
@@ -1,3 +1,4 @@
+import heapq
 import json
 import os
 import sys
@@ -23,6 +24,12 @@ except ImportError as e:
     print("Please install dependencies: pip install -r requirements.txt")
     sys.exit(1)
 
+from models.report_engine import ReportEngine, product_value
+from models.rollups import MovementRollups
+from models.archive import MovementArchive
+from models.partitions import MovementPartitions
+from models.columnar import ColumnarStore, numpy_available
+
 # Configure CustomTkinter
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -30,10 +37,12 @@ ctk.set_default_color_theme("blue")
 # Data files
 DATA_DIR = "data"
 PRODUCTS_FILE = os.path.join(DATA_DIR, "products.json")
-MOVEMENTS_FILE = os.path.join(DATA_DIR, "movements.json")
+MOVEMENTS_FILE = os.path.join(DATA_DIR, "movements.json")  # legacy single file, converted to partitions
+MOVEMENTS_DIR = os.path.join(DATA_DIR, "movements")
 SUPPLIERS_FILE = os.path.join(DATA_DIR, "suppliers.json")
 CATEGORIES_FILE = os.path.join(DATA_DIR, "categories.json")
 SETTINGS_FILE = os.path.join(DATA_DIR, "settings.json")
+ARCHIVE_DIR = os.path.join(DATA_DIR, "archive")
 
 class InventoryManager:
     """Main inventory management class"""
@@ -41,10 +50,50 @@ class InventoryManager:
     def __init__(self):
         self.create_data_directory()
         self.products = self.load_data(PRODUCTS_FILE, [])
-        self.movements = self.load_data(MOVEMENTS_FILE, [])
         self.suppliers = self.load_data(SUPPLIERS_FILE, [])
         self.categories = self.load_data(CATEGORIES_FILE, [])
         self.settings = self.load_data(SETTINGS_FILE, self.default_settings())
+        
+        # Movements live in monthly partitions; queries read only the months they cover
+        self.partitions = MovementPartitions(MOVEMENTS_DIR)
+        self.partitions.import_file(MOVEMENTS_FILE, self.products)
+        self.partitions.ensure_openings(self.products)
+        
+        # Movements archived by the modular app live in compressed monthly files
+        self.archive = MovementArchive(ARCHIVE_DIR)
+        
+        # Per-day and per-month movement totals, kept current by add_movement
+        self.load_rollups()
+        
+        # Bumped on every save; report results are cached per version
+        self.data_version = 0
+        self.reports = ReportEngine(self)
+        
+        # Columnar NumPy mirror for vectorized statistics (None without NumPy)
+        self.columnar = ColumnarStore(self) if numpy_available() else None
+    
+    @property
+    def movements(self) -> List[Dict]:
+        """All active movements (reads any partition not loaded yet)"""
+        return self.partitions.all()
+    
+    @movements.setter
+    def movements(self, movements: List[Dict]):
+        """Replace every active movement (backup restore) and rebuild the derived totals"""
+        # Backups are not reconciled into the archive: movements before its cutoff are
+        # already archived (a backup taken before archiving still has them) and stay there
+        if self.archive.cutoff:
+            movements = [m for m in movements if m['date'] >= self.archive.cutoff]
+        self.partitions.replace(movements, self.products)
+        self.load_rollups()
+        self.data_version += 1
+    
+    def load_rollups(self):
+        """Per-day and per-month totals from the partition manifest and archive index, without reading movements"""
+        self.rollups = MovementRollups()
+        for entry in self.partitions.months.values():
+            self.rollups.merge(entry['daily'])
+        self.rollups.merge(self.archive.daily)
     
     def create_data_directory(self):
         """Create data directory if it doesn't exist"""
@@ -79,6 +128,7 @@ class InventoryManager:
     
     def save_data(self, data: any, filename: str) -> bool:
         """Save data to JSON file"""
+        self.data_version += 1
         try:
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=4, ensure_ascii=False)
@@ -111,6 +161,8 @@ class InventoryManager:
         
         product.update(updates)
         product['updated_at'] = datetime.now().isoformat()
+        if self.columnar is not None:
+            self.columnar.update_product(product)
         return self.save_data(self.products, PRODUCTS_FILE)
     
     def delete_product(self, code: str) -> bool:
@@ -134,6 +186,8 @@ class InventoryManager:
         
         product['quantity'] = new_quantity
         product['updated_at'] = datetime.now().isoformat()
+        if self.columnar is not None:
+            self.columnar.update_product(product)
         
         # Record movement
         movement_type = "entrada" if quantity_change > 0 else "saída"
@@ -145,7 +199,7 @@ class InventoryManager:
                     quantity: int, reason: str = "") -> bool:
         """Add stock movement record"""
         movement = {
-            'id': len(self.movements) + 1,
+            'id': self.archive.count + self.partitions.count + 1,
             'date': datetime.now().isoformat(),
             'type': movement_type,
             'product_code': product_code,
@@ -154,8 +208,15 @@ class InventoryManager:
             'user': "admin"  # You can implement user system later
         }
         
-        self.movements.append(movement)
-        return self.save_data(self.movements, MOVEMENTS_FILE)
+        # The price is recorded with the movement so later price changes don't re-value it
+        product = self.get_product(product_code)
+        price = product['price'] if product else 0
+        movement['unit_price'] = price
+        self.rollups.add(movement, price)
+        
+        # Only this month's partition and the manifest are rewritten
+        self.data_version += 1
+        return self.partitions.append(movement, price, self.products)
     
     def get_low_stock_products(self) -> List[Dict]:
         """Get products with low stock"""
@@ -305,11 +366,12 @@ class ModernInventoryApp:
         stats_frame.pack(fill="x", pady=10)
         
         # Calculate statistics
-        total_products = len(self.manager.products)
-        total_value = self.manager.get_total_inventory_value()
-        low_stock_count = len(self.manager.get_low_stock_products())
-        recent_movements = len([m for m in self.manager.movements 
-                              if datetime.fromisoformat(m['date']).date() == datetime.now().date()])
+        report_data = self.manager.reports.get_data()
+        total_products = report_data['total_products']
+        total_value = report_data['total_value']
+        low_stock_count = len(report_data['low_stock'])
+        today = self.manager.rollups.day(datetime.now().date())
+        recent_movements = today['entradas'] + today['saidas']
         
         stats = [
             ("Total de Produtos", total_products, "📦", "#4CAF50"),
@@ -339,9 +401,8 @@ class ModernInventoryApp:
         activities_list = ctk.CTkTextbox(activities_frame, height=300, font=ctk.CTkFont(size=14))
         activities_list.pack(fill="both", expand=True, padx=20, pady=(0, 20))
         
-        # Show recent movements
-        recent_movements = sorted(self.manager.movements, 
-                                key=lambda x: x['date'], reverse=True)[:10]
+        # Show recent movements (only the newest partitions are read)
+        recent_movements = self.manager.partitions.recent(10)
         
         for movement in recent_movements:
             date = datetime.fromisoformat(movement['date'])
@@ -1027,8 +1088,9 @@ class ModernInventoryApp:
             from datetime import datetime, timedelta
             days = int(period)
             cutoff_date = datetime.now() - timedelta(days=days)
+            # Partitions entirely before the period are skipped without being read
             filtered_movements = [
-                m for m in self.manager.movements
+                m for m in self.manager.partitions.between(cutoff_date.date().isoformat())
                 if datetime.fromisoformat(m['date']) >= cutoff_date
             ]
         else:
@@ -1086,59 +1148,73 @@ class ModernInventoryApp:
         try:
             from tkinter import filedialog
             import csv
-            from datetime import datetime
+            import gzip
             
             # Get filtered movements
             period = self.movements_period.get()
             movement_type = self.movements_type.get()
             
+            # Lazy filtering: rows are produced while the file is written
+            movements = iter(self.manager.movements)
+            
             if period != "all":
-                from datetime import timedelta
-                days = int(period)
-                cutoff_date = datetime.now() - timedelta(days=days)
-                movements = [
-                    m for m in self.manager.movements
-                    if datetime.fromisoformat(m['date']) >= cutoff_date
-                ]
-            else:
-                movements = self.manager.movements
+                cutoff_date = (datetime.now() - timedelta(days=int(period))).isoformat()
+                # ISO timestamps compare correctly as strings
+                movements = (m for m in movements if m['date'] >= cutoff_date)
             
             if movement_type != "todos":
-                movements = [m for m in movements if m['type'] == movement_type]
+                movements = (m for m in movements if m['type'] == movement_type)
             
             # Ask for save location
             filename = filedialog.asksaveasfilename(
                 defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+                filetypes=[
+                    ("CSV files", "*.csv"),
+                    ("Compressed CSV files", "*.csv.gz"),
+                    ("All files", "*.*")
+                ],
                 title="Exportar Movimentações"
             )
             
             if filename:
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+                # Product names by code: one dict lookup per row instead of a linear search
+                product_names = {p['code']: p['name'] for p in self.manager.products}
+                
+                rows = (
+                    [
+                        datetime.fromisoformat(movement['date']).strftime('%d/%m/%Y %H:%M:%S'),
+                        movement['type'].title(),
+                        movement['product_code'],
+                        product_names.get(movement['product_code'], "Produto não encontrado"),
+                        movement['quantity'],
+                        movement.get('reason', ''),
+                        movement.get('user', '')
+                    ]
+                    for movement in movements
+                )
+                
+                # A .gz file name writes the CSV through gzip
+                opener = gzip.open if filename.endswith('.gz') else open
+                with opener(filename, 'wt', newline='', encoding='utf-8') as csvfile:
                     writer = csv.writer(csvfile)
                     
                     # Write header
                     writer.writerow(['Data/Hora', 'Tipo', 'Código', 'Produto', 'Quantidade', 'Motivo', 'Usuário'])
                     
-                    # Write data
-                    for movement in movements:
-                        product = self.manager.get_product(movement['product_code'])
-                        product_name = product['name'] if product else "Produto não encontrado"
-                        
-                        date_obj = datetime.fromisoformat(movement['date'])
-                        formatted_date = date_obj.strftime('%d/%m/%Y %H:%M:%S')
-                        
-                        writer.writerow([
-                            formatted_date,
-                            movement['type'].title(),
-                            movement['product_code'],
-                            product_name,
-                            movement['quantity'],
-                            movement.get('reason', ''),
-                            movement.get('user', '')
-                        ])
+                    # Write data, reporting progress on the window title
+                    title = self.root.title()
+                    total = 0
+                    try:
+                        for row in rows:
+                            writer.writerow(row)
+                            total += 1
+                            if total % 1000 == 0:
+                                self.root.title(f"{title} - exportando ({total} linhas)")
+                                self.root.update_idletasks()
+                    finally:
+                        self.root.title(title)
                 
-                messagebox.showinfo("Sucesso", f"Movimentações exportadas para:\n{filename}")
+                messagebox.showinfo("Sucesso", f"{total} movimentações exportadas para:\n{filename}")
         
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao exportar movimentações:\n{str(e)}")
@@ -1678,6 +1754,8 @@ class ModernInventoryApp:
             for product in self.manager.products:
                 if product.get('category') == category_name:
                     product['category'] = ""
+            if self.manager.columnar is not None:
+                self.manager.columnar.reset_products()
             
             # Remove category
             self.manager.categories = [c for c in self.manager.categories if c['name'] != category_name]
@@ -1776,38 +1854,28 @@ class ModernInventoryApp:
         """Generate summary report"""
         self.report_display.delete("1.0", "end")
         
+        # All metrics come from one cached pass over the data
+        stats = self.manager.reports.get_data()
+        
         report = "📊 RESUMO GERAL DO ESTOQUE\n"
         report += "=" * 50 + "\n\n"
         
         # Basic stats
-        total_products = len(self.manager.products)
-        total_items = sum(p['quantity'] for p in self.manager.products)
-        total_value = self.manager.get_total_inventory_value()
-        low_stock_count = len(self.manager.get_low_stock_products())
-        
-        report += f"📦 Total de Produtos: {total_products}\n"
-        report += f"📊 Total de Itens: {total_items:,}\n"
-        report += f"💰 Valor Total: R$ {total_value:,.2f}\n"
-        report += f"⚠️  Produtos com Estoque Baixo: {low_stock_count}\n\n"
+        report += f"📦 Total de Produtos: {stats['total_products']}\n"
+        report += f"📊 Total de Itens: {stats['total_items']:,}\n"
+        report += f"💰 Valor Total: R$ {stats['total_value']:,.2f}\n"
+        report += f"⚠️  Produtos com Estoque Baixo: {len(stats['low_stock'])}\n\n"
         
         # Categories breakdown
-        categories = {}
-        for product in self.manager.products:
-            cat = product.get('category', 'Sem categoria')
-            if cat not in categories:
-                categories[cat] = {'count': 0, 'value': 0}
-            categories[cat]['count'] += 1
-            categories[cat]['value'] += product['price'] * product['quantity']
-        
         report += "📁 PRODUTOS POR CATEGORIA:\n"
         report += "-" * 30 + "\n"
-        for cat, data in categories.items():
-            report += f"{cat}: {data['count']} produto(s) - R$ {data['value']:,.2f}\n"
+        for cat, data in stats['categories'].items():
+            report += f"{cat or 'Sem categoria'}: {data['count']} produto(s) - R$ {data['value']:,.2f}\n"
         
         report += "\n"
         
         # Recent movements
-        recent_movements = sorted(self.manager.movements, key=lambda x: x['date'], reverse=True)[:10]
+        recent_movements = stats['recent_movements'][:10]
         report += "🔄 MOVIMENTAÇÕES RECENTES:\n"
         report += "-" * 30 + "\n"
         for movement in recent_movements:
@@ -1822,8 +1890,9 @@ class ModernInventoryApp:
         """Generate low stock report"""
         self.report_display.delete("1.0", "end")
         
-        low_stock_products = self.manager.get_low_stock_products()
-        threshold = self.manager.settings.get('low_stock_threshold', 5)
+        stats = self.manager.reports.get_data()
+        low_stock_products = stats['low_stock']
+        threshold = stats['threshold']
         
         report = f"⚠️  PRODUTOS COM ESTOQUE BAIXO (≤ {threshold} unidades)\n"
         report += "=" * 60 + "\n\n"
@@ -1833,7 +1902,7 @@ class ModernInventoryApp:
         else:
             report += f"Total de produtos: {len(low_stock_products)}\n\n"
             
-            for product in sorted(low_stock_products, key=lambda x: x['quantity']):
+            for product in low_stock_products:
                 status = "❌ SEM ESTOQUE" if product['quantity'] == 0 else f"⚠️  {product['quantity']} unid."
                 report += f"• {product['name']} ({product['code']})\n"
                 report += f"  Status: {status}\n"
@@ -1847,7 +1916,8 @@ class ModernInventoryApp:
         """Generate inventory value report"""
         self.report_display.delete("1.0", "end")
         
-        total_value = self.manager.get_total_inventory_value()
+        stats = self.manager.reports.get_data()
+        total_value = stats['total_value']
         
         report = "💰 RELATÓRIO DE VALOR DO ESTOQUE\n"
         report += "=" * 50 + "\n\n"
@@ -1855,29 +1925,18 @@ class ModernInventoryApp:
         report += f"Valor Total do Estoque: R$ {total_value:,.2f}\n\n"
         
         # Value by category
-        categories = {}
-        for product in self.manager.products:
-            cat = product.get('category', 'Sem categoria')
-            if cat not in categories:
-                categories[cat] = 0
-            categories[cat] += product['price'] * product['quantity']
-        
         report += "📁 VALOR POR CATEGORIA:\n"
         report += "-" * 30 + "\n"
         
-        sorted_categories = sorted(categories.items(), key=lambda x: x[1], reverse=True)
-        for cat, value in sorted_categories:
-            percentage = (value / total_value * 100) if total_value > 0 else 0
-            report += f"{cat}: R$ {value:,.2f} ({percentage:.1f}%)\n"
+        sorted_categories = sorted(stats['categories'].items(), key=lambda x: x[1]['value'], reverse=True)
+        for cat, data in sorted_categories:
+            percentage = (data['value'] / total_value * 100) if total_value > 0 else 0
+            report += f"{cat or 'Sem categoria'}: R$ {data['value']:,.2f} ({percentage:.1f}%)\n"
         
         report += "\n"
         
         # Top 10 most valuable products
-        products_by_value = sorted(
-            self.manager.products,
-            key=lambda x: x['price'] * x['quantity'],
-            reverse=True
-        )[:10]
+        products_by_value = stats['top_products']
         
         report += "🏆 TOP 10 PRODUTOS MAIS VALIOSOS:\n"
         report += "-" * 40 + "\n"
@@ -1893,39 +1952,33 @@ class ModernInventoryApp:
         """Generate movements report"""
         self.report_display.delete("1.0", "end")
         
-        movements = self.manager.movements
+        stats = self.manager.reports.get_data()
         
         report = "📈 RELATÓRIO DE MOVIMENTAÇÕES\n"
         report += "=" * 50 + "\n\n"
         
-        if not movements:
+        if not stats['total_movements']:
             report += "Nenhuma movimentação registrada.\n"
         else:
-            # Statistics by period
-            today = datetime.now()
-            week_ago = today - timedelta(days=7)
-            month_ago = today - timedelta(days=30)
-            
-            movements_today = [m for m in movements if datetime.fromisoformat(m['date']).date() == today.date()]
-            movements_week = [m for m in movements if datetime.fromisoformat(m['date']) >= week_ago]
-            movements_month = [m for m in movements if datetime.fromisoformat(m['date']) >= month_ago]
+            # Statistics by period, summed from the daily totals
+            today = datetime.now().date()
+            movements_today = self.manager.reports.count_movements_since(today)
+            movements_week = self.manager.reports.count_movements_since(today - timedelta(days=7))
+            movements_month = self.manager.reports.count_movements_since(today - timedelta(days=30))
             
             report += f"📅 MOVIMENTAÇÕES POR PERÍODO:\n"
-            report += f"Hoje: {len(movements_today)}\n"
-            report += f"Últimos 7 dias: {len(movements_week)}\n"
-            report += f"Últimos 30 dias: {len(movements_month)}\n"
-            report += f"Total: {len(movements)}\n\n"
+            report += f"Hoje: {movements_today}\n"
+            report += f"Últimos 7 dias: {movements_week}\n"
+            report += f"Últimos 30 dias: {movements_month}\n"
+            report += f"Total: {stats['total_movements']}\n\n"
             
             # By type
-            entradas = [m for m in movements if m['type'] == 'entrada']
-            saidas = [m for m in movements if m['type'] == 'saida']
-            
             report += f"📊 POR TIPO:\n"
-            report += f"⬆️  Entradas: {len(entradas)}\n"
-            report += f"⬇️  Saídas: {len(saidas)}\n\n"
+            report += f"⬆️  Entradas: {stats['by_type'].get('entrada', 0)}\n"
+            report += f"⬇️  Saídas: {stats['by_type'].get('saida', 0)}\n\n"
             
             # Recent movements
-            recent = sorted(movements, key=lambda x: x['date'], reverse=True)[:15]
+            recent = stats['recent_movements']
             report += f"🔄 MOVIMENTAÇÕES RECENTES:\n"
             report += "-" * 40 + "\n"
             
@@ -1934,8 +1987,8 @@ class ModernInventoryApp:
                 formatted_date = date_obj.strftime('%d/%m/%Y %H:%M')
                 type_icon = "⬆️" if movement['type'] == "entrada" else "⬇️"
                 
-                product = self.manager.get_product(movement['product_code'])
-                product_name = product['name'][:25] if product else "Produto não encontrado"
+                product_name = stats['product_names'].get(movement['product_code'])
+                product_name = product_name[:25] if product_name else "Produto não encontrado"
                 
                 report += f"{type_icon} {formatted_date}\n"
                 report += f"   {product_name} (Qtd: {movement['quantity']})\n"
@@ -1951,34 +2004,20 @@ class ModernInventoryApp:
         report = "📊 RELATÓRIO POR CATEGORIA\n"
         report += "=" * 50 + "\n\n"
         
-        categories_data = {}
-        products_without_category = []
-        
-        for product in self.manager.products:
-            category = product.get('category', '')
-            if not category:
-                products_without_category.append(product)
-            else:
-                if category not in categories_data:
-                    categories_data[category] = {
-                        'products': [],
-                        'total_quantity': 0,
-                        'total_value': 0
-                    }
-                categories_data[category]['products'].append(product)
-                categories_data[category]['total_quantity'] += product['quantity']
-                categories_data[category]['total_value'] += product['price'] * product['quantity']
+        categories_data = dict(self.manager.reports.get_data()['categories'])
+        without_category = categories_data.pop('', None)
+        products_without_category = without_category['products'] if without_category else []
         
         # Categories with products
         if categories_data:
             for category, data in sorted(categories_data.items()):
                 report += f"📁 {category.upper()}\n"
-                report += f"   Produtos: {len(data['products'])}\n"
-                report += f"   Quantidade Total: {data['total_quantity']:,}\n"
-                report += f"   Valor Total: R$ {data['total_value']:,.2f}\n"
+                report += f"   Produtos: {data['count']}\n"
+                report += f"   Quantidade Total: {data['quantity']:,}\n"
+                report += f"   Valor Total: R$ {data['value']:,.2f}\n"
                 
                 # Top products in category
-                top_products = sorted(data['products'], key=lambda x: x['price'] * x['quantity'], reverse=True)[:3]
+                top_products = heapq.nlargest(3, data['products'], key=product_value)
                 report += f"   Top Produtos:\n"
                 for product in top_products:
                     value = product['price'] * product['quantity']
@@ -2004,33 +2043,19 @@ class ModernInventoryApp:
         report = "👥 RELATÓRIO POR FORNECEDOR\n"
         report += "=" * 50 + "\n\n"
         
-        suppliers_data = {}
-        products_without_supplier = []
-        
-        for product in self.manager.products:
-            supplier = product.get('supplier', '')
-            if not supplier:
-                products_without_supplier.append(product)
-            else:
-                if supplier not in suppliers_data:
-                    suppliers_data[supplier] = {
-                        'products': [],
-                        'total_quantity': 0,
-                        'total_value': 0
-                    }
-                suppliers_data[supplier]['products'].append(product)
-                suppliers_data[supplier]['total_quantity'] += product['quantity']
-                suppliers_data[supplier]['total_value'] += product['price'] * product['quantity']
+        suppliers_data = dict(self.manager.reports.get_data()['suppliers'])
+        without_supplier = suppliers_data.pop('', None)
+        products_without_supplier = without_supplier['products'] if without_supplier else []
         
         # Suppliers with products
         if suppliers_data:
-            sorted_suppliers = sorted(suppliers_data.items(), key=lambda x: x[1]['total_value'], reverse=True)
+            sorted_suppliers = sorted(suppliers_data.items(), key=lambda x: x[1]['value'], reverse=True)
             
             for supplier, data in sorted_suppliers:
                 report += f"👥 {supplier.upper()}\n"
-                report += f"   Produtos: {len(data['products'])}\n"
-                report += f"   Quantidade Total: {data['total_quantity']:,}\n"
-                report += f"   Valor Total: R$ {data['total_value']:,.2f}\n"
+                report += f"   Produtos: {data['count']}\n"
+                report += f"   Quantidade Total: {data['quantity']:,}\n"
+                report += f"   Valor Total: R$ {data['value']:,.2f}\n"
                 
                 # List products
                 report += f"   Produtos:\n"
@@ -2061,44 +2086,33 @@ class ModernInventoryApp:
         report = f"📅 RELATÓRIO MENSAL - {now.strftime('%B %Y').upper()}\n"
         report += "=" * 60 + "\n\n"
         
-        # Monthly movements
-        monthly_movements = [
-            m for m in self.manager.movements
-            if datetime.fromisoformat(m['date']) >= month_start
-        ]
-        
-        entradas = [m for m in monthly_movements if m['type'] == 'entrada']
-        saidas = [m for m in monthly_movements if m['type'] == 'saida']
+        # Monthly movements, read from the month and day buckets
+        month_stats = self.manager.rollups.month(now.year, now.month)
+        daily_stats = self.manager.rollups.days(month_start.date())
+        entradas = month_stats['entradas']
+        saidas = month_stats['saidas']
         
         report += f"📊 MOVIMENTAÇÕES DO MÊS:\n"
-        report += f"⬆️  Entradas: {len(entradas)}\n"
-        report += f"⬇️  Saídas: {len(saidas)}\n"
-        report += f"📈 Total: {len(monthly_movements)}\n\n"
-        
-        # Daily breakdown
-        daily_stats = {}
-        for movement in monthly_movements:
-            date = datetime.fromisoformat(movement['date']).date()
-            if date not in daily_stats:
-                daily_stats[date] = {'entradas': 0, 'saidas': 0}
-            daily_stats[date][movement['type'] + 's'] += 1
+        report += f"⬆️  Entradas: {entradas} ({month_stats['quantity_in']:,} itens)\n"
+        report += f"⬇️  Saídas: {saidas} ({month_stats['quantity_out']:,} itens)\n"
+        report += f"📈 Total: {entradas + saidas}\n"
+        report += f"💵 Valor Movimentado: R$ {month_stats['value']:,.2f}\n\n"
         
         if daily_stats:
             report += f"📅 MOVIMENTAÇÕES POR DIA:\n"
             report += "-" * 30 + "\n"
-            for date in sorted(daily_stats.keys(), reverse=True)[:10]:  # Last 10 days
-                stats = daily_stats[date]
-                formatted_date = date.strftime('%d/%m/%Y')
-                report += f"{formatted_date}: ⬆️ {stats['entradas']} ⬇️ {stats['saidas']}\n"
+            for day in sorted(daily_stats.keys(), reverse=True)[:10]:  # Last 10 days
+                day_stats = daily_stats[day]
+                formatted_date = datetime.strptime(day, '%Y-%m-%d').strftime('%d/%m/%Y')
+                report += f"{formatted_date}: ⬆️ {day_stats['entradas']} ⬇️ {day_stats['saidas']}\n"
         
         # Current status
-        total_value = self.manager.get_total_inventory_value()
-        low_stock_count = len(self.manager.get_low_stock_products())
+        stats = self.manager.reports.get_data()
         
         report += f"\n📊 STATUS ATUAL:\n"
-        report += f"💰 Valor Total do Estoque: R$ {total_value:,.2f}\n"
-        report += f"⚠️  Produtos com Estoque Baixo: {low_stock_count}\n"
-        report += f"📦 Total de Produtos: {len(self.manager.products)}\n"
+        report += f"💰 Valor Total do Estoque: R$ {stats['total_value']:,.2f}\n"
+        report += f"⚠️  Produtos com Estoque Baixo: {len(stats['low_stock'])}\n"
+        report += f"📦 Total de Produtos: {stats['total_products']}\n"
         
         self.report_display.insert("1.0", report)
     
@@ -2313,7 +2327,8 @@ class ModernInventoryApp:
         
         restore_desc = ctk.CTkLabel(
             restore_frame,
-            text="Restaure dados de um arquivo de backup anterior",
+            text="Restaure dados de um arquivo de backup anterior\n"
+                 "Movimentações arquivadas não fazem parte dos backups e são mantidas",
             font=ctk.CTkFont(size=14),
             text_color="gray"
         )
@@ -2405,7 +2420,9 @@ class ModernInventoryApp:
                         'type': 'full',
                         'created_at': datetime.now().isoformat(),
                         'version': '1.0',
-                        'description': 'Backup completo do sistema'
+                        'description': 'Backup completo do sistema',
+                        # Only active movements are saved; older ones stay in data/archive
+                        'archive_cutoff': self.manager.archive.cutoff
                     },
                     'products': self.manager.products,
                     'movements': self.manager.movements,
@@ -2445,7 +2462,8 @@ class ModernInventoryApp:
                     'type': 'quick',
                     'created_at': datetime.now().isoformat(),
                     'version': '1.0',
-                    'description': 'Backup rápido (produtos e movimentações)'
+                    'description': 'Backup rápido (produtos e movimentações)',
+                    'archive_cutoff': self.manager.archive.cutoff
                 },
                 'products': self.manager.products,
                 'movements': self.manager.movements
@@ -2502,9 +2520,8 @@ class ModernInventoryApp:
                         self.manager.categories = backup_data['categories']
                         self.manager.settings = backup_data['settings']
                         
-                        # Save all data
+                        # Save all data (movements were written to their partitions on assignment)
                         self.manager.save_data(self.manager.products, PRODUCTS_FILE)
-                        self.manager.save_data(self.manager.movements, MOVEMENTS_FILE)
                         self.manager.save_data(self.manager.suppliers, SUPPLIERS_FILE)
                         self.manager.save_data(self.manager.categories, CATEGORIES_FILE)
                         self.manager.save_data(self.manager.settings, SETTINGS_FILE)
@@ -2521,9 +2538,8 @@ class ModernInventoryApp:
                         self.manager.products = backup_data['products']
                         self.manager.movements = backup_data['movements']
                         
-                        # Save data
+                        # Save data (movements were written to their partitions on assignment)
                         self.manager.save_data(self.manager.products, PRODUCTS_FILE)
-                        self.manager.save_data(self.manager.movements, MOVEMENTS_FILE)
                         
                         log_entry = f"⚡ {datetime.now().strftime('%d/%m/%Y %H:%M')} - Backup rápido restaurado: {os.path.basename(filename)}"
                         
@@ -3354,6 +3370,8 @@ class CategoryDialog:
                             for product in self.manager.products:
                                 if product.get('category') == old_name:
                                     product['category'] = new_name
+                            if self.manager.columnar is not None:
+                                self.manager.columnar.reset_products()
                             self.manager.save_data(self.manager.products, PRODUCTS_FILE)
                         
                         self.manager.categories[i] = data
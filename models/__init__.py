@@ -2,10 +2,15 @@
 Módulo de modelos para o Sistema de Controle de Estoque
 """
 
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from typing import List, Dict, Optional
 from config import *
 from utils import load_json_data, save_json_data, create_directory
+from .report_engine import ReportEngine
+from .rollups import MovementRollups
+from .archive import MovementArchive, archive_cutoff, ARCHIVE_HORIZON_MONTHS
+from .partitions import MovementPartitions
+from .columnar import ColumnarStore, numpy_available
 
 class InventoryManager:
     """Gerenciador principal do estoque"""
@@ -13,16 +18,46 @@ class InventoryManager:
     def __init__(self):
         self.create_data_directories()
         self.products = load_json_data(PRODUCTS_FILE, [])
-        self.movements = load_json_data(MOVEMENTS_FILE, [])
         self.suppliers = load_json_data(SUPPLIERS_FILE, [])
         self.categories = load_json_data(CATEGORIES_FILE, [])
         self.settings = load_json_data(SETTINGS_FILE, DEFAULT_SETTINGS)
+        
+        # Movimentações em partições mensais: cada consulta lê só os meses do seu período
+        self.partitions = MovementPartitions(MOVEMENTS_DIR)
+        self.partitions.import_file(MOVEMENTS_FILE, self.products)
+        self.partitions.ensure_openings(self.products)
+        
+        # Movimentações antigas ficam em arquivos mensais compactados (archive_old_movements)
+        self.archive = MovementArchive(ARCHIVE_DIR)
+        
+        # Totais por dia/mês, atualizados em add_movement; vêm dos manifestos, sem ler movimentações
+        self.rollups = MovementRollups()
+        for entry in self.partitions.months.values():
+            self.rollups.merge(entry['daily'])
+        self.rollups.merge(self.archive.daily)
+        
+        # Incrementado a cada gravação; invalida os resultados guardados dos relatórios
+        self.data_version = 0
+        self.reports = ReportEngine(self)
+        
+        # Espelho colunar para estatísticas vetorizadas (só com NumPy instalado)
+        self.columnar = ColumnarStore(self) if numpy_available() else None
     
     def create_data_directories(self):
         """Cria diretórios necessários se não existirem"""
         for directory in [DATA_DIR, LOGS_DIR, BACKUPS_DIR, ASSETS_DIR]:
             create_directory(directory)
     
+    @property
+    def movements(self) -> List[Dict]:
+        """Todas as movimentações ativas (lê as partições que ainda não foram lidas)"""
+        return self.partitions.all()
+    
+    def _save(self, data, filename: str) -> bool:
+        """Grava os dados e marca uma nova versão"""
+        self.data_version += 1
+        return save_json_data(data, filename)
+    
     # PRODUTOS
     def add_product(self, product_data: Dict) -> bool:
         """Adiciona um novo produto"""
@@ -38,7 +73,7 @@ class InventoryManager:
         self.add_movement("entrada", product_data['code'], 
                          product_data['quantity'], "Cadastro inicial")
         
-        return save_json_data(self.products, PRODUCTS_FILE)
+        return self._save(self.products, PRODUCTS_FILE)
     
     def update_product(self, code: str, updates: Dict) -> bool:
         """Atualiza um produto existente"""
@@ -48,12 +83,14 @@ class InventoryManager:
         
         product.update(updates)
         product['updated_at'] = datetime.now().isoformat()
-        return save_json_data(self.products, PRODUCTS_FILE)
+        if self.columnar is not None:
+            self.columnar.update_product(product)
+        return self._save(self.products, PRODUCTS_FILE)
     
     def delete_product(self, code: str) -> bool:
         """Remove um produto"""
         self.products = [p for p in self.products if p['code'] != code]
-        return save_json_data(self.products, PRODUCTS_FILE)
+        return self._save(self.products, PRODUCTS_FILE)
     
     def get_product(self, code: str) -> Optional[Dict]:
         """Busca produto por código"""
@@ -88,12 +125,14 @@ class InventoryManager:
         
         product['quantity'] = new_quantity
         product['updated_at'] = datetime.now().isoformat()
+        if self.columnar is not None:
+            self.columnar.update_product(product)
         
         # Registra movimento
         movement_type = "entrada" if quantity_change > 0 else "saída"
         self.add_movement(movement_type, code, abs(quantity_change), reason)
         
-        return save_json_data(self.products, PRODUCTS_FILE)
+        return self._save(self.products, PRODUCTS_FILE)
     
     def get_low_stock_products(self) -> List[Dict]:
         """Busca produtos com estoque baixo"""
@@ -112,12 +151,30 @@ class InventoryManager:
         """Conta total de itens em estoque"""
         return sum(p['quantity'] for p in self.products)
     
+    def get_stock_at(self, when, codes=None) -> Dict[str, int]:
+        """Saldo de cada produto em uma data passada (date = fim do dia), pela abertura do mês
+        nas partições ou pelo arquivo"""
+        if self.archive.covers(when):
+            return self.archive.balances_at(when, codes)
+        balances = self.partitions.balances_at(when, codes)
+        if balances is None:
+            # Sem movimentações ativas o saldo não mudou desde o corte: é o atual
+            balances = {
+                p['code']: p['quantity'] for p in self.products
+                if p['quantity'] and (codes is None or p['code'] in codes)
+            }
+        return balances
+    
+    def get_product_stock_at(self, code: str, when) -> int:
+        """Saldo de um produto em uma data passada"""
+        return self.get_stock_at(when, [code]).get(code, 0)
+    
     # MOVIMENTAÇÕES
     def add_movement(self, movement_type: str, product_code: str, 
                     quantity: int, reason: str = "") -> bool:
         """Adiciona registro de movimentação"""
         movement = {
-            'id': len(self.movements) + 1,
+            'id': self.archive.count + self.partitions.count + 1,
             'date': datetime.now().isoformat(),
             'type': movement_type,
             'product_code': product_code,
@@ -126,18 +183,40 @@ class InventoryManager:
             'user': "admin"  # Implementar sistema de usuários futuramente
         }
         
-        self.movements.append(movement)
-        return save_json_data(self.movements, MOVEMENTS_FILE)
+        # O preço fica gravado na movimentação: mudanças de preço não revalorizam o histórico
+        product = self.get_product(product_code)
+        price = product['price'] if product else 0
+        movement['unit_price'] = price
+        self.rollups.add(movement, price)
+        
+        # Só a partição do mês e o manifesto são regravados (com os saldos de abertura)
+        self.data_version += 1
+        return self.partitions.append(movement, price, self.products)
     
     def get_movements_by_date_range(self, start_date: str, end_date: str) -> List[Dict]:
-        """Busca movimentações por período"""
+        """Busca movimentações por período (inclusive as arquivadas, se o período começa antes do corte)"""
         movements = []
-        for movement in self.movements:
-            movement_date = movement['date'][:10]  # Pega apenas a data (YYYY-MM-DD)
-            if start_date <= movement_date <= end_date:
-                movements.append(movement)
+        if self.archive.cutoff and start_date < self.archive.cutoff:
+            movements.extend(self.archive.movements_between(start_date, end_date))
+        movements.extend(self.partitions.between(start_date, end_date))
         return movements
     
+    def archive_old_movements(self, horizon_months: int = ARCHIVE_HORIZON_MONTHS) -> int:
+        """Move as movimentações anteriores ao horizonte para o arquivo; retorna quantas saíram"""
+        cutoff = archive_cutoff(date.today(), horizon_months)
+        
+        # Só as partições anteriores ao corte são lidas; a abertura de cada mês arquivado
+        # vem do manifesto
+        old_movements = self.partitions.between(end_date=(cutoff - timedelta(days=1)).isoformat())
+        count, _ = self.archive.archive(old_movements, self.products, self.partitions, cutoff)
+        if not count:
+            return 0
+        
+        # Partições anteriores ao corte saem inteiras; os totais por dia/mês não mudam
+        self.partitions.drop_before(cutoff.isoformat(), self.products)
+        self.data_version += 1
+        return count
+    
     def get_movements_by_type(self, movement_type: str) -> List[Dict]:
         """Busca movimentações por tipo"""
         return [m for m in self.movements if m['type'] == movement_type]
@@ -158,7 +237,7 @@ class InventoryManager:
         supplier_data['updated_at'] = datetime.now().isoformat()
         self.suppliers.append(supplier_data)
         
-        return save_json_data(self.suppliers, SUPPLIERS_FILE)
+        return self._save(self.suppliers, SUPPLIERS_FILE)
     
     def update_supplier(self, supplier_id: int, updates: Dict) -> bool:
         """Atualiza fornecedor existente"""
@@ -168,12 +247,12 @@ class InventoryManager:
         
         supplier.update(updates)
         supplier['updated_at'] = datetime.now().isoformat()
-        return save_json_data(self.suppliers, SUPPLIERS_FILE)
+        return self._save(self.suppliers, SUPPLIERS_FILE)
     
     def delete_supplier(self, supplier_id: int) -> bool:
         """Remove fornecedor"""
         self.suppliers = [s for s in self.suppliers if s.get('id') != supplier_id]
-        return save_json_data(self.suppliers, SUPPLIERS_FILE)
+        return self._save(self.suppliers, SUPPLIERS_FILE)
     
     def get_supplier_by_id(self, supplier_id: int) -> Optional[Dict]:
         """Busca fornecedor por ID"""
@@ -203,7 +282,7 @@ class InventoryManager:
         category_data['updated_at'] = datetime.now().isoformat()
         self.categories.append(category_data)
         
-        return save_json_data(self.categories, CATEGORIES_FILE)
+        return self._save(self.categories, CATEGORIES_FILE)
     
     def update_category(self, category_id: int, updates: Dict) -> bool:
         """Atualiza categoria existente"""
@@ -213,12 +292,12 @@ class InventoryManager:
         
         category.update(updates)
         category['updated_at'] = datetime.now().isoformat()
-        return save_json_data(self.categories, CATEGORIES_FILE)
+        return self._save(self.categories, CATEGORIES_FILE)
     
     def delete_category(self, category_id: int) -> bool:
         """Remove categoria"""
         self.categories = [c for c in self.categories if c.get('id') != category_id]
-        return save_json_data(self.categories, CATEGORIES_FILE)
+        return self._save(self.categories, CATEGORIES_FILE)
     
     def get_category_by_id(self, category_id: int) -> Optional[Dict]:
         """Busca categoria por ID"""
@@ -232,7 +311,7 @@ class InventoryManager:
     def update_settings(self, new_settings: Dict) -> bool:
         """Atualiza configurações"""
         self.settings.update(new_settings)
-        return save_json_data(self.settings, SETTINGS_FILE)
+        return self._save(self.settings, SETTINGS_FILE)
     
     def get_setting(self, key: str, default=None):
         """Busca configuração específica"""
@@ -241,15 +320,16 @@ class InventoryManager:
     # RELATÓRIOS E ESTATÍSTICAS
     def get_dashboard_stats(self) -> Dict:
         """Obtém estatísticas para o dashboard"""
+        stats = self.reports.get_data()
         return {
-            'total_products': len(self.products),
-            'total_items': self.get_total_items_count(),
-            'total_value': self.get_total_inventory_value(),
-            'low_stock_count': len(self.get_low_stock_products()),
-            'out_of_stock_count': len(self.get_out_of_stock_products()),
+            'total_products': stats['total_products'],
+            'total_items': stats['total_items'],
+            'total_value': stats['total_value'],
+            'low_stock_count': len(stats['low_stock']),
+            'out_of_stock_count': stats['out_of_stock_count'],
             'total_suppliers': len(self.suppliers),
             'total_categories': len(self.categories),
-            'recent_movements': self.movements[-10:] if self.movements else []
+            'recent_movements': self.partitions.recent(10)
         }
     
     def get_inventory_summary(self) -> Dict:
@@ -0,0 +1,234 @@
+"""
+Análise de estoque: curva ABC, giro, dias de cobertura e idade do estoque parado
+"""
+
+import math
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from config import ANALYTICS_CONFIG
+from .report_engine import normalize_movement_type
+from .columnar import np
+
+ABC_CLASSES = ('A', 'B', 'C')
+
+def abc_class(share_before: float, consumption_value: float) -> str:
+    """Classe pela fatia acumulada do valor consumido antes do item"""
+    if consumption_value > 0 and share_before < ANALYTICS_CONFIG['class_a_share']:
+        return 'A'
+    if consumption_value > 0 and share_before < ANALYTICS_CONFIG['class_b_share']:
+        return 'B'
+    return 'C'
+
+def is_dead_stock(quantity: int, days_without_exit: Optional[int]) -> bool:
+    """Estoque parado: há saldo e nenhuma saída há dead_stock_days ou mais"""
+    return (
+        quantity > 0 and days_without_exit is not None
+        and days_without_exit >= ANALYTICS_CONFIG['dead_stock_days']
+    )
+
+def last_exits(partitions, codes) -> Dict[str, str]:
+    """Dia da última saída de cada código, lendo partições da mais nova para a mais antiga
+    até todos os códigos terem uma saída (ou o histórico acabar)"""
+    pending = set(codes)
+    found = {}
+    for month_key in sorted(partitions.months, reverse=True):
+        for movement in partitions.load(month_key):
+            if normalize_movement_type(movement['type']) != 'saida':
+                continue
+            code = movement['product_code']
+            day_key = movement['date'][:10]
+            if day_key > found.get(code, ''):
+                found[code] = day_key
+        pending.difference_update(found)
+        if not pending:
+            break
+    return found
+
+def _items_python(manager, start: date, period_days: int, today: date) -> List[Dict]:
+    """Uma passada pelas movimentações do período e uma pelos produtos, sem NumPy"""
+    aggregates = {}
+    for movement in manager.partitions.between(start.isoformat()):
+        movement_type = normalize_movement_type(movement['type'])
+        quantity = movement['quantity']
+        
+        agg = aggregates.get(movement['product_code'])
+        if agg is None:
+            agg = aggregates[movement['product_code']] = {'consumption': 0, 'net': 0}
+        
+        if movement_type == 'saida':
+            agg['consumption'] += quantity
+            agg['net'] -= quantity
+        elif movement_type == 'entrada':
+            agg['net'] += quantity
+    
+    exits = last_exits(manager.partitions, (p['code'] for p in manager.products))
+    empty = {'consumption': 0, 'net': 0}
+    items = []
+    for product in manager.products:
+        agg = aggregates.get(product['code'], empty)
+        quantity = product.get('quantity', 0)
+        price = product.get('price', 0)
+        consumption = agg['consumption']
+        
+        # Estoque no início do período = atual menos o saldo das movimentações do período
+        average_stock = (quantity + (quantity - agg['net'])) / 2
+        daily_consumption = consumption / period_days
+        
+        # Sem saída registrada, a idade conta a partir do cadastro
+        last_exit = exits.get(product['code'])
+        since = last_exit or (product.get('created_at') or '')[:10] or None
+        days_without_exit = (today - date.fromisoformat(since)).days if since else None
+        
+        items.append({
+            'code': product['code'],
+            'name': product['name'],
+            'category': product.get('category') or '',
+            'quantity': quantity,
+            'stock_value': price * quantity,
+            'consumption': consumption,
+            'consumption_value': consumption * price,
+            'turnover': consumption / average_stock if average_stock > 0 else None,
+            'days_of_cover': quantity / daily_consumption if daily_consumption > 0 else None,
+            'last_exit': last_exit,
+            'days_without_exit': days_without_exit,
+            'dead_stock': is_dead_stock(quantity, days_without_exit)
+        })
+    
+    # Curva ABC: ordem decrescente de valor consumido e fatia acumulada antes de cada item
+    items.sort(key=lambda item: item['consumption_value'], reverse=True)
+    total_value = sum(item['consumption_value'] for item in items)
+    accumulated = 0
+    for item in items:
+        item['abc_class'] = abc_class(accumulated / total_value if total_value else 1, item['consumption_value'])
+        accumulated += item['consumption_value']
+        item['cumulative_share'] = accumulated / total_value if total_value else 0
+    return items
+
+def _items_columnar(manager, columnar, start: date, period_days: int, today: date) -> List[Dict]:
+    """As mesmas métricas de _items_python, em lote sobre as colunas NumPy das partições do período"""
+    _, movement_products, quantities, directions = columnar.movement_columns(start.isoformat())
+    size = len(columnar.code_list)
+    consumed = directions < 0
+    
+    # Agregados por código, depois alinhados com a ordem dos produtos via product_ref
+    by_code_consumption = np.bincount(movement_products[consumed], weights=-quantities[consumed], minlength=size)
+    by_code_net = np.bincount(movement_products, weights=quantities, minlength=size)
+    
+    ref = columnar.product_ref
+    products = columnar.products
+    quantity = columnar.quantity
+    price = columnar.price
+    consumption = by_code_consumption[ref]
+    net = by_code_net[ref]
+    
+    # Sem saída registrada, a idade conta a partir do cadastro
+    nat = np.datetime64('NaT').astype(np.int64)
+    last_exit = columnar.last_exit_days()[ref]
+    created = np.array(
+        [(p.get('created_at') or '')[:10] or 'NaT' for p in products], dtype='datetime64[D]'
+    ).astype(np.int64)
+    has_created = created != nat
+    since = np.where(last_exit >= 0, last_exit, created)
+    has_since = (last_exit >= 0) | has_created
+    days_without_exit = np.datetime64(today, 'D').astype(np.int64) - since
+    
+    average_stock = quantity - net / 2
+    daily_consumption = consumption / period_days
+    consumption_value = consumption * price
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        turnover = np.where(average_stock > 0, consumption / average_stock, np.nan)
+        days_of_cover = np.where(daily_consumption > 0, quantity / daily_consumption, np.nan)
+    
+    dead_stock = (quantity > 0) & has_since & (days_without_exit >= ANALYTICS_CONFIG['dead_stock_days'])
+    
+    # Curva ABC vetorizada: ordem decrescente de valor e soma acumulada
+    order = np.argsort(-consumption_value, kind='stable')
+    total_value = consumption_value.sum()
+    accumulated = np.cumsum(consumption_value[order])
+    if total_value:
+        share_before = (accumulated - consumption_value[order]) / total_value
+        cumulative_share = accumulated / total_value
+    else:
+        share_before = np.ones(len(order))
+        cumulative_share = np.zeros(len(order))
+    positive = consumption_value[order] > 0
+    classes = np.where(
+        positive & (share_before < ANALYTICS_CONFIG['class_a_share']), 'A',
+        np.where(positive & (share_before < ANALYTICS_CONFIG['class_b_share']), 'B', 'C')
+    )
+    
+    last_exit_keys = np.where(last_exit >= 0, last_exit, 0).astype('datetime64[D]').astype(str)
+    
+    # Colunas já na ordem da curva e convertidas para listas: montar os dicts fica barato
+    columns = zip(
+        order.tolist(),
+        quantity[order].tolist(),
+        (price * quantity)[order].tolist(),
+        consumption[order].astype(np.int64).tolist(),
+        consumption_value[order].tolist(),
+        turnover[order].tolist(),
+        days_of_cover[order].tolist(),
+        np.where(last_exit[order] >= 0, last_exit_keys[order], '').tolist(),
+        np.where(has_since[order], days_without_exit[order], -1).tolist(),
+        dead_stock[order].tolist(),
+        classes.tolist(),
+        cumulative_share.tolist()
+    )
+    
+    items = []
+    for (i, item_quantity, stock_value, item_consumption, item_value, item_turnover,
+         item_cover, item_last_exit, idle_days, item_dead, item_class, item_share) in columns:
+        product = products[i]
+        items.append({
+            'code': product['code'],
+            'name': product['name'],
+            'category': product.get('category') or '',
+            'quantity': item_quantity,
+            'stock_value': stock_value,
+            'consumption': item_consumption,
+            'consumption_value': item_value,
+            'turnover': None if math.isnan(item_turnover) else item_turnover,
+            'days_of_cover': None if math.isnan(item_cover) else item_cover,
+            'last_exit': item_last_exit or None,
+            'days_without_exit': idle_days if idle_days >= 0 else None,
+            'dead_stock': item_dead,
+            'abc_class': item_class,
+            'cumulative_share': item_share
+        })
+    return items
+
+def compute_stock_analytics(manager, period_days: Optional[int] = None,
+                            today: Optional[date] = None) -> Dict:
+    """Classe ABC, giro, dias de cobertura e dias sem saída de todos os produtos"""
+    period_days = period_days or ANALYTICS_CONFIG['period_days']
+    today = today or date.today()
+    start = today - timedelta(days=period_days)
+    
+    columnar = getattr(manager, 'columnar', None)
+    if columnar is not None:
+        items = _items_columnar(manager, columnar, start, period_days, today)
+    else:
+        items = _items_python(manager, start, period_days, today)
+    
+    summary = {abc: {'count': 0, 'consumption_value': 0, 'stock_value': 0} for abc in ABC_CLASSES}
+    dead_stock = []
+    for item in items:
+        totals = summary[item['abc_class']]
+        totals['count'] += 1
+        totals['consumption_value'] += item['consumption_value']
+        totals['stock_value'] += item['stock_value']
+        if item['dead_stock']:
+            dead_stock.append(item)
+    
+    dead_stock.sort(key=lambda item: item['stock_value'], reverse=True)
+    
+    return {
+        'period_days': period_days,
+        'start': start.isoformat(),
+        'items': items,
+        'classes': summary,
+        'total_consumption_value': sum(totals['consumption_value'] for totals in summary.values()),
+        'dead_stock': dead_stock,
+        'dead_stock_value': sum(item['stock_value'] for item in dead_stock)
+    }
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Arquivo de movimentações antigas: um arquivo compactado por mês, com saldos de abertura
+"""
+
+import gzip
+import json
+import os
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from utils import load_json_data, save_json_data
+from .checkpoints import moment_key, signed_quantity
+from .rollups import MovementRollups
+
+# Meses de movimentações mantidos nas partições ativas; as anteriores vão para o arquivo
+ARCHIVE_HORIZON_MONTHS = 24
+
+ARCHIVE_INDEX_FILE = "index.json"
+
+def archive_cutoff(today: date, horizon_months: int = ARCHIVE_HORIZON_MONTHS) -> date:
+    """Primeiro dia do mês horizon_months antes do mês atual (meses inteiros vão para o arquivo)"""
+    month = today.year * 12 + today.month - 1 - horizon_months
+    return date(month // 12, month % 12 + 1, 1)
+
+def month_file_name(month_key: str) -> str:
+    """Nome do arquivo de um mês AAAA-MM"""
+    return f"movements_{month_key}.json.gz"
+
+class MovementArchive:
+    """Movimentações anteriores ao corte, um arquivo por mês, e o índice que as resume"""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index_file = os.path.join(directory, ARCHIVE_INDEX_FILE)
+        
+        index = load_json_data(self.index_file, {})
+        # Corte AAAA-MM-DD: toda movimentação anterior está no arquivo
+        self.cutoff = index.get('cutoff')
+        self.count = index.get('count', 0)
+        # AAAA-MM -> quantidade de movimentações no arquivo do mês
+        self.months = index.get('months', {})
+        # Totais diários das movimentações arquivadas, no formato de MovementRollups
+        self.daily = index.get('daily', {})
+    
+    def load_month(self, month_key: str) -> Dict:
+        """Saldos de abertura e movimentações de um mês arquivado"""
+        with gzip.open(os.path.join(self.directory, month_file_name(month_key)), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _write_month(self, month_key: str, data: Dict):
+        """Grava o arquivo compactado de um mês"""
+        with gzip.open(os.path.join(self.directory, month_file_name(month_key)), 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+    
+    def archive(self, movements: List[Dict], products: List[Dict], balances,
+                cutoff: date) -> Tuple[int, List[Dict]]:
+        """Arquiva as movimentações anteriores ao corte; balances responde balances_before(dia)
+        (as partições, antes de perderem os meses); retorna a quantidade e as que ficam"""
+        cutoff_key = cutoff.isoformat()
+        
+        # O corte só avança: o que já está no arquivo não volta para as partições ativas
+        if self.cutoff and cutoff_key <= self.cutoff:
+            return 0, movements
+        
+        archived = [m for m in movements if m['date'] < cutoff_key]
+        if not archived:
+            return 0, movements
+        
+        os.makedirs(self.directory, exist_ok=True)
+        
+        by_month = {}
+        for movement in archived:
+            by_month.setdefault(movement['date'][:7], []).append(movement)
+        
+        for month_key, month_movements in sorted(by_month.items()):
+            if month_key in self.months:
+                data = self.load_month(month_key)
+                data['movements'].extend(month_movements)
+            else:
+                # Saldo no início do mês, antes de as movimentações saírem das partições
+                start = date(int(month_key[:4]), int(month_key[5:7]), 1)
+                data = {
+                    'month': month_key,
+                    'opening_balances': balances.balances_before(start),
+                    'movements': month_movements
+                }
+            self._write_month(month_key, data)
+            self.months[month_key] = len(data['movements'])
+        
+        # Totais diários acumulados: o gerenciador os soma aos das partições ao carregar
+        prices = {p['code']: p.get('price', 0) for p in products}
+        totals = MovementRollups()
+        totals.merge(self.daily)
+        for movement in archived:
+            totals.add(movement, prices.get(movement['product_code'], 0))
+        
+        self.cutoff = cutoff_key
+        self.count += len(archived)
+        self.daily = totals.daily
+        
+        # O índice é gravado antes de as partições perderem as movimentações
+        save_json_data({
+            'cutoff': self.cutoff,
+            'count': self.count,
+            'months': self.months,
+            'daily': self.daily
+        }, self.index_file)
+        
+        return len(archived), [m for m in movements if m['date'] >= cutoff_key]
+    
+    def covers(self, when: Union[date, datetime]) -> bool:
+        """A data ou instante é anterior ao corte (respondido só pelo arquivo)"""
+        return bool(self.cutoff) and moment_key(when) <= self.cutoff
+    
+    def balances_at(self, when: Union[date, datetime], codes: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Saldo de cada produto (só os diferentes de zero) em uma data anterior ao corte"""
+        limit = moment_key(when)
+        earlier = [month_key for month_key in self.months if month_key <= limit[:7]]
+        if earlier:
+            data = self.load_month(max(earlier))
+            movements = data['movements']
+        elif self.months:
+            # Antes da primeira movimentação arquivada: o saldo é o de abertura do primeiro mês
+            data = self.load_month(min(self.months))
+            movements = []
+        else:
+            return {}
+        
+        balances = dict(data['opening_balances'])
+        for movement in movements:
+            if movement['date'] < limit:
+                code = movement['product_code']
+                balances[code] = balances.get(code, 0) + signed_quantity(movement)
+        
+        if codes is not None:
+            codes = set(codes)
+            balances = {code: quantity for code, quantity in balances.items() if code in codes}
+        return {code: quantity for code, quantity in balances.items() if quantity}
+    
+    def movements_between(self, start_date: str, end_date: str) -> List[Dict]:
+        """Movimentações arquivadas entre duas datas AAAA-MM-DD (inclusive), lendo só os meses do período"""
+        movements = []
+        for month_key in sorted(self.months):
+            if start_date[:7] <= month_key <= end_date[:7]:
+                movements.extend(
+                    m for m in self.load_month(month_key)['movements']
+                    if start_date <= m['date'][:10] <= end_date
+                )
+        return movements
\ No newline at end of file
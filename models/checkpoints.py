@@ -0,0 +1,22 @@
+"""
+Saldo em datas passadas: quantidade com sinal de uma movimentação e limite das consultas
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Union
+from .report_engine import normalize_movement_type
+
+def signed_quantity(movement: Dict) -> int:
+    """Quantidade com sinal (entrada soma, saída subtrai, outros tipos não alteram o saldo)"""
+    movement_type = normalize_movement_type(movement['type'])
+    if movement_type == 'entrada':
+        return movement['quantity']
+    if movement_type == 'saida':
+        return -movement['quantity']
+    return 0
+
+def moment_key(when: Union[date, datetime]) -> str:
+    """Limite ISO exclusivo da consulta: date vale até o fim do dia, datetime até o próprio instante"""
+    if isinstance(when, datetime):
+        return (when + timedelta(microseconds=1)).isoformat()
+    return (when + timedelta(days=1)).isoformat()
\ No newline at end of file
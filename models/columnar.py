@@ -0,0 +1,341 @@
+"""
+Espelho colunar (NumPy) de produtos e movimentações para estatísticas vetorizadas
+"""
+
+from typing import Dict, List, Optional, Tuple
+from .report_engine import normalize_movement_type
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Linhas acrescentadas aos arrays a cada crescimento
+CHUNK_SIZE = 65536
+
+# Colunas numéricas de produto aceitas em percentiles/top_products
+PRODUCT_COLUMNS = ('price', 'quantity', 'min_stock', 'value')
+
+def numpy_available() -> bool:
+    """Indica se o NumPy está instalado"""
+    return np is not None
+
+def movement_direction(movement: Dict) -> int:
+    """1 para entrada, -1 para saída, 0 para outros tipos"""
+    movement_type = normalize_movement_type(movement['type'])
+    if movement_type == 'entrada':
+        return 1
+    if movement_type == 'saida':
+        return -1
+    return 0
+
+def _grow(arrays: Dict, used: int, size: int) -> Dict:
+    """Os mesmos arrays com capacidade para size linhas, crescendo em blocos de CHUNK_SIZE"""
+    capacity = len(next(iter(arrays.values())))
+    if size <= capacity:
+        return arrays
+    
+    capacity = max(size, capacity * 2, CHUNK_SIZE)
+    grown = {}
+    for name, old in arrays.items():
+        new = np.zeros(capacity, dtype=old.dtype)
+        new[:used] = old[:used]
+        grown[name] = new
+    return grown
+
+class MovementColumns:
+    """Colunas de uma lista de movimentações que só cresce; cada sync converte só as linhas novas"""
+    
+    def __init__(self):
+        self.source = None
+        self.count = 0
+        self._arrays = {
+            'epoch': np.zeros(0, dtype=np.int64),
+            'product': np.zeros(0, dtype=np.int32),
+            'qty': np.zeros(0, dtype=np.int64),
+            'direction': np.zeros(0, dtype=np.int8)
+        }
+    
+    def sync(self, movements: List[Dict], code_id):
+        """Acrescenta as movimentações novas; lista trocada ou encolhida recomeça do zero"""
+        if movements is not self.source or len(movements) < self.count:
+            self.source = movements
+            self.count = 0
+        
+        total = len(movements)
+        if total == self.count:
+            return
+        
+        self._arrays = _grow(self._arrays, self.count, total)
+        epoch, product = self._arrays['epoch'], self._arrays['product']
+        qty, direction = self._arrays['qty'], self._arrays['direction']
+        for start in range(self.count, total, CHUNK_SIZE):
+            chunk = movements[start:start + CHUNK_SIZE]
+            end = start + len(chunk)
+            
+            # O NumPy converte o texto ISO (sem frações de segundo) direto para datetime64
+            epoch[start:end] = np.array([m['date'][:19] for m in chunk], dtype='datetime64[s]').astype(np.int64)
+            product[start:end] = [code_id(m['product_code']) for m in chunk]
+            
+            # Entradas com quantidade zero ainda contam como entrada, por isso a direção fica à parte
+            directions = np.fromiter((movement_direction(m) for m in chunk), dtype=np.int8, count=len(chunk))
+            direction[start:end] = directions
+            qty[start:end] = directions * np.fromiter((m['quantity'] for m in chunk), dtype=np.int64, count=len(chunk))
+            self.count = end
+    
+    def columns(self) -> Tuple:
+        """Datas (segundos desde 1970, horário local), id do código, quantidade com sinal e direção"""
+        return tuple(self._arrays[name][:self.count] for name in ('epoch', 'product', 'qty', 'direction'))
+
+class ColumnarStore:
+    """Produtos e movimentações (por partição mensal) do gerenciador guardados em arrays NumPy"""
+    
+    def __init__(self, manager):
+        if np is None:
+            raise RuntimeError("NumPy não está instalado")
+        
+        self.manager = manager
+        
+        # Dicionário de códigos de produto (id estável usado pelas movimentações)
+        self.codes = {}
+        self.code_list = []
+        
+        # Linhas de produto: crescem com a lista do gerenciador e são atualizadas uma a uma
+        # por update_product; só uma lista nova (exclusão, restauração) refaz tudo
+        self.reset_products()
+        
+        # AAAA-MM -> colunas da partição, acompanhando a lista que as partições mantêm em memória
+        self._months = {}
+    
+    # SINCRONIZAÇÃO
+    def _code_id(self, code: str) -> int:
+        """Id do código de produto no dicionário (criado se ainda não existir)"""
+        code_id = self.codes.get(code)
+        if code_id is None:
+            code_id = self.codes[code] = len(self.code_list)
+            self.code_list.append(code)
+        return code_id
+    
+    def reset_products(self):
+        """Esvazia as colunas de produtos, remontadas no próximo uso (alterações em lote)"""
+        self._products_source = None
+        self.products = []
+        self._rows = {}
+        self._categories = {}
+        self._suppliers = {}
+        self.category_names = []
+        self.supplier_names = []
+        self._product_arrays = {
+            'price': np.zeros(0, dtype=np.float64),
+            'quantity': np.zeros(0, dtype=np.int64),
+            'min_stock': np.zeros(0, dtype=np.int64),
+            'category_id': np.zeros(0, dtype=np.int32),
+            'supplier_id': np.zeros(0, dtype=np.int32),
+            'product_ref': np.zeros(0, dtype=np.int32)
+        }
+    
+    def _group_id(self, groups: Dict[str, int], names: List[str], name: str) -> int:
+        """Id de uma categoria ou fornecedor ('' = sem grupo) no dicionário do grupo"""
+        group_id = groups.get(name)
+        if group_id is None:
+            group_id = groups[name] = len(names)
+            names.append(name)
+        return group_id
+    
+    def _set_row(self, row: int, product: Dict):
+        """Grava um produto em uma linha das colunas"""
+        arrays = self._product_arrays
+        arrays['price'][row] = product.get('price', 0)
+        arrays['quantity'][row] = product.get('quantity', 0)
+        arrays['min_stock'][row] = product.get('min_stock', 0)
+        arrays['category_id'][row] = self._group_id(self._categories, self.category_names, product.get('category') or '')
+        arrays['supplier_id'][row] = self._group_id(self._suppliers, self.supplier_names, product.get('supplier') or '')
+        arrays['product_ref'][row] = self._code_id(product['code'])
+    
+    def _sync_products(self):
+        """Acrescenta os produtos novos da lista do gerenciador; uma lista trocada é remontada"""
+        products = self.manager.products
+        if products is not self._products_source or len(products) < len(self.products):
+            self.reset_products()
+            self._products_source = products
+        
+        start = len(self.products)
+        if len(products) == start:
+            return
+        
+        self._product_arrays = _grow(self._product_arrays, start, len(products))
+        for row in range(start, len(products)):
+            product = products[row]
+            self._rows[product['code']] = row
+            self._set_row(row, product)
+        self.products.extend(products[start:])
+    
+    def update_product(self, product: Dict):
+        """Atualiza a linha de um produto alterado no lugar (preço, estoque, mínimo, grupos)"""
+        self._sync_products()
+        row = self._rows.get(product['code'])
+        if row is not None:
+            self._set_row(row, product)
+    
+    def _month_columns(self, month_key: str) -> MovementColumns:
+        """Colunas de uma partição, convertendo só as movimentações acrescentadas desde o último uso"""
+        columns = self._months.get(month_key)
+        if columns is None:
+            columns = self._months[month_key] = MovementColumns()
+        columns.sync(self.manager.partitions.load(month_key), self._code_id)
+        return columns
+    
+    def sync(self):
+        """Atualiza as colunas de produtos e descarta as de partições que saíram"""
+        self._sync_products()
+        for month_key in set(self._months) - set(self.manager.partitions.months):
+            del self._months[month_key]
+    
+    def _view(self, name: str):
+        """Parte usada de uma coluna de produtos"""
+        self._sync_products()
+        return self._product_arrays[name][:len(self.products)]
+    
+    @property
+    def price(self):
+        """Preço de cada produto"""
+        return self._view('price')
+    
+    @property
+    def quantity(self):
+        """Estoque de cada produto"""
+        return self._view('quantity')
+    
+    @property
+    def min_stock(self):
+        """Estoque mínimo de cada produto"""
+        return self._view('min_stock')
+    
+    @property
+    def category_id(self):
+        """Id da categoria de cada produto (índice em category_names)"""
+        return self._view('category_id')
+    
+    @property
+    def supplier_id(self):
+        """Id do fornecedor de cada produto (índice em supplier_names)"""
+        return self._view('supplier_id')
+    
+    @property
+    def product_ref(self):
+        """Id do código de cada produto (índice em code_list, o mesmo das movimentações)"""
+        return self._view('product_ref')
+    
+    # MOVIMENTAÇÕES
+    def movement_columns(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Tuple:
+        """Datas (segundos desde 1970), id do código, quantidade com sinal e direção das movimentações
+        entre duas datas AAAA-MM-DD (inclusive), juntando só as colunas das partições do período"""
+        self.sync()
+        months = [self._month_columns(key).columns() for key in self.manager.partitions.months_between(start_date, end_date)]
+        if not months:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int8)
+        epochs, products, quantities, directions = (np.concatenate(parts) for parts in zip(*months))
+        
+        # Meses das pontas podem ter dias fora do período
+        days = epochs // 86400
+        mask = np.ones(len(days), dtype=bool)
+        if start_date is not None:
+            mask &= days >= np.datetime64(start_date, 'D').astype(np.int64)
+        if end_date is not None:
+            mask &= days <= np.datetime64(end_date, 'D').astype(np.int64)
+        if mask.all():
+            return epochs, products, quantities, directions
+        return epochs[mask], products[mask], quantities[mask], directions[mask]
+    
+    def last_exit_days(self):
+        """Dia (desde 1970) da última saída de cada id de código, -1 sem saída; lê as partições da
+        mais nova para a mais antiga até todos os produtos terem uma saída"""
+        self.sync()
+        last = np.full(len(self.code_list), -1, dtype=np.int64)
+        for month_key in sorted(self.manager.partitions.months, reverse=True):
+            epochs, products, _, directions = self._month_columns(month_key).columns()
+            if len(last) < len(self.code_list):
+                last = np.concatenate([last, np.full(len(self.code_list) - len(last), -1, dtype=np.int64)])
+            
+            exits = directions < 0
+            np.maximum.at(last, products[exits], epochs[exits] // 86400)
+            if (last[self.product_ref] >= 0).all():
+                break
+        return last
+    
+    # PRODUTOS
+    def column(self, name: str):
+        """Coluna numérica de produtos ('value' = preço x quantidade)"""
+        if name not in PRODUCT_COLUMNS:
+            raise ValueError(f"Coluna desconhecida: {name}")
+        if name == 'value':
+            return self.price * self.quantity
+        return getattr(self, name)
+    
+    def product_totals(self, threshold: int) -> Dict:
+        """Totais do estoque; low_stock_count usa o limite global, below_min_count o mínimo de cada produto"""
+        price, quantity, min_stock = self.price, self.quantity, self.min_stock
+        return {
+            'total_products': len(self.products),
+            'total_items': int(quantity.sum()),
+            'total_value': float((price * quantity).sum()),
+            'low_stock_count': int((quantity <= threshold).sum()),
+            'out_of_stock_count': int((quantity == 0).sum()),
+            'below_min_count': int(((quantity > 0) & (quantity <= min_stock)).sum())
+        }
+    
+    def low_stock_products(self, threshold: int) -> List[Dict]:
+        """Produtos com quantidade até o limite, do menor estoque para o maior"""
+        quantity = self.quantity
+        indices = np.flatnonzero(quantity <= threshold)
+        indices = indices[np.argsort(quantity[indices], kind='stable')]
+        return [self.products[i] for i in indices]
+    
+    def group_products(self, by: str = 'category') -> Dict[str, Dict]:
+        """Quantidade de produtos, itens e valor por categoria ou fornecedor ('' = sem grupo)"""
+        if by == 'category':
+            keys, names = self.category_id, self.category_names
+        elif by == 'supplier':
+            keys, names = self.supplier_id, self.supplier_names
+        else:
+            raise ValueError(f"Agrupamento desconhecido: {by}")
+        
+        quantity = self.quantity
+        size = len(names)
+        counts = np.bincount(keys, minlength=size)
+        quantities = np.bincount(keys, weights=quantity, minlength=size)
+        values = np.bincount(keys, weights=self.price * quantity, minlength=size)
+        
+        # Índices dos produtos ordenados por grupo, cortados nas fronteiras
+        order = np.argsort(keys, kind='stable')
+        groups = np.split(order, np.cumsum(counts)[:-1]) if size else []
+        
+        # Grupos que ficaram sem produtos (produto movido de categoria) não aparecem
+        return {
+            name: {
+                'count': int(counts[i]),
+                'quantity': int(quantities[i]),
+                'value': float(values[i]),
+                'products': [self.products[j] for j in groups[i]]
+            }
+            for i, name in enumerate(names) if counts[i]
+        }
+    
+    def top_products(self, n: int = 10, column: str = 'value') -> List[Dict]:
+        """Os n produtos com maior valor na coluna (argpartition + ordenação só dos n)"""
+        values = self.column(column)
+        if n <= 0 or not len(values):
+            return []
+        if n < len(values):
+            indices = np.argpartition(-values, n - 1)[:n]
+        else:
+            indices = np.arange(len(values))
+        indices = indices[np.argsort(-values[indices], kind='stable')]
+        return [self.products[i] for i in indices]
+    
+    def percentiles(self, column: str, q=(25, 50, 75, 90)) -> Dict:
+        """Percentis de uma coluna de produtos"""
+        values = self.column(column)
+        if not len(values):
+            return {p: 0.0 for p in q}
+        return dict(zip(q, (float(v) for v in np.percentile(values, q))))
\ No newline at end of file
@@ -0,0 +1,266 @@
+"""
+Movimentações particionadas por mês: um arquivo por mês e um manifesto com datas, contagens
+e o saldo de abertura de cada mês
+"""
+
+import heapq
+import os
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Union
+from utils import load_json_data, save_json_data
+from .checkpoints import moment_key, signed_quantity
+from .rollups import MovementRollups
+
+MANIFEST_FILE = "manifest.json"
+
+def partition_file_name(month_key: str) -> str:
+    """Nome do arquivo da partição de um mês AAAA-MM"""
+    return f"movements_{month_key}.json"
+
+def apply_movements(balances: Dict[str, int], movements: Iterable[Dict], limit: Optional[str] = None,
+                    sign: int = 1) -> Dict[str, int]:
+    """Saldos somados (sign=-1: desfeitos) às movimentações anteriores ao limite ISO (todas,
+    sem limite); zeros saem e o dicionário recebido não muda"""
+    balances = dict(balances)
+    for movement in movements:
+        if limit is None or movement['date'] < limit:
+            code = movement['product_code']
+            balances[code] = balances.get(code, 0) + sign * signed_quantity(movement)
+    return {code: quantity for code, quantity in balances.items() if quantity}
+
+def current_balances(products: List[Dict]) -> Dict[str, int]:
+    """Saldo atual de cada produto (só os diferentes de zero)"""
+    return {p['code']: p.get('quantity', 0) for p in products if p.get('quantity', 0)}
+
+class MovementPartitions:
+    """Movimentações em arquivos mensais; cada consulta lê só as partições do seu período"""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest_file = os.path.join(directory, MANIFEST_FILE)
+        
+        # AAAA-MM -> {'count', 'first', 'last', 'daily', 'opening'}: quantidade, primeira e
+        # última data, totais diários (no formato de MovementRollups) e saldo de cada produto
+        # no início da partição (o saldo em uma data lê só uma entrada e uma partição)
+        self.months = load_json_data(self.manifest_file, {}).get('months', {})
+        
+        # Partições já lidas do disco e a lista completa, montada só quando pedida
+        self.loaded = {}
+        self._all = None
+    
+    @property
+    def count(self) -> int:
+        """Quantidade de movimentações, pelo manifesto (sem ler partições)"""
+        return sum(entry['count'] for entry in self.months.values())
+    
+    def _path(self, month_key: str) -> str:
+        """Caminho do arquivo de uma partição"""
+        return os.path.join(self.directory, partition_file_name(month_key))
+    
+    def _save_manifest(self) -> bool:
+        """Grava o manifesto"""
+        return save_json_data({'months': self.months}, self.manifest_file)
+    
+    def load(self, month_key: str) -> List[Dict]:
+        """Movimentações de um mês (lidas do disco só na primeira vez)"""
+        movements = self.loaded.get(month_key)
+        if movements is None:
+            movements = load_json_data(self._path(month_key), []) if month_key in self.months else []
+            self.loaded[month_key] = movements
+        return movements
+    
+    def months_between(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[str]:
+        """Partições cujas datas (primeira e última, do manifesto) alcançam o período, em ordem"""
+        return [
+            month_key for month_key, entry in sorted(self.months.items())
+            if (start_date is None or entry['last'][:10] >= start_date)
+            and (end_date is None or entry['first'][:10] <= end_date)
+        ]
+    
+    def between(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict]:
+        """Movimentações entre duas datas AAAA-MM-DD (inclusive), lendo só as partições do período"""
+        movements = []
+        for month_key in self.months_between(start_date, end_date):
+            movements.extend(
+                m for m in self.load(month_key)
+                if (start_date is None or m['date'][:10] >= start_date)
+                and (end_date is None or m['date'][:10] <= end_date)
+            )
+        return movements
+    
+    def recent(self, limit: int) -> List[Dict]:
+        """As movimentações mais recentes, lendo partições da mais nova para a mais antiga"""
+        movements = []
+        for month_key in sorted(self.months, reverse=True):
+            movements.extend(self.load(month_key))
+            if len(movements) >= limit:
+                break
+        return heapq.nlargest(limit, movements, key=lambda m: m['date'])
+    
+    def _balances_until(self, limit: str, codes: Optional[Iterable[str]] = None) -> Optional[Dict[str, int]]:
+        """Abertura da última partição até o limite mais as movimentações dela anteriores a ele;
+        None sem partições (o saldo é o atual)"""
+        earlier = [month_key for month_key in self.months if month_key <= limit[:7]]
+        if earlier:
+            month_key = max(earlier)
+            movements = self.load(month_key)
+        elif self.months:
+            # Antes da primeira movimentação ativa: o saldo é o de abertura da primeira partição
+            month_key = min(self.months)
+            movements = []
+        else:
+            return None
+        
+        opening = self.months[month_key]['opening']
+        if codes is not None:
+            codes = set(codes)
+            opening = {code: quantity for code, quantity in opening.items() if code in codes}
+            movements = [m for m in movements if m['product_code'] in codes]
+        return apply_movements(opening, movements, limit)
+    
+    def balances_at(self, when: Union[date, datetime], codes: Optional[Iterable[str]] = None) -> Optional[Dict[str, int]]:
+        """Saldo de cada produto (só os diferentes de zero) em uma data ou instante"""
+        return self._balances_until(moment_key(when), codes)
+    
+    def balances_before(self, day: date) -> Dict[str, int]:
+        """Saldo de cada produto (só os diferentes de zero) no início de um dia"""
+        return self._balances_until(day.isoformat()) or {}
+    
+    def all(self) -> List[Dict]:
+        """Todas as movimentações, mês a mês; a mesma lista cresce a cada append"""
+        if self._all is None:
+            self._all = [m for month_key in sorted(self.months) for m in self.load(month_key)]
+        return self._all
+    
+    def _new_opening(self, month_key: str, movement: Dict, products: List[Dict]) -> Dict[str, int]:
+        """Saldo de abertura de um mês ainda sem partição (lê no máximo a partição anterior)"""
+        earlier = [key for key in self.months if key < month_key]
+        if earlier:
+            previous = max(earlier)
+            return apply_movements(self.months[previous]['opening'], self.load(previous))
+        
+        later = [key for key in self.months if key > month_key]
+        if later:
+            return dict(self.months[min(later)]['opening'])
+        
+        # Primeira partição: o saldo atual (que já inclui a movimentação) menos ela
+        return apply_movements(current_balances(products), [movement], sign=-1)
+    
+    def append(self, movement: Dict, price: float = 0, products: List[Dict] = ()) -> bool:
+        """Acrescenta uma movimentação, regravando só a partição do mês e o manifesto;
+        products (já com a quantidade atualizada) só é usado na primeira partição"""
+        month_key = movement['date'][:7]
+        
+        entry = self.months.get(month_key)
+        if entry is None:
+            entry = self.months[month_key] = {
+                'count': 0, 'first': movement['date'], 'last': movement['date'], 'daily': {},
+                'opening': self._new_opening(month_key, movement, products)
+            }
+        
+        movements = self.load(month_key)
+        movements.append(movement)
+        if self._all is not None:
+            self._all.append(movement)
+        
+        # Data retroativa: os saldos de abertura dos meses seguintes também mudam
+        if signed_quantity(movement):
+            for later_key, later in self.months.items():
+                if later_key > month_key:
+                    later['opening'] = apply_movements(later['opening'], [movement])
+        
+        totals = MovementRollups()
+        totals.merge(entry['daily'])
+        totals.add(movement, price)
+        entry.update({
+            'count': entry['count'] + 1,
+            'first': min(entry['first'], movement['date']),
+            'last': max(entry['last'], movement['date']),
+            'daily': totals.daily
+        })
+        
+        return save_json_data(movements, self._path(month_key)) and self._save_manifest()
+    
+    def _write(self, month_key: str, movements: List[Dict], prices: Dict[str, float],
+               opening: Dict[str, int]) -> bool:
+        """Grava uma partição inteira e recalcula sua entrada no manifesto; movimentações antigas,
+        sem unit_price, recebem o preço atual para que regravações futuras não mudem o valor"""
+        totals = MovementRollups()
+        for movement in movements:
+            movement.setdefault('unit_price', prices.get(movement['product_code'], 0))
+            totals.add(movement)
+        
+        dates = [movement['date'] for movement in movements]
+        self.months[month_key] = {
+            'count': len(movements), 'first': min(dates), 'last': max(dates), 'daily': totals.daily,
+            'opening': opening
+        }
+        self.loaded[month_key] = movements
+        return save_json_data(movements, self._path(month_key))
+    
+    def replace(self, movements: List[Dict], products: List[Dict]) -> bool:
+        """Regrava todas as partições a partir de uma lista (migração, restauração de backup)"""
+        prices = {p['code']: p.get('price', 0) for p in products}
+        by_month = {}
+        for movement in movements:
+            by_month.setdefault(movement['date'][:7], []).append(movement)
+        
+        # Meses que deixaram de ter movimentações
+        for month_key in set(self.months) - set(by_month):
+            if os.path.exists(self._path(month_key)):
+                os.remove(self._path(month_key))
+        
+        self.months = {}
+        self.loaded = {}
+        self._all = None
+        
+        openings = self._openings_backward(by_month, products)
+        success = True
+        for month_key, month_movements in sorted(by_month.items()):
+            success = self._write(month_key, month_movements, prices, openings[month_key]) and success
+        return self._save_manifest() and success
+    
+    @staticmethod
+    def _openings_backward(by_month: Dict[str, List[Dict]], products: List[Dict]) -> Dict[str, Dict[str, int]]:
+        """Saldos de abertura de cada mês, de trás para frente a partir das quantidades atuais"""
+        balances = current_balances(products)
+        openings = {}
+        for month_key in sorted(by_month, reverse=True):
+            balances = apply_movements(balances, by_month[month_key], sign=-1)
+            openings[month_key] = balances
+        return openings
+    
+    def ensure_openings(self, products: List[Dict]) -> bool:
+        """Calcula uma única vez os saldos de abertura de manifestos gravados sem eles"""
+        if all('opening' in entry for entry in self.months.values()):
+            return True
+        openings = self._openings_backward({key: self.load(key) for key in self.months}, products)
+        for month_key, entry in self.months.items():
+            entry['opening'] = openings[month_key]
+        return self._save_manifest()
+    
+    def import_file(self, filename: str, products: List[Dict]) -> bool:
+        """Converte o arquivo único antigo em partições na primeira execução; o arquivo não é
+        alterado (pode ser o de exemplo do repositório) e o manifesto gravado impede nova conversão"""
+        if os.path.exists(self.manifest_file) or not os.path.exists(filename):
+            return False
+        return self.replace(load_json_data(filename, []), products)
+    
+    def drop_before(self, cutoff_key: str, products: List[Dict]) -> bool:
+        """Remove as movimentações anteriores ao corte; partições inteiras saem sem ser lidas"""
+        prices = {p['code']: p.get('price', 0) for p in products}
+        for month_key in [key for key in self.months if key <= cutoff_key[:7]]:
+            entry = self.months[month_key]
+            if entry['last'] < cutoff_key:
+                del self.months[month_key]
+                self.loaded.pop(month_key, None)
+                if os.path.exists(self._path(month_key)):
+                    os.remove(self._path(month_key))
+            elif entry['first'] < cutoff_key:
+                # A partição passa a começar no corte: a abertura absorve o que saiu
+                movements = self.load(month_key)
+                opening = apply_movements(entry['opening'], movements, cutoff_key)
+                self._write(month_key, [m for m in movements if m['date'] >= cutoff_key], prices, opening)
+        
+        self._all = None
+        return self._save_manifest()
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Reposição: demanda diária prevista, ponto de pedido e sugestão de compra por fornecedor
+"""
+
+import math
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from config import REPLENISHMENT_CONFIG
+from .report_engine import normalize_movement_type
+from .columnar import np
+
+def smoothing_weights(days: int, alpha: float) -> List[float]:
+    """Peso de cada idade (0 = hoje) na suavização exponencial, somando 1"""
+    # Sem histórico anterior à janela, os pesos são normalizados para não
+    # subestimar a demanda (correção do valor inicial zero)
+    weights = [alpha * (1 - alpha) ** age for age in range(days)]
+    total = sum(weights)
+    return [weight / total for weight in weights]
+
+def replenishment_item(product: Dict, demand: Tuple[float, float, float], history_days: int) -> Dict:
+    """Ponto de pedido e sugestão de um produto a partir da soma, soma dos quadrados e média suavizada"""
+    total, sum_squares, smoothed = demand
+    lead_time = REPLENISHMENT_CONFIG['lead_time_days']
+    
+    moving_average = total / history_days
+    deviation = math.sqrt(max(sum_squares / history_days - moving_average ** 2, 0))
+    
+    # A média suavizada reage mais rápido a mudanças e é a previsão usada
+    safety_stock = REPLENISHMENT_CONFIG['safety_factor'] * deviation * math.sqrt(lead_time)
+    reorder_point = max(math.ceil(smoothed * lead_time + safety_stock), product.get('min_stock', 0))
+    max_stock = reorder_point + math.ceil(smoothed * REPLENISHMENT_CONFIG['cover_days'])
+    
+    quantity = product.get('quantity', 0)
+    order_quantity = max(max_stock - quantity, 0) if quantity <= reorder_point else 0
+    
+    return {
+        'code': product['code'],
+        'name': product['name'],
+        'supplier': product.get('supplier') or '',
+        'quantity': quantity,
+        'min_stock': product.get('min_stock', 0),
+        'moving_average': moving_average,
+        'smoothed_demand': smoothed,
+        'demand_deviation': deviation,
+        'safety_stock': math.ceil(safety_stock),
+        'reorder_point': reorder_point,
+        'max_stock': max_stock,
+        'days_to_stockout': quantity / smoothed if smoothed > 0 else None,
+        'order_quantity': order_quantity,
+        'order_value': order_quantity * product.get('price', 0)
+    }
+
+def _demand_python(manager, start: date, today: date, weights: List[float]) -> Dict[str, Tuple]:
+    """Soma, soma dos quadrados diários e média suavizada das saídas por código, sem NumPy"""
+    # Totais diários por código: a variância é medida sobre dias, não sobre movimentações;
+    # só as partições mensais da janela são lidas
+    daily = {}
+    for movement in manager.partitions.between(start.isoformat(), today.isoformat()):
+        if normalize_movement_type(movement['type']) != 'saida':
+            continue
+        day_key = movement['date'][:10]
+        days = daily.setdefault(movement['product_code'], {})
+        days[day_key] = days.get(day_key, 0) + movement['quantity']
+    
+    demand = {}
+    for code, days in daily.items():
+        smoothed = sum(
+            quantity * weights[(today - date.fromisoformat(day_key)).days]
+            for day_key, quantity in days.items()
+        )
+        demand[code] = (
+            sum(days.values()),
+            sum(quantity * quantity for quantity in days.values()),
+            smoothed
+        )
+    return demand
+
+def _demand_columnar(manager, columnar, start: date, today: date, weights: List[float]) -> Dict[str, Tuple]:
+    """Os mesmos agregados de _demand_python, em lote sobre colunas NumPy das partições da janela"""
+    history_days = len(weights)
+    epochs, movement_products, quantities, directions = columnar.movement_columns(start.isoformat(), today.isoformat())
+    day_numbers = epochs // 86400
+    today_number = int(np.datetime64(today, 'D').astype(np.int64))
+    
+    mask = directions < 0
+    if not mask.any():
+        return {}
+    
+    products = movement_products[mask]
+    quantities = -quantities[mask]
+    ages = today_number - day_numbers[mask]
+    size = len(columnar.code_list)
+    
+    totals = np.bincount(products, weights=quantities, minlength=size)
+    smoothed = np.bincount(products, weights=quantities * np.asarray(weights)[ages], minlength=size)
+    
+    # Totais por código x dia para a soma dos quadrados diários
+    keys, inverse = np.unique(products.astype(np.int64) * history_days + ages, return_inverse=True)
+    daily = np.bincount(inverse, weights=quantities)
+    sum_squares = np.bincount(keys // history_days, weights=daily * daily, minlength=size)
+    
+    used = np.flatnonzero(totals)
+    return {
+        columnar.code_list[i]: demand
+        for i, demand in zip(used.tolist(), zip(
+            totals[used].tolist(), sum_squares[used].tolist(), smoothed[used].tolist()
+        ))
+    }
+
+def compute_replenishment(manager, history_days: Optional[int] = None,
+                          today: Optional[date] = None) -> Dict:
+    """Previsão de demanda e sugestão de compra de todos os produtos, agrupada por fornecedor"""
+    history_days = history_days or REPLENISHMENT_CONFIG['history_days']
+    today = today or date.today()
+    start = today - timedelta(days=history_days - 1)
+    weights = smoothing_weights(history_days, REPLENISHMENT_CONFIG['smoothing_alpha'])
+    
+    columnar = getattr(manager, 'columnar', None)
+    if columnar is not None:
+        demand = _demand_columnar(manager, columnar, start, today, weights)
+    else:
+        demand = _demand_python(manager, start, today, weights)
+    
+    empty = (0, 0, 0.0)
+    items = [
+        replenishment_item(product, demand.get(product['code'], empty), history_days)
+        for product in manager.products
+    ]
+    
+    # Sugestões por fornecedor; dentro de cada um, o que acaba primeiro vem antes
+    suggestions = [item for item in items if item['order_quantity'] > 0]
+    suggestions.sort(key=lambda item: (
+        item['supplier'],
+        item['days_to_stockout'] if item['days_to_stockout'] is not None else 0
+    ))
+    
+    suppliers = {}
+    for item in suggestions:
+        order = suppliers.setdefault(item['supplier'], {'items': [], 'quantity': 0, 'value': 0})
+        order['items'].append(item)
+        order['quantity'] += item['order_quantity']
+        order['value'] += item['order_value']
+    
+    return {
+        'history_days': history_days,
+        'start': start.isoformat(),
+        'items': items,
+        'suggestions': suggestions,
+        'suppliers': suppliers,
+        'total_order_value': sum(order['value'] for order in suppliers.values())
+    }
\ No newline at end of file
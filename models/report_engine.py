@@ -0,0 +1,152 @@
+"""
+Motor de relatórios: todas as métricas calculadas em uma passada pelos dados
+"""
+
+import heapq
+from datetime import date
+from typing import Dict, Optional
+
+# Quantidades guardadas nas listas "top" do resultado
+TOP_PRODUCTS = 10
+RECENT_MOVEMENTS = 15
+
+def normalize_movement_type(movement_type: str) -> str:
+    """Normaliza o tipo da movimentação ('saída' e 'saida' viram 'saida')"""
+    return 'saida' if movement_type in ('saida', 'saída') else movement_type
+
+def product_value(product: Dict) -> float:
+    """Valor em estoque de um produto"""
+    return product['price'] * product['quantity']
+
+class ReportEngine:
+    """Calcula as métricas dos relatórios e reaproveita o resultado enquanto os dados não mudam"""
+    
+    def __init__(self, manager):
+        self.manager = manager
+        self._data = None
+        self._version = None
+        self._batches = {}
+    
+    def get_data(self) -> Dict:
+        """Métricas de todos os relatórios (recalculadas só quando data_version muda)"""
+        version = getattr(self.manager, 'data_version', None)
+        if self._data is None or version is None or version != self._version:
+            self._data = self._compute()
+            self._version = version
+        return self._data
+    
+    def _get_batch(self, key, compute):
+        """Resultado de um cálculo em lote, guardado por versão dos dados e dia"""
+        version = getattr(self.manager, 'data_version', None)
+        cached = self._batches.get(key)
+        if cached is None or version is None or cached[0] != version or cached[1] != date.today():
+            cached = self._batches[key] = (version, date.today(), compute())
+        return cached[2]
+    
+    def get_stock_analytics(self, period_days: Optional[int] = None) -> Dict:
+        """Curva ABC, giro e cobertura (models/analytics.py), guardados por versão e período"""
+        # Imports locais: analytics e replenishment dependem deste módulo
+        from .analytics import compute_stock_analytics
+        return self._get_batch(
+            ('analytics', period_days), lambda: compute_stock_analytics(self.manager, period_days)
+        )
+    
+    def get_replenishment(self, history_days: Optional[int] = None) -> Dict:
+        """Previsão de demanda e sugestão de compra (models/replenishment.py), guardadas por versão e período"""
+        from .replenishment import compute_replenishment
+        return self._get_batch(
+            ('replenishment', history_days), lambda: compute_replenishment(self.manager, history_days)
+        )
+    
+    def invalidate(self):
+        """Descarta os resultados guardados"""
+        self._data = None
+        self._batches = {}
+    
+    def count_movements_since(self, start: date) -> int:
+        """Movimentações a partir de uma data (somadas dos totais diários)"""
+        return self.manager.rollups.count_since(start)
+    
+    def get_period_days(self, start: date, end: Optional[date] = None) -> Dict[str, Dict]:
+        """Totais diários entre duas datas (inclusive), indexados por AAAA-MM-DD"""
+        return self.manager.rollups.days(start, end)
+    
+    def _compute(self) -> Dict:
+        """Métricas de produtos (NumPy quando disponível) e de movimentações (totais e partições recentes)"""
+        threshold = self.manager.settings.get('low_stock_threshold', 5)
+        
+        columnar = getattr(self.manager, 'columnar', None)
+        if columnar is not None:
+            data = self._compute_products_columnar(columnar, threshold)
+        else:
+            data = self._compute_products(threshold)
+        
+        totals = self.manager.rollups.totals()
+        data.update({
+            'threshold': threshold,
+            'total_movements': self.manager.archive.count + self.manager.partitions.count,
+            'by_type': {'entrada': totals['entradas'], 'saida': totals['saidas']},
+            'recent_movements': self.manager.partitions.recent(RECENT_MOVEMENTS)
+        })
+        return data
+    
+    def _compute_products(self, threshold: int) -> Dict:
+        """Uma passada pelos produtos"""
+        total_items = 0
+        total_value = 0
+        out_of_stock = 0
+        low_stock = []
+        categories = {}
+        suppliers = {}
+        product_names = {}
+        
+        for product in self.manager.products:
+            quantity = product['quantity']
+            value = product['price'] * quantity
+            
+            total_items += quantity
+            total_value += value
+            product_names[product['code']] = product['name']
+            
+            if quantity == 0:
+                out_of_stock += 1
+            if quantity <= threshold:
+                low_stock.append(product)
+            
+            for groups, key in ((categories, product.get('category') or ''),
+                                (suppliers, product.get('supplier') or '')):
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = {'count': 0, 'quantity': 0, 'value': 0, 'products': []}
+                group['count'] += 1
+                group['quantity'] += quantity
+                group['value'] += value
+                group['products'].append(product)
+        
+        return {
+            'total_products': len(self.manager.products),
+            'total_items': total_items,
+            'total_value': total_value,
+            'out_of_stock_count': out_of_stock,
+            'low_stock': sorted(low_stock, key=lambda p: p['quantity']),
+            'categories': categories,
+            'suppliers': suppliers,
+            'top_products': heapq.nlargest(TOP_PRODUCTS, self.manager.products, key=product_value),
+            'product_names': product_names
+        }
+    
+    def _compute_products_columnar(self, columnar, threshold: int) -> Dict:
+        """As mesmas métricas de _compute_products, calculadas sobre as colunas NumPy"""
+        totals = columnar.product_totals(threshold)
+        
+        return {
+            'total_products': totals['total_products'],
+            'total_items': totals['total_items'],
+            'total_value': totals['total_value'],
+            'out_of_stock_count': totals['out_of_stock_count'],
+            'low_stock': columnar.low_stock_products(threshold),
+            'categories': columnar.group_products('category'),
+            'suppliers': columnar.group_products('supplier'),
+            'top_products': columnar.top_products(TOP_PRODUCTS),
+            'product_names': {p['code']: p['name'] for p in columnar.products}
+        }
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Totais de movimentações agrupados por dia e por mês
+"""
+
+from datetime import date
+from typing import Dict, List, Optional
+from .report_engine import normalize_movement_type
+
+def new_bucket() -> Dict:
+    """Totais zerados de um período"""
+    return {
+        'entradas': 0,
+        'saidas': 0,
+        'quantity_in': 0,
+        'quantity_out': 0,
+        'value': 0
+    }
+
+class MovementRollups:
+    """Totais por dia (AAAA-MM-DD) e por mês (AAAA-MM), atualizados a cada movimentação"""
+    
+    def __init__(self):
+        self.daily = {}
+        self.monthly = {}
+    
+    def rebuild(self, movements: List[Dict], products: List[Dict]):
+        """Recalcula todos os totais a partir da lista de movimentações (preço atual só para as sem unit_price)"""
+        prices = {p['code']: p.get('price', 0) for p in products}
+        self.daily = {}
+        self.monthly = {}
+        for movement in movements:
+            self.add(movement, prices.get(movement['product_code'], 0))
+    
+    def add(self, movement: Dict, price: float = 0):
+        """Soma uma movimentação nos totais do dia e do mês; o valor usa o unit_price gravado nela
+        e price apenas para movimentações antigas, registradas sem preço"""
+        movement_type = normalize_movement_type(movement['type'])
+        if movement_type not in ('entrada', 'saida'):
+            return
+        
+        # A chave AAAA-MM-DD sai do texto ISO sem converter para datetime
+        day_key = movement['date'][:10]
+        quantity = movement['quantity']
+        price = movement.get('unit_price', price)
+        
+        for buckets, key in ((self.daily, day_key), (self.monthly, day_key[:7])):
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = new_bucket()
+            if movement_type == 'entrada':
+                bucket['entradas'] += 1
+                bucket['quantity_in'] += quantity
+            else:
+                bucket['saidas'] += 1
+                bucket['quantity_out'] += quantity
+            bucket['value'] += quantity * price
+    
+    def merge(self, daily: Dict[str, Dict]):
+        """Soma totais diários já calculados (ex.: de movimentações arquivadas) aos dias e meses"""
+        for day_key, totals in daily.items():
+            for buckets, key in ((self.daily, day_key), (self.monthly, day_key[:7])):
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = new_bucket()
+                for field, value in totals.items():
+                    bucket[field] += value
+    
+    def day(self, day: date) -> Dict:
+        """Totais de um dia"""
+        return self.daily.get(day.isoformat()) or new_bucket()
+    
+    def month(self, year: int, month: int) -> Dict:
+        """Totais de um mês"""
+        return self.monthly.get(f"{year:04d}-{month:02d}") or new_bucket()
+    
+    def days(self, start: date, end: Optional[date] = None) -> Dict[str, Dict]:
+        """Totais diários entre duas datas (inclusive), indexados por AAAA-MM-DD"""
+        start_key = start.isoformat()
+        end_key = end.isoformat() if end else '9999-12-31'
+        return {
+            key: bucket for key, bucket in self.daily.items()
+            if start_key <= key <= end_key
+        }
+    
+    def count_since(self, start: date) -> int:
+        """Quantidade de movimentações a partir de uma data"""
+        return sum(bucket['entradas'] + bucket['saidas'] for bucket in self.days(start).values())
+    
+    def totals(self) -> Dict:
+        """Totais de todo o histórico (somados dos meses)"""
+        result = new_bucket()
+        for bucket in self.monthly.values():
+            for key, value in bucket.items():
+                result[key] += value
+        return result
\ No newline at end of file
@@ -8,6 +8,7 @@ from PyQt5.QtCore import QObject, pyqtSignal
 
 from config import *
 from utils import load_json_data, save_json_data, create_directory
+from .columnar import ColumnarStore, numpy_available
 
 class InventoryManager(QObject):
     """Main inventory manager with PyQt5 signals"""
@@ -32,6 +33,10 @@ class InventoryManager(QObject):
     
     def __init__(self):
         super().__init__()
+        
+        # NumPy mirror of products and movements for the dashboard (only when NumPy is installed)
+        self.columnar = ColumnarStore(self) if numpy_available() else None
+        
         self.create_data_directories()
         self.load_all_data()
     
@@ -92,6 +97,8 @@ class InventoryManager(QObject):
         # Update product data
         product.update(updates)
         product['updated_at'] = datetime.now().isoformat()
+        if self.columnar is not None:
+            self.columnar.update_product(product)
         
         # Check if quantity changed and record movement
         new_quantity = product.get('quantity', 0)
@@ -204,6 +211,12 @@ class InventoryManager(QObject):
         """Get all movements"""
         return sorted(self.movements, key=lambda x: x['date'], reverse=True)
     
+    def get_recent_movements(self, limit: int) -> List[Dict]:
+        """Get the most recent movements, newest first"""
+        if self.columnar is not None:
+            return self.columnar.recent_movements(limit)
+        return self.get_all_movements()[:limit]
+    
     # SUPPLIER MANAGEMENT
     def add_supplier(self, supplier_data: Dict) -> bool:
         """Add new supplier"""
@@ -277,10 +290,18 @@ class InventoryManager(QObject):
     # DASHBOARD STATISTICS
     def get_dashboard_stats(self) -> Dict:
         """Get dashboard statistics"""
-        total_products = len(self.products)
-        total_items = self.get_total_items_count()
-        total_value = self.get_total_inventory_value()
-        low_stock_count = len(self.get_low_stock_products())
+        if self.columnar is not None:
+            # Vectorized totals over the NumPy columns
+            totals = self.columnar.product_totals(self.settings.get('low_stock_threshold', 5))
+            total_products = totals['total_products']
+            total_items = totals['total_items']
+            total_value = totals['total_value']
+            low_stock_count = totals['low_stock_count']
+        else:
+            total_products = len(self.products)
+            total_items = self.get_total_items_count()
+            total_value = self.get_total_inventory_value()
+            low_stock_count = len(self.get_low_stock_products())
         
         return {
             'total_products': total_products,
@@ -0,0 +1,162 @@
+"""
+Columnar (NumPy) mirror of the products and movements for vectorized dashboard statistics
+"""
+
+from typing import Dict, List
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Rows added to the arrays each time they grow
+CHUNK_SIZE = 65536
+
+# Numeric product columns accepted by percentiles
+PRODUCT_COLUMNS = ('price', 'quantity', 'min_stock', 'value')
+
+def numpy_available() -> bool:
+    """Check whether NumPy is installed"""
+    return np is not None
+
+def _grow(arrays: Dict, used: int, size: int) -> Dict:
+    """The same arrays with room for size rows, grown in CHUNK_SIZE blocks"""
+    capacity = len(next(iter(arrays.values())))
+    if size <= capacity:
+        return arrays
+    
+    capacity = max(size, capacity * 2, CHUNK_SIZE)
+    grown = {}
+    for name, old in arrays.items():
+        new = np.zeros(capacity, dtype=old.dtype)
+        new[:used] = old[:used]
+        grown[name] = new
+    return grown
+
+class ColumnarStore:
+    """Manager products and movements held in NumPy arrays"""
+    
+    def __init__(self, manager):
+        if np is None:
+            raise RuntimeError("NumPy is not installed")
+        
+        self.manager = manager
+        
+        # Product rows follow the manager list as it grows and are refreshed one at a time
+        # by update_product; only a new list (delete, load) rebuilds them
+        self.reset_products()
+        
+        # Movement dates only grow with add_movement; a new list (load) starts over
+        self._movements_source = None
+        self.movement_count = 0
+        self._epochs = np.zeros(0, dtype=np.int64)
+    
+    # SYNC
+    def reset_products(self):
+        """Empty the product columns; they are rebuilt on next use"""
+        self._products_source = None
+        self.products = []
+        self._rows = {}
+        self._product_arrays = {
+            'price': np.zeros(0, dtype=np.float64),
+            'quantity': np.zeros(0, dtype=np.int64),
+            'min_stock': np.zeros(0, dtype=np.int64)
+        }
+    
+    def _set_row(self, row: int, product: Dict):
+        """Write one product into a row of the columns"""
+        self._product_arrays['price'][row] = product.get('price', 0)
+        self._product_arrays['quantity'][row] = product.get('quantity', 0)
+        self._product_arrays['min_stock'][row] = product.get('min_stock', 0)
+    
+    def _sync_products(self):
+        """Append the manager's new products; a replaced list is rebuilt"""
+        products = self.manager.products
+        if products is not self._products_source or len(products) < len(self.products):
+            self.reset_products()
+            self._products_source = products
+        
+        start = len(self.products)
+        if len(products) == start:
+            return
+        
+        self._product_arrays = _grow(self._product_arrays, start, len(products))
+        for row in range(start, len(products)):
+            self._rows[products[row]['code']] = row
+            self._set_row(row, products[row])
+        self.products.extend(products[start:])
+    
+    def update_product(self, product: Dict):
+        """Refresh the row of a product changed in place"""
+        self._sync_products()
+        row = self._rows.get(product['code'])
+        if row is not None:
+            self._set_row(row, product)
+    
+    def _sync_movements(self):
+        """Convert only the movements appended since the last sync"""
+        movements = self.manager.movements
+        if movements is not self._movements_source or len(movements) < self.movement_count:
+            self._movements_source = movements
+            self.movement_count = 0
+        
+        total = len(movements)
+        if total == self.movement_count:
+            return
+        
+        self._epochs = _grow({'epochs': self._epochs}, self.movement_count, total)['epochs']
+        for start in range(self.movement_count, total, CHUNK_SIZE):
+            chunk = movements[start:start + CHUNK_SIZE]
+            end = start + len(chunk)
+            
+            # NumPy parses the ISO text (without fractional seconds) straight into datetime64
+            self._epochs[start:end] = np.array([m['date'][:19] for m in chunk], dtype='datetime64[s]').astype(np.int64)
+            self.movement_count = end
+    
+    def _view(self, name: str):
+        """Used part of a product column"""
+        self._sync_products()
+        return self._product_arrays[name][:len(self.products)]
+    
+    def column(self, name: str):
+        """Numeric product column ('value' = price x quantity)"""
+        if name not in PRODUCT_COLUMNS:
+            raise ValueError(f"Unknown column: {name}")
+        if name == 'value':
+            return self._view('price') * self._view('quantity')
+        return self._view(name)
+    
+    # STATISTICS
+    def product_totals(self, threshold: int) -> Dict:
+        """Stock totals; low_stock_count uses the global threshold, below_min_count each product's minimum"""
+        price, quantity, min_stock = self._view('price'), self._view('quantity'), self._view('min_stock')
+        return {
+            'total_products': len(self.products),
+            'total_items': int(quantity.sum()),
+            'total_value': float((price * quantity).sum()),
+            'low_stock_count': int((quantity <= threshold).sum()),
+            'out_of_stock_count': int((quantity == 0).sum()),
+            'below_min_count': int(((quantity > 0) & (quantity <= min_stock)).sum())
+        }
+    
+    def percentiles(self, column: str, q=(25, 50, 75, 90)) -> Dict:
+        """Percentiles of a product column"""
+        values = self.column(column)
+        if not len(values):
+            return {p: 0.0 for p in q}
+        return dict(zip(q, (float(v) for v in np.percentile(values, q))))
+    
+    def recent_movements(self, limit: int) -> List[Dict]:
+        """The most recent movements, newest first, without sorting the whole list"""
+        self._sync_movements()
+        epochs = self._epochs[:self.movement_count]
+        if limit <= 0 or not len(epochs):
+            return []
+        
+        # Every movement from the second of the limit-th newest on (ties included), then the exact order
+        if limit < len(epochs):
+            candidates = np.flatnonzero(epochs >= np.partition(epochs, len(epochs) - limit)[len(epochs) - limit])
+        else:
+            candidates = np.arange(len(epochs))
+        movements = [self._movements_source[i] for i in candidates]
+        return sorted(movements, key=lambda x: x['date'], reverse=True)[:limit]
\ No newline at end of file
@@ -300,7 +300,7 @@ class DashboardView(QWidget):
                 child.setParent(None)
         
         # Get recent movements
-        recent_movements = self.inventory_manager.get_all_movements()[:5]  # Last 5 movements
+        recent_movements = self.inventory_manager.get_recent_movements(5)  # Last 5 movements
         
         if not recent_movements:
             no_activity_label = QLabel("Nenhuma atividade recente")
@@ -21,7 +21,9 @@ for directory in [DATA_DIR, LOGS_DIR, EXPORTS_DIR, BACKUPS_DIR, ASSETS_DIR]:
 # Configurações do banco de dados
 DATABASE_CONFIG = {
     'name': 'estoque.db',
-    'path': DATA_DIR / 'estoque.db'
+    'path': DATA_DIR / 'estoque.db',
+    'instrumentacao': True,  # medir tempo e linhas de cada query
+    'consulta_lenta_ms': 200  # queries acima deste tempo vão para o log com o plano
 }
 
 # Configurações da aplicação
@@ -45,12 +47,44 @@ LOGGING_CONFIG = {
 # Configurações de exportação
 EXPORT_CONFIG = {
     'formats': ['xlsx', 'csv', 'pdf'],
-    'default_format': 'xlsx'
+    'default_format': 'xlsx',
+    'comprimir_csv': False,  # gravar CSV como .csv.gz
+    'intervalo_progresso': 1000,  # linhas entre avisos de progresso
+    'exportacoes_simultaneas': 2
+}
+
+# Análise de estoque (curva ABC, giro, cobertura e estoque parado)
+ANALISE_CONFIG = {
+    'periodo_dias': 365,  # janela de consumo analisada
+    'fatia_classe_a': 0.80,  # fatia acumulada do valor consumido que forma a classe A
+    'fatia_classe_b': 0.95,  # até aqui, classe B; o restante é C
+    'dias_estoque_parado': 180  # dias sem saída para considerar o estoque parado
+}
+
+# Reposição (previsão de demanda, ponto de pedido e sugestão de compra)
+REPOSICAO_CONFIG = {
+    'historico_dias': 90,  # dias de saídas usados na previsão
+    'alfa_suavizacao': 0.2,  # peso do dia mais recente na suavização exponencial
+    'prazo_entrega_dias': 7,  # dias entre o pedido e a chegada
+    'cobertura_dias': 30,  # dias de demanda cobertos por pedido, além do ponto de pedido
+    'fator_seguranca': 1.65  # desvios-padrão do estoque de segurança (1,65 ≈ 95% de atendimento)
 }
 
 # Configurações de backup
 BACKUP_CONFIG = {
     'auto_backup': True,
     'backup_interval': 24,  # horas
-    'max_backups': 30
+    'max_backups': 30,
+    'comprimir': True,  # gzip dos arquivos de backup
+    'retencao_diaria': 7,  # dias com um backup mantido (filhos)
+    'retencao_semanal': 4,  # semanas com um backup mantido (pais)
+    'retencao_mensal': 12,  # meses com um backup mantido (avôs)
+    'paginas_por_passo': 1024,  # páginas copiadas por passo da API de backup
+    'pausa_entre_passos': 0.005  # segundos livres para gravações entre passos
+}
+
+# Arquivamento de movimentações antigas (python manutencao.py arquivar)
+ARQUIVO_CONFIG = {
+    'nome': 'arquivo.db',  # banco de arquivo, criado ao lado do banco principal
+    'horizonte_meses': 24  # meses de movimentações mantidos no banco principal
 } 
\ No newline at end of file
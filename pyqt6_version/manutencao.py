@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comandos de manutenção do banco de dados do sistema de controle de estoque
+
+Uso:
+    python manutencao.py verificar-saldos [--corrigir]
+    python manutencao.py reconstruir-resumos
+    python manutencao.py relatorios [--formatos xlsx csv pdf] [--inicio AAAA-MM-DD] [--fim AAAA-MM-DD]
+    python manutencao.py arquivar [--meses N] [--compactar]
+"""
+
+import sys
+import time
+import argparse
+from datetime import date, datetime
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config.settings import EXPORTS_DIR, EXPORT_CONFIG, ARQUIVO_CONFIG
+from utils.database import DatabaseManager
+from utils.export import ExportManager, criar_snapshot, exportar_snapshot
+from utils.logger import setup_logger
+from models.produto import Produto
+from models.movimentacao import Movimentacao
+
+def comando_verificar_saldos(args):
+    """Recalcular saldos a partir do histórico e relatar divergências"""
+    db_manager = DatabaseManager()
+    db_manager.initialize_database()
+    
+    divergencias = db_manager.verificar_saldos(corrigir=args.corrigir)
+    
+    if not divergencias:
+        print("✓ Todos os saldos conferem com o histórico de movimentações")
+        return 0
+    
+    print(f"{'Código':<15} {'Produto':<35} {'Atual':>10} {'Histórico':>10} {'Diferença':>10}")
+    print("-" * 84)
+    for item in divergencias:
+        print(f"{item['codigo']:<15} {item['nome'][:35]:<35} "
+              f"{item['estoque_atual']:>10} {item['saldo_calculado']:>10} {item['diferenca']:>10}")
+    print("-" * 84)
+    
+    if args.corrigir:
+        corrigidos = sum(1 for item in divergencias if item['corrigido'])
+        print(f"✓ {corrigidos} saldo(s) corrigido(s) a partir do histórico")
+        if corrigidos < len(divergencias):
+            print(f"⚠ {len(divergencias) - corrigidos} saldo(s) não corrigido(s): o histórico resultaria em estoque negativo")
+            return 1
+        return 0
+    
+    print(f"⚠ {len(divergencias)} produto(s) com saldo divergente (use --corrigir para ajustar)")
+    return 1
+
+def comando_reconstruir_resumos(args):
+    """Regenerar as tabelas de resumo diário/mensal a partir do histórico"""
+    db_manager = DatabaseManager()
+    db_manager.initialize_database()
+    
+    totais = db_manager.reconstruir_resumos()
+    
+    print(f"✓ Resumos reconstruídos: {totais['diario']} linha(s) diárias, {totais['mensal']} mensais")
+    return 0
+
+def comando_relatorios(args):
+    """Gerar os relatórios de produtos e movimentações em vários formatos, em paralelo"""
+    db_manager = DatabaseManager()
+    db_manager.initialize_database()
+    
+    inicio = time.perf_counter()
+    export_manager = ExportManager()
+    produto_model = Produto()
+    movimentacao_model = Movimentacao()
+    
+    # Dados lidos uma única vez; cada formato recebe o mesmo snapshot serializado
+    consulta_movimentacoes = movimentacao_model.filtrar(args.inicio, args.fim)
+    relatorios = [
+        ('relatorio_produtos', 'Relatório de Produtos', criar_snapshot(
+            map(export_manager.linha_produto, produto_model.filtrar().iterar(ordem="p.nome"))
+        )),
+        ('relatorio_movimentacoes', 'Relatório de Movimentações', criar_snapshot(
+            map(export_manager.linha_movimentacao, (
+                mov for pagina in movimentacao_model.iterar_paginas(consulta_movimentacoes)
+                for mov in pagina
+            ))
+        )),
+    ]
+    tempo_leitura = time.perf_counter() - inicio
+    
+    destino = EXPORTS_DIR / datetime.now().strftime('%Y-%m-%d')
+    destino.mkdir(parents=True, exist_ok=True)
+    
+    for nome, _, (_, linhas) in relatorios:
+        if not linhas:
+            print(f"- {nome}: sem dados, não gerado")
+    
+    resultados = []
+    falhas = 0
+    with ProcessPoolExecutor(max_workers=args.processos) as executor:
+        futuros = {
+            executor.submit(exportar_snapshot, str(destino), formato, nome, titulo, snapshot): (nome, formato)
+            for nome, titulo, (snapshot, linhas) in relatorios if linhas
+            for formato in args.formatos
+        }
+        for futuro in as_completed(futuros):
+            nome, formato = futuros[futuro]
+            try:
+                resultados.append((nome, formato, futuro.result()))
+            except Exception as e:
+                falhas += 1
+                print(f"✗ {nome} ({formato}): {e}")
+    
+    print(f"{'Relatório':<25} {'Formato':<8} {'Linhas':>8} {'Tempo (s)':>10}  Arquivo")
+    print("-" * 84)
+    for nome, formato, resultado in sorted(resultados, key=lambda r: (r[0], r[1])):
+        print(f"{nome:<25} {formato:<8} {resultado['linhas']:>8} {resultado['segundos']:>10.2f}  "
+              f"{Path(resultado['arquivo']).name}")
+    print("-" * 84)
+    print(f"Leitura dos dados: {tempo_leitura:.2f}s | Total: {time.perf_counter() - inicio:.2f}s")
+    print(f"✓ {len(resultados)} arquivo(s) gerado(s) em {destino}")
+    
+    return 1 if falhas else 0
+
+def comando_arquivar(args):
+    """Mover as movimentações anteriores ao horizonte para o banco de arquivo"""
+    db_manager = DatabaseManager()
+    db_manager.initialize_database()
+    
+    # Corte no primeiro dia do mês: meses inteiros ficam no arquivo
+    hoje = date.today()
+    mes = hoje.year * 12 + hoje.month - 1 - args.meses
+    corte = date(mes // 12, mes % 12 + 1, 1)
+    
+    resultado = db_manager.arquivar_movimentacoes(corte, compactar=args.compactar)
+    
+    if not resultado['movimentacoes']:
+        print(f"- Nenhuma movimentação anterior a {corte.strftime('%d/%m/%Y')} para arquivar")
+        return 0
+    
+    print(f"✓ {resultado['movimentacoes']} movimentação(ões) anteriores a {corte.strftime('%d/%m/%Y')} "
+          f"arquivada(s) em {db_manager.arquivo_path}")
+    print(f"✓ Saldo inicial registrado para {resultado['produtos']} produto(s)")
+    return 0
+
+def main():
+    """Função principal"""
+    setup_logger()
+    
+    parser = argparse.ArgumentParser(description="Manutenção do banco de dados de estoque")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+    
+    parser_saldos = subparsers.add_parser(
+        'verificar-saldos',
+        help='Recalcula os saldos a partir das movimentações e relata divergências'
+    )
+    parser_saldos.add_argument(
+        '--corrigir', action='store_true',
+        help='Grava o saldo recalculado nos produtos divergentes'
+    )
+    parser_saldos.set_defaults(func=comando_verificar_saldos)
+    
+    parser_resumos = subparsers.add_parser(
+        'reconstruir-resumos',
+        help='Regenera as tabelas de resumo diário e mensal a partir das movimentações'
+    )
+    parser_resumos.set_defaults(func=comando_reconstruir_resumos)
+    
+    parser_relatorios = subparsers.add_parser(
+        'relatorios',
+        help='Gera os relatórios de produtos e movimentações em todos os formatos, em paralelo'
+    )
+    parser_relatorios.add_argument(
+        '--formatos', nargs='+', choices=EXPORT_CONFIG['formats'], default=EXPORT_CONFIG['formats'],
+        help='Formatos a gerar (padrão: todos)'
+    )
+    parser_relatorios.add_argument('--inicio', help='Data inicial das movimentações (AAAA-MM-DD)')
+    parser_relatorios.add_argument('--fim', help='Data final das movimentações (AAAA-MM-DD)')
+    parser_relatorios.add_argument(
+        '--processos', type=int, default=None,
+        help='Processos em paralelo (padrão: número de CPUs)'
+    )
+    parser_relatorios.set_defaults(func=comando_relatorios)
+    
+    parser_arquivar = subparsers.add_parser(
+        'arquivar',
+        help='Move as movimentações antigas para o banco de arquivo, mantendo saldos e resumos'
+    )
+    parser_arquivar.add_argument(
+        '--meses', type=int, default=ARQUIVO_CONFIG['horizonte_meses'],
+        help=f"Meses mantidos no banco principal (padrão: {ARQUIVO_CONFIG['horizonte_meses']})"
+    )
+    parser_arquivar.add_argument(
+        '--compactar', action='store_true',
+        help='Executa VACUUM no banco principal depois de arquivar'
+    )
+    parser_arquivar.set_defaults(func=comando_arquivar)
+    
+    args = parser.parse_args()
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
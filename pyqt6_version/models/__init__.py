@@ -8,5 +8,7 @@ from .categoria import Categoria
 from .fornecedor import Fornecedor
 from .movimentacao import Movimentacao
 from .usuario import Usuario
+from .indicadores import Indicadores
+from .reposicao import Reposicao
 
-__all__ = ['Produto', 'Categoria', 'Fornecedor', 'Movimentacao', 'Usuario'] 
\ No newline at end of file
+__all__ = ['Produto', 'Categoria', 'Fornecedor', 'Movimentacao', 'Usuario', 'Indicadores', 'Reposicao'] 
\ No newline at end of file
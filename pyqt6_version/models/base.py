@@ -4,17 +4,131 @@ Classe base para modelos de dados
 """
 
 from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
 from utils.database import DatabaseManager
 import logging
 
 logger = logging.getLogger(__name__)
 
+class Consulta:
+    """Consulta composta: filtros viram condições WHERE parametrizadas"""
+    
+    def __init__(self, model, sql=None):
+        self.model = model
+        # SELECT base: o do modelo, salvo quando a consulta lê outra origem (ex.: histórico arquivado)
+        self.sql = sql or model.sql_consulta
+        self.condicoes = []
+        self.params = []
+    
+    def onde(self, condicao, *params):
+        """Adicionar condição SQL com seus parâmetros"""
+        self.condicoes.append(condicao)
+        self.params.extend(params)
+        return self
+    
+    def igual(self, coluna, valor):
+        """coluna = valor (ignorado quando o valor não foi informado)"""
+        if valor is None or valor == '':
+            return self
+        return self.onde(f"{coluna} = ?", valor)
+    
+    def periodo(self, coluna, inicio=None, fim=None):
+        """Datas entre início e fim inclusive, como intervalo [início, dia seguinte ao fim)"""
+        # Comparar a coluna diretamente (sem DATE()) permite usar o índice
+        if inicio:
+            self.onde(f"{coluna} >= ?", _como_data(inicio).isoformat())
+        if fim:
+            self.onde(f"{coluna} < ?", (_como_data(fim) + timedelta(days=1)).isoformat())
+        return self
+    
+    def contem(self, colunas, termo):
+        """Alguma das colunas contém o termo (LIKE)"""
+        if not termo:
+            return self
+        condicao = " OR ".join(f"{coluna} LIKE ?" for coluna in colunas)
+        return self.onde(f"({condicao})", *[f"%{termo}%" for _ in colunas])
+    
+    def combinar(self, outra):
+        """Acrescentar as condições (e adotar o SELECT base) de outra consulta"""
+        self.sql = outra.sql
+        self.condicoes.extend(outra.condicoes)
+        self.params.extend(outra.params)
+        return self
+    
+    def where(self):
+        """Cláusula WHERE e parâmetros"""
+        if not self.condicoes:
+            return "", []
+        return " WHERE " + " AND ".join(self.condicoes), list(self.params)
+    
+    def executar(self, ordem=None, limite=None):
+        """Executar sobre o SELECT base do modelo e retornar dicionários"""
+        where, params = self.where()
+        query = self.sql + where
+        if ordem:
+            query += f" ORDER BY {ordem}"
+        if limite:
+            query += " LIMIT ?"
+            params.append(limite)
+        
+        results = self.model.db_manager.execute_query(query, params)
+        return [dict(row) for row in results]
+    
+    def iterar(self, ordem=None, lote=500):
+        """Gerar dicionários lidos de um cursor aberto, lote a lote"""
+        where, params = self.where()
+        query = self.sql + where
+        if ordem:
+            query += f" ORDER BY {ordem}"
+        
+        cursor = self.model.db_manager.abrir_cursor(query, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(lote)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.connection.close()
+    
+    def contar(self):
+        """Quantidade de registros que atendem aos filtros"""
+        where, params = self.where()
+        query = f"SELECT COUNT(*) FROM ({self.sql + where})"
+        return self.model.db_manager.execute_query(query, params)[0][0]
+
+def _como_data(valor):
+    """Aceitar date, datetime ou texto AAAA-MM-DD"""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor)[:10])
+
 class BaseModel(ABC):
     """Classe base para todos os modelos"""
     
+    # Callbacks chamados após gravações, por tabela (compartilhados entre instâncias)
+    _observadores = {}
+    
     def __init__(self):
         self.db_manager = DatabaseManager()
     
+    @classmethod
+    def observar(cls, tabela, callback):
+        """Registrar callback(tabela) chamado após gravações na tabela"""
+        BaseModel._observadores.setdefault(tabela, []).append(callback)
+    
+    def _notificar_escrita(self, tabela=None):
+        """Avisar os observadores de que a tabela foi alterada"""
+        tabela = tabela or self.table_name
+        for callback in BaseModel._observadores.get(tabela, []):
+            try:
+                callback(tabela)
+            except Exception as e:
+                logger.error(f"Erro ao notificar gravação em {tabela}: {e}")
+    
     @property
     @abstractmethod
     def table_name(self):
@@ -27,6 +141,15 @@ class BaseModel(ABC):
         """Campos da tabela"""
         pass
     
+    @property
+    def sql_consulta(self):
+        """SELECT base das consultas compostas (modelos podem incluir JOINs)"""
+        return f"SELECT * FROM {self.table_name}"
+    
+    def consulta(self, sql=None):
+        """Nova consulta composta sobre o modelo (ou sobre outro SELECT base)"""
+        return Consulta(self, sql)
+    
     def save(self, data):
         """Salvar registro no banco"""
         try:
@@ -50,7 +173,9 @@ class BaseModel(ABC):
         self.db_manager.execute_query(query, values)
         
         # Retornar o ID do registro criado
-        return self.db_manager.execute_query("SELECT last_insert_rowid()")[0][0]
+        record_id = self.db_manager.execute_query("SELECT last_insert_rowid()")[0][0]
+        self._notificar_escrita()
+        return record_id
     
     def update(self, record_id, data):
         """Atualizar registro existente"""
@@ -60,12 +185,16 @@ class BaseModel(ABC):
         
         query = f"UPDATE {self.table_name} SET {set_clause} WHERE id = ?"
         
-        return self.db_manager.execute_query(query, values)
+        result = self.db_manager.execute_query(query, values)
+        self._notificar_escrita()
+        return result
     
     def delete(self, record_id):
         """Excluir registro"""
         query = f"DELETE FROM {self.table_name} WHERE id = ?"
-        return self.db_manager.execute_query(query, [record_id])
+        result = self.db_manager.execute_query(query, [record_id])
+        self._notificar_escrita()
+        return result
     
     def get_by_id(self, record_id):
         """Buscar registro por ID"""
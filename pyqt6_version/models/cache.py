@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Cache em memória dos dados de referência (categorias, fornecedores)
+"""
+
+from config.settings import DATABASE_CONFIG
+from .base import BaseModel
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CacheReferencia:
+    """Cache de leitura com invalidação por gravação e por versão das tabelas"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dados = {}
+        self._geracao = 0
+        self._versao = None
+        self._versoes_tabelas = {}
+        self._conexao = None
+        self.acertos = 0
+        self.falhas = 0
+    
+    def obter(self, chave, carregar):
+        """Retornar os dados da chave ((tabela, ...)), carregando na primeira vez"""
+        with self._lock:
+            self._verificar_versao()
+            if chave in self._dados:
+                self.acertos += 1
+                return [dict(registro) for registro in self._dados[chave]]
+            self.falhas += 1
+            geracao = self._geracao
+        
+        dados = carregar()
+        
+        # Uma invalidação durante a carga torna o resultado velho: não guardar
+        with self._lock:
+            if self._geracao == geracao:
+                self._dados[chave] = dados
+        return [dict(registro) for registro in dados]
+    
+    def invalidar(self, tabela=None):
+        """Descartar os dados de uma tabela (ou de todas)"""
+        with self._lock:
+            self._descartar(tabela)
+    
+    def _descartar(self, tabela=None):
+        """Descartar os dados de uma tabela (ou de todas), com o lock já obtido"""
+        self._geracao += 1
+        if tabela is None:
+            self._dados.clear()
+        else:
+            for chave in [chave for chave in self._dados if chave[0] == tabela]:
+                del self._dados[chave]
+    
+    def estatisticas(self):
+        """Contadores de acertos e falhas"""
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / total if total else 0.0,
+                'entradas': len(self._dados)
+            }
+    
+    def zerar_contadores(self):
+        """Zerar os contadores de acertos e falhas"""
+        with self._lock:
+            self.acertos = 0
+            self.falhas = 0
+    
+    def _verificar_versao(self):
+        """Descartar as tabelas que outro processo alterou"""
+        # Gravações deste processo chegam pelos observadores do BaseModel. PRAGMA
+        # data_version muda a cada gravação de outra conexão (inclusive as das outras
+        # threads daqui, em qualquer tabela); só então a versão de cada tabela de
+        # referência, mantida por triggers, é lida e comparada
+        try:
+            if self._conexao is None:
+                self._conexao = sqlite3.connect(str(DATABASE_CONFIG['path']), check_same_thread=False)
+            versao = self._conexao.execute("PRAGMA data_version").fetchone()[0]
+            if versao == self._versao:
+                return
+            versoes = dict(self._conexao.execute("SELECT tabela, versao FROM versoes_tabelas").fetchall())
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao verificar versão do banco: {e}")
+            self._descartar()
+            return
+        
+        self._versao = versao
+        for tabela, versao_tabela in versoes.items():
+            if self._versoes_tabelas.get(tabela) != versao_tabela:
+                self._descartar(tabela)
+        self._versoes_tabelas = versoes
+
+# Cache compartilhado por todas as instâncias dos modelos
+cache_referencia = CacheReferencia()
+
+for _tabela in ('categorias', 'fornecedores'):
+    BaseModel.observar(_tabela, cache_referencia.invalidar)
\ No newline at end of file
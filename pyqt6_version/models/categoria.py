@@ -4,6 +4,7 @@ Modelo de dados para categorias
 """
 
 from .base import BaseModel
+from .cache import cache_referencia
 
 class Categoria(BaseModel):
     """Modelo para categorias"""
@@ -16,6 +17,12 @@ class Categoria(BaseModel):
     def fields(self):
         return ['nome', 'descricao', 'ativo', 'data_criacao']
     
+    def get_all(self, active_only=True):
+        """Buscar todas as categorias (cache de dados de referência)"""
+        return cache_referencia.obter(
+            ('categorias', active_only), lambda: super(Categoria, self).get_all(active_only)
+        )
+    
     def existe_nome(self, nome, categoria_id=None):
         """Verificar se nome já existe"""
         if categoria_id:
@@ -4,6 +4,7 @@ Modelo de dados para fornecedores
 """
 
 from .base import BaseModel
+from .cache import cache_referencia
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,12 @@ class Fornecedor(BaseModel):
             'cep', 'contato', 'observacoes', 'ativo', 'data_criacao'
         ]
     
+    def get_all(self, active_only=True):
+        """Buscar todos os fornecedores (cache de dados de referência)"""
+        return cache_referencia.obter(
+            ('fornecedores', active_only), lambda: super(Fornecedor, self).get_all(active_only)
+        )
+    
     def get_by_cnpj(self, cnpj):
         """Buscar fornecedor por CNPJ"""
         query = "SELECT * FROM fornecedores WHERE cnpj = ? AND ativo = 1"
@@ -42,9 +49,12 @@ class Fornecedor(BaseModel):
     
     def get_fornecedores_ativos(self):
         """Buscar apenas fornecedores ativos"""
-        query = "SELECT * FROM fornecedores WHERE ativo = 1 ORDER BY nome"
-        results = self.db_manager.execute_query(query)
-        return [dict(row) for row in results]
+        def carregar():
+            query = "SELECT * FROM fornecedores WHERE ativo = 1 ORDER BY nome"
+            results = self.db_manager.execute_query(query)
+            return [dict(row) for row in results]
+        
+        return cache_referencia.obter(('fornecedores', 'ativos_por_nome'), carregar)
     
     def search_advanced(self, **kwargs):
         """Busca avançada de fornecedores"""
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Indicadores do dashboard calculados por agregação no banco
+"""
+
+from .base import BaseModel
+from .produto import Produto
+from .movimentacao import Movimentacao
+from utils.database import DatabaseManager
+from datetime import date, timedelta
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Validade máxima do cache; gravações feitas pelos modelos invalidam antes
+VALIDADE_CACHE = 300  # segundos
+ULTIMAS_MOVIMENTACOES = 10
+
+# Cache compartilhado por todos os dashboards abertos
+_cache = {'painel': None, 'momento': 0.0, 'versao': 0}
+_lock_cache = threading.Lock()
+
+def invalidar_cache(tabela=None):
+    """Descartar o painel em cache"""
+    with _lock_cache:
+        _cache['painel'] = None
+        _cache['versao'] += 1
+
+# Movimentações alteram o saldo dos produtos, então ambas as tabelas invalidam
+for _tabela in ('produtos', 'movimentacoes'):
+    BaseModel.observar(_tabela, invalidar_cache)
+
+class Indicadores:
+    """Indicadores (cards) e listas do dashboard"""
+    
+    def __init__(self):
+        self.db_manager = DatabaseManager()
+        self.produto_model = Produto()
+        self.movimentacao_model = Movimentacao()
+    
+    def get_indicadores(self, dia=None):
+        """Calcular todos os cards em uma única consulta"""
+        dia = dia or date.today()
+        
+        # Intervalo [dia, dia seguinte) aproveita o índice de data_movimentacao
+        query = '''
+            SELECT 
+                COUNT(*) as total_produtos,
+                COALESCE(SUM(p.estoque_atual <= p.estoque_minimo), 0) as produtos_falta,
+                COALESCE(SUM(p.preco_venda * p.estoque_atual), 0) as valor_estoque,
+                (SELECT COUNT(*) FROM movimentacoes m
+                 WHERE m.data_movimentacao >= ? AND m.data_movimentacao < ?) as movimentacoes_hoje
+            FROM produtos p
+            WHERE p.ativo = 1
+        '''
+        
+        inicio = dia.isoformat()
+        fim = (dia + timedelta(days=1)).isoformat()
+        result = self.db_manager.execute_query(query, [inicio, fim])
+        return dict(result[0])
+    
+    def get_painel(self):
+        """Indicadores, produtos em falta e últimas movimentações (com cache)"""
+        hoje = date.today()
+        
+        with _lock_cache:
+            painel = _cache['painel']
+            versao = _cache['versao']
+            if (painel and painel['dia'] == hoje
+                    and time.monotonic() - _cache['momento'] < VALIDADE_CACHE):
+                return painel
+        
+        painel = {
+            'dia': hoje,
+            'indicadores': self.get_indicadores(hoje),
+            'estoque_baixo': self.produto_model.get_produtos_estoque_baixo(),
+            'movimentacoes': self.movimentacao_model.get_movimentacoes_completas(limit=ULTIMAS_MOVIMENTACOES)
+        }
+        
+        # Se houve gravação durante a consulta, o resultado já nasce velho
+        with _lock_cache:
+            if _cache['versao'] == versao:
+                _cache['painel'] = painel
+                _cache['momento'] = time.monotonic()
+        
+        return painel
\ No newline at end of file
@@ -3,15 +3,24 @@
 Modelo de dados para movimentações de estoque
 """
 
-from .base import BaseModel
+from .base import BaseModel, _como_data
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+def normalizar_tipo(tipo):
+    """Converter tipo da interface ('Entrada', 'Saída', 'Todos') para o valor da tabela"""
+    if not tipo or tipo.lower() == 'todos':
+        return None
+    return 'entrada' if tipo.lower() == 'entrada' else 'saida'
+
 class Movimentacao(BaseModel):
     """Modelo para movimentações de estoque"""
     
+    # Ordem do histórico; (data_movimentacao, id) é a chave das páginas
+    ORDEM_HISTORICO = "m.data_movimentacao DESC, m.id DESC"
+    
     @property
     def table_name(self):
         return 'movimentacoes'
@@ -24,11 +33,102 @@ class Movimentacao(BaseModel):
             'preco_unitario', 'valor_total'
         ]
     
+    @property
+    def sql_consulta(self):
+        return '''
+            SELECT 
+                m.*,
+                p.nome as produto_nome,
+                p.codigo as produto_codigo
+            FROM movimentacoes m
+            JOIN produtos p ON m.produto_id = p.id
+        '''
+    
+    @property
+    def sql_historico(self):
+        """SELECT base sobre as movimentações ativas e as arquivadas"""
+        return '''
+            SELECT 
+                m.*,
+                p.nome as produto_nome,
+                p.codigo as produto_codigo
+            FROM movimentacoes_historico m
+            JOIN produtos p ON m.produto_id = p.id
+        '''
+    
+    def filtrar(self, data_inicio=None, data_fim=None, tipo=None, produto_id=None):
+        """Consulta de movimentações com os filtros da interface"""
+        # Período que alcança datas anteriores ao corte do arquivamento lê também o
+        # banco de arquivo; sem período, só as movimentações ativas
+        corte = self.db_manager.data_corte_arquivo()
+        if data_inicio:
+            arquivadas = corte is not None and _como_data(data_inicio).isoformat() < corte
+        else:
+            arquivadas = corte is not None and bool(data_fim)
+        consulta = self.consulta(self.sql_historico if arquivadas else None)
+        
+        # Produto + período usam idx_movimentacoes_produto_data; só período, idx_movimentacoes_data
+        consulta.periodo("m.data_movimentacao", data_inicio, data_fim)
+        consulta.igual("m.produto_id", produto_id)
+        consulta.igual("m.tipo", normalizar_tipo(tipo))
+        
+        return consulta
+    
+    @staticmethod
+    def cursor_pagina(movimentacao):
+        """Cursor (data_movimentacao, id) de uma movimentação, para page_after/page_before"""
+        return (movimentacao['data_movimentacao'], movimentacao['id'])
+    
+    def page_after(self, cursor=None, size=100, consulta=None):
+        """Página de movimentações mais antigas que o cursor (histórico, mais recentes primeiro)"""
+        pagina = self.consulta()
+        if consulta is not None:
+            pagina.combinar(consulta)
+        
+        # Forma expandida de (data, id) < (?, ?): o "<=" delimita a faixa no índice
+        # e a leitura começa no cursor, então o custo não cresce com a profundidade
+        if cursor:
+            data, mov_id = cursor
+            pagina.onde(
+                "m.data_movimentacao <= ? AND (m.data_movimentacao < ? OR m.id < ?)",
+                data, data, mov_id
+            )
+        
+        return pagina.executar(ordem=self.ORDEM_HISTORICO, limite=size)
+    
+    def page_before(self, cursor, size=100, consulta=None):
+        """Página de movimentações mais recentes que o cursor, na mesma ordem do histórico"""
+        pagina = self.consulta()
+        if consulta is not None:
+            pagina.combinar(consulta)
+        
+        data, mov_id = cursor
+        pagina.onde(
+            "m.data_movimentacao >= ? AND (m.data_movimentacao > ? OR m.id > ?)",
+            data, data, mov_id
+        )
+        
+        # Lê a partir do cursor em ordem crescente e inverte para exibir
+        movimentacoes = pagina.executar(ordem="m.data_movimentacao ASC, m.id ASC", limite=size)
+        movimentacoes.reverse()
+        return movimentacoes
+    
+    def iterar_paginas(self, consulta=None, size=500):
+        """Percorrer o histórico página a página"""
+        cursor = None
+        while True:
+            pagina = self.page_after(cursor, size, consulta)
+            if pagina:
+                yield pagina
+            if len(pagina) < size:
+                break
+            cursor = self.cursor_pagina(pagina[-1])
+    
     def registrar_entrada(self, produto_id, quantidade, motivo="Entrada", observacoes="", usuario="Sistema", preco_unitario=0):
         """Registrar entrada de estoque"""
         data = {
             'produto_id': produto_id,
-            'tipo': 'ENTRADA',
+            'tipo': 'entrada',
             'quantidade': quantidade,
             'motivo': motivo,
             'observacoes': observacoes,
@@ -43,7 +143,7 @@ class Movimentacao(BaseModel):
         """Registrar saída de estoque"""
         data = {
             'produto_id': produto_id,
-            'tipo': 'SAIDA',
+            'tipo': 'saida',
             'quantidade': quantidade,
             'motivo': motivo,
             'observacoes': observacoes,
@@ -64,47 +164,78 @@ class Movimentacao(BaseModel):
             FROM movimentacoes m
             JOIN produtos p ON m.produto_id = p.id
             WHERE m.produto_id = ?
-            ORDER BY m.data_movimentacao DESC
+            ORDER BY m.data_movimentacao DESC, m.id DESC
         '''
+        values = [produto_id]
         
         if limit:
-            query += f" LIMIT {limit}"
+            query += " LIMIT ?"
+            values.append(limit)
         
-        results = self.db_manager.execute_query(query, [produto_id])
+        results = self.db_manager.execute_query(query, values)
         return [dict(row) for row in results]
     
-    def get_movimentacoes_periodo(self, data_inicio, data_fim):
+    def get_movimentacoes_periodo(self, data_inicio, data_fim, tipo=None):
         """Buscar movimentações por período"""
+        consulta = self.filtrar(data_inicio, data_fim, tipo)
+        return consulta.executar(ordem=self.ORDEM_HISTORICO)
+    
+    def get_resumo_movimentacoes(self, periodo_dias=30):
+        """Obter resumo das movimentações dos últimos dias"""
         query = '''
             SELECT 
-                m.*,
-                p.nome as produto_nome,
-                p.codigo as produto_codigo
-            FROM movimentacoes m
-            JOIN produtos p ON m.produto_id = p.id
-            WHERE DATE(m.data_movimentacao) BETWEEN ? AND ?
-            ORDER BY m.data_movimentacao DESC
+                r.tipo,
+                SUM(r.total_movimentacoes) as total_movimentacoes,
+                SUM(r.total_quantidade) as total_quantidade,
+                SUM(r.valor_total) as valor_total
+            FROM resumo_movimentacoes_diario r
+            WHERE r.data >= DATE('now', '-' || ? || ' days')
+            GROUP BY r.tipo
         '''
         
-        results = self.db_manager.execute_query(query, [data_inicio, data_fim])
+        results = self.db_manager.execute_query(query, [periodo_dias])
         return [dict(row) for row in results]
     
-    def get_resumo_movimentacoes(self, periodo_dias=30):
-        """Obter resumo das movimentações dos últimos dias"""
+    def get_resumo_diario(self, data_inicio, data_fim):
+        """Obter totais por dia e tipo no período (tabela de resumo diário)"""
         query = '''
             SELECT 
-                m.tipo,
-                COUNT(*) as total_movimentacoes,
-                SUM(m.quantidade) as total_quantidade,
-                SUM(m.valor_total) as valor_total
-            FROM movimentacoes m
-            WHERE DATE(m.data_movimentacao) >= DATE('now', '-' || ? || ' days')
-            GROUP BY m.tipo
+                r.data,
+                r.tipo,
+                SUM(r.total_movimentacoes) as total_movimentacoes,
+                SUM(r.total_quantidade) as total_quantidade,
+                SUM(r.valor_total) as valor_total
+            FROM resumo_movimentacoes_diario r
+            WHERE r.data BETWEEN ? AND ?
+            GROUP BY r.data, r.tipo
+            ORDER BY r.data
         '''
         
-        results = self.db_manager.execute_query(query, [periodo_dias])
+        results = self.db_manager.execute_query(query, [data_inicio, data_fim])
         return [dict(row) for row in results]
     
+    def get_resumo_mensal(self, mes, produto_id=None):
+        """Obter totais do mês ('AAAA-MM') por tipo (tabela de resumo mensal)"""
+        query = '''
+            SELECT 
+                r.tipo,
+                SUM(r.total_movimentacoes) as total_movimentacoes,
+                SUM(r.total_quantidade) as total_quantidade,
+                SUM(r.valor_total) as valor_total
+            FROM resumo_movimentacoes_mensal r
+            WHERE r.mes = ?
+        '''
+        values = [mes]
+        
+        if produto_id:
+            query += " AND r.produto_id = ?"
+            values.append(produto_id)
+        
+        query += " GROUP BY r.tipo"
+        
+        results = self.db_manager.execute_query(query, values)
+        return {row['tipo']: dict(row) for row in results}
+    
     def get_movimentacoes_completas(self, limit=None):
         """Buscar movimentações completas com informações do produto"""
         query = '''
@@ -118,25 +249,25 @@ class Movimentacao(BaseModel):
             JOIN produtos p ON m.produto_id = p.id
             LEFT JOIN categorias c ON p.categoria_id = c.id
             LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
-            ORDER BY m.data_movimentacao DESC
+            ORDER BY m.data_movimentacao DESC, m.id DESC
         '''
+        values = []
         
         if limit:
-            query += f" LIMIT {limit}"
+            query += " LIMIT ?"
+            values.append(limit)
         
-        results = self.db_manager.execute_query(query)
+        results = self.db_manager.execute_query(query, values)
         return [dict(row) for row in results]
     
     def registrar_movimentacao(self, produto_id, tipo, quantidade, motivo="", observacoes="", usuario="Sistema", preco_unitario=0, valor_total=0, documento=""):
         """Registrar uma movimentação geral"""
-        # Ajustar tipo para maiúsculo
-        tipo_upper = tipo.upper()
-        if tipo_upper not in ['ENTRADA', 'SAIDA']:
-            tipo_upper = 'ENTRADA' if tipo.lower() == 'entrada' else 'SAIDA'
+        # Ajustar tipo para o formato aceito pela tabela ('entrada'/'saida')
+        tipo_normalizado = normalizar_tipo(tipo)
         
         data = {
             'produto_id': produto_id,
-            'tipo': tipo_upper,
+            'tipo': tipo_normalizado,
             'quantidade': quantidade,
             'motivo': motivo,
             'observacoes': observacoes,
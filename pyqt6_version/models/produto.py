@@ -4,7 +4,10 @@ Modelo de dados para produtos
 """
 
 from .base import BaseModel
+from config.settings import ANALISE_CONFIG
+from datetime import date, timedelta
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +26,52 @@ class Produto(BaseModel):
             'unidade', 'localizacao', 'ativo', 'data_criacao'
         ]
     
+    @property
+    def sql_consulta(self):
+        return '''
+            SELECT 
+                p.*,
+                c.nome as categoria_nome,
+                f.nome as fornecedor_nome
+            FROM produtos p
+            LEFT JOIN categorias c ON p.categoria_id = c.id
+            LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+        '''
+    
+    def create(self, data):
+        """Criar produto; o estoque informado no cadastro vira seu saldo inicial, na mesma transação"""
+        dados = {field: value for field, value in data.items() if field != 'id' and field in self.fields}
+        estoque = dados.pop('estoque_atual', None)
+        record_id = self.db_manager.criar_produto(dados, estoque or 0)
+        self._notificar_escrita()
+        return record_id
+    
+    def update(self, record_id, data):
+        """Atualizar produto; estoque_atual alterado fora de uma movimentação é registrado como ajuste"""
+        dados = dict(data)
+        estoque = dados.pop('estoque_atual', None)
+        result = super().update(record_id, dados) if any(field in self.fields for field in dados) else 0
+        if estoque is not None and estoque != self.get_estoque_atual(record_id):
+            result = self.atualizar_estoque(record_id, estoque)
+        return result
+    
+    def filtrar(self, termo=None, categoria_id=None, fornecedor_id=None, estoque_baixo=False):
+        """Consulta de produtos ativos com os filtros da interface"""
+        consulta = self.consulta().onde("p.ativo = 1")
+        
+        if termo and termo.strip():
+            condicao, params = self.condicao_busca(termo)
+            consulta.onde(condicao, *params)
+        
+        consulta.igual("p.categoria_id", categoria_id)
+        consulta.igual("p.fornecedor_id", fornecedor_id)
+        
+        # Coberto pelo índice parcial idx_produtos_estoque_baixo
+        if estoque_baixo:
+            consulta.onde("p.estoque_atual <= p.estoque_minimo")
+        
+        return consulta
+    
     def get_produtos_completos(self):
         """Buscar produtos com informações de categoria e fornecedor"""
         query = '''
@@ -59,53 +108,196 @@ class Produto(BaseModel):
     
     def get_produtos_estoque_baixo(self):
         """Buscar produtos com estoque abaixo do mínimo"""
+        return self.filtrar(estoque_baixo=True).executar(ordem="p.nome")
+    
+    def get_estoque_atual(self, produto_id):
+        """Obter saldo atual do produto (mantido pelos triggers de movimentação)"""
+        query = "SELECT estoque_atual FROM produtos WHERE id = ?"
+        result = self.db_manager.execute_query(query, [produto_id])
+        return result[0][0] if result else None
+    
+    def get_analise_estoque(self, periodo_dias=None, hoje=None):
+        """Curva ABC, giro, dias de cobertura e dias sem saída de cada produto ativo"""
+        periodo_dias = periodo_dias or ANALISE_CONFIG['periodo_dias']
+        hoje = hoje or date.today()
+        inicio = hoje - timedelta(days=periodo_dias)
+        
+        # Tudo em uma consulta sobre o resumo diário (nunca sobre as movimentações):
+        # consumo e saldo do período por produto, última saída pelo índice
+        # idx_resumo_diario_produto_tipo e soma acumulada do valor consumido (janela)
         query = '''
+            WITH periodo AS (
+                SELECT 
+                    produto_id,
+                    SUM(CASE WHEN tipo = 'saida' THEN total_quantidade ELSE 0 END) as consumo,
+                    SUM(CASE WHEN tipo = 'entrada' THEN total_quantidade ELSE -total_quantidade END) as saldo_periodo
+                FROM resumo_movimentacoes_diario
+                WHERE data >= ?
+                GROUP BY produto_id
+            ),
+            base AS (
+                SELECT 
+                    p.id,
+                    p.codigo,
+                    p.nome,
+                    c.nome as categoria_nome,
+                    p.estoque_atual,
+                    p.preco_compra,
+                    p.estoque_atual * p.preco_compra as valor_estoque,
+                    COALESCE(pe.consumo, 0) as consumo,
+                    COALESCE(pe.consumo, 0) * p.preco_compra as valor_consumo,
+                    p.estoque_atual - COALESCE(pe.saldo_periodo, 0) / 2.0 as estoque_medio,
+                    (
+                        SELECT MAX(r.data) FROM resumo_movimentacoes_diario r
+                        WHERE r.produto_id = p.id AND r.tipo = 'saida'
+                    ) as ultima_saida,
+                    DATE(p.data_criacao) as data_cadastro
+                FROM produtos p
+                LEFT JOIN categorias c ON p.categoria_id = c.id
+                LEFT JOIN periodo pe ON pe.produto_id = p.id
+                WHERE p.ativo = 1
+            )
             SELECT 
-                p.*,
-                c.nome as categoria_nome,
-                f.nome as fornecedor_nome
-            FROM produtos p
-            LEFT JOIN categorias c ON p.categoria_id = c.id
-            LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
-            WHERE p.ativo = 1 AND p.estoque_atual <= p.estoque_minimo
-            ORDER BY p.nome
+                base.*,
+                SUM(valor_consumo) OVER (
+                    ORDER BY valor_consumo DESC, id ROWS UNBOUNDED PRECEDING
+                ) as valor_acumulado,
+                SUM(valor_consumo) OVER () as valor_total,
+                CASE WHEN estoque_medio > 0 THEN consumo / estoque_medio END as giro,
+                CASE WHEN consumo > 0 THEN estoque_atual * ? / CAST(consumo AS REAL) END as dias_cobertura,
+                CAST(JULIANDAY(?) - JULIANDAY(COALESCE(ultima_saida, data_cadastro)) AS INTEGER) as dias_sem_saida
+            FROM base
+            ORDER BY valor_consumo DESC, id
         '''
         
-        results = self.db_manager.execute_query(query)
-        return [dict(row) for row in results]
+        results = self.db_manager.execute_query(
+            query, [inicio.isoformat(), periodo_dias, hoje.isoformat()]
+        )
+        
+        analise = []
+        for row in results:
+            item = dict(row)
+            
+            # Classe pela fatia acumulada antes do item; sem consumo, sempre C
+            total = item['valor_total'] or 0
+            fatia_antes = (item['valor_acumulado'] - item['valor_consumo']) / total if total else 1
+            if item['valor_consumo'] > 0 and fatia_antes < ANALISE_CONFIG['fatia_classe_a']:
+                item['classe'] = 'A'
+            elif item['valor_consumo'] > 0 and fatia_antes < ANALISE_CONFIG['fatia_classe_b']:
+                item['classe'] = 'B'
+            else:
+                item['classe'] = 'C'
+            
+            item['fatia_acumulada'] = item['valor_acumulado'] / total if total else 0
+            item['estoque_parado'] = (
+                item['estoque_atual'] > 0 and item['dias_sem_saida'] is not None
+                and item['dias_sem_saida'] >= ANALISE_CONFIG['dias_estoque_parado']
+            )
+            analise.append(item)
+        
+        return analise
     
     def atualizar_estoque(self, produto_id, nova_quantidade):
-        """Atualizar estoque atual do produto"""
-        query = "UPDATE produtos SET estoque_atual = ? WHERE id = ?"
-        return self.db_manager.execute_query(query, [nova_quantidade, produto_id])
+        """Atualizar estoque atual do produto (ajuste de inventário, registrado no saldo inicial)"""
+        result = self.db_manager.definir_estoque(produto_id, nova_quantidade)
+        self._notificar_escrita()
+        return result
     
-    def search_advanced(self, **kwargs):
-        """Busca avançada de produtos"""
-        conditions = []
-        values = []
+    def buscar(self, termo, limite=100):
+        """Busca textual ranqueada: primeiro por prefixo, depois por trecho"""
+        termo = (termo or '').strip()
+        if not termo:
+            return []
+        
+        resultados = self.buscar_prefixo(termo, limite)
+        if len(resultados) < limite:
+            vistos = {produto['id'] for produto in resultados}
+            for produto in self.buscar_substring(termo, limite):
+                if produto['id'] not in vistos:
+                    resultados.append(produto)
+                    vistos.add(produto['id'])
+                    if len(resultados) >= limite:
+                        break
         
-        if kwargs.get('nome'):
-            conditions.append("p.nome LIKE ?")
-            values.append(f"%{kwargs['nome']}%")
+        return resultados
+    
+    def buscar_prefixo(self, termo, limite=100):
+        """Buscar produtos cujas palavras de código, nome ou descrição começam com o termo"""
+        palavras = re.findall(r'\w+', termo or '')
+        if not palavras:
+            return []
+        
+        if not self.db_manager.tabela_existe('produtos_fts'):
+            return self._buscar_like(termo, limite)
         
-        if kwargs.get('codigo'):
-            conditions.append("p.codigo LIKE ?")
-            values.append(f"%{kwargs['codigo']}%")
+        return self._buscar_fts('produtos_fts', self._expressao_prefixo(palavras), limite)
+    
+    def buscar_substring(self, termo, limite=100):
+        """Buscar produtos que contêm o termo em qualquer posição"""
+        termo = (termo or '').strip()
+        if not termo:
+            return []
         
-        if kwargs.get('categoria_id'):
-            conditions.append("p.categoria_id = ?")
-            values.append(kwargs['categoria_id'])
+        # O tokenizer trigram só indexa trechos de 3 ou mais caracteres
+        if len(termo) < 3 or not self.db_manager.tabela_existe('produtos_fts_trigram'):
+            return self._buscar_like(termo, limite)
         
-        if kwargs.get('fornecedor_id'):
-            conditions.append("p.fornecedor_id = ?")
-            values.append(kwargs['fornecedor_id'])
+        expressao = '"' + termo.replace('"', '""') + '"'
+        return self._buscar_fts('produtos_fts_trigram', expressao, limite)
+    
+    def condicao_busca(self, termo):
+        """Condição SQL (alias p) com os produtos encontrados por prefixo ou trecho"""
+        termo = (termo or '').strip()
+        palavras = re.findall(r'\w+', termo)
         
-        if kwargs.get('estoque_baixo'):
-            conditions.append("p.estoque_atual <= p.estoque_minimo")
+        condicoes = []
+        params = []
         
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
+        if palavras and self.db_manager.tabela_existe('produtos_fts'):
+            condicoes.append("p.id IN (SELECT rowid FROM produtos_fts WHERE produtos_fts MATCH ?)")
+            params.append(self._expressao_prefixo(palavras))
         
+        if len(termo) >= 3 and self.db_manager.tabela_existe('produtos_fts_trigram'):
+            condicoes.append(
+                "p.id IN (SELECT rowid FROM produtos_fts_trigram WHERE produtos_fts_trigram MATCH ?)"
+            )
+            params.append('"' + termo.replace('"', '""') + '"')
+        elif termo:
+            contem = f"%{termo}%"
+            condicoes.append("(p.codigo LIKE ? OR p.nome LIKE ? OR p.descricao LIKE ?)")
+            params.extend([contem, contem, contem])
+        
+        if not condicoes:
+            return "1=1", []
+        return "(" + " OR ".join(condicoes) + ")", params
+    
+    def _expressao_prefixo(self, palavras):
+        """Expressão FTS5 de prefixo: cada palavra entre aspas, como "note"* "lenov"*"""
+        return ' '.join(f'"{palavra}"*' for palavra in palavras)
+    
+    def _buscar_fts(self, tabela, expressao, limite):
+        """Consultar um índice FTS5 ordenando pela relevância (bm25)"""
+        # Pesos do bm25 por coluna: código, nome, descrição
         query = f'''
+            SELECT 
+                p.*,
+                c.nome as categoria_nome,
+                f.nome as fornecedor_nome
+            FROM {tabela}
+            JOIN produtos p ON p.id = {tabela}.rowid
+            LEFT JOIN categorias c ON p.categoria_id = c.id
+            LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+            WHERE {tabela} MATCH ? AND p.ativo = 1
+            ORDER BY bm25({tabela}, 10.0, 5.0, 1.0), p.nome
+            LIMIT ?
+        '''
+        
+        results = self.db_manager.execute_query(query, [expressao, limite])
+        return [dict(row) for row in results]
+    
+    def _buscar_like(self, termo, limite):
+        """Busca com LIKE, usada quando o SQLite não tem FTS5"""
+        query = '''
             SELECT 
                 p.*,
                 c.nome as categoria_nome,
@@ -113,9 +305,32 @@ class Produto(BaseModel):
             FROM produtos p
             LEFT JOIN categorias c ON p.categoria_id = c.id
             LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
-            WHERE {where_clause} AND p.ativo = 1
-            ORDER BY p.nome
+            WHERE (p.codigo LIKE ? OR p.nome LIKE ? OR p.descricao LIKE ?) AND p.ativo = 1
+            ORDER BY (p.codigo LIKE ? OR p.nome LIKE ?) DESC, p.nome
+            LIMIT ?
         '''
         
-        results = self.db_manager.execute_query(query, values)
-        return [dict(row) for row in results] 
\ No newline at end of file
+        contem = f"%{termo}%"
+        comeca = f"{termo}%"
+        results = self.db_manager.execute_query(
+            query, [contem, contem, contem, comeca, comeca, limite]
+        )
+        return [dict(row) for row in results]
+    
+    def search(self, search_term, fields=None):
+        """Buscar produtos por termo (usa o índice FTS5 na busca padrão)"""
+        if fields:
+            return super().search(search_term, fields)
+        return self.buscar(search_term)
+    
+    def search_advanced(self, **kwargs):
+        """Busca avançada de produtos"""
+        consulta = self.filtrar(
+            categoria_id=kwargs.get('categoria_id'),
+            fornecedor_id=kwargs.get('fornecedor_id'),
+            estoque_baixo=kwargs.get('estoque_baixo', False)
+        )
+        consulta.contem(["p.nome"], kwargs.get('nome'))
+        consulta.contem(["p.codigo"], kwargs.get('codigo'))
+        
+        return consulta.executar(ordem="p.nome") 
\ No newline at end of file
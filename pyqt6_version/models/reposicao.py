@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Reposição: previsão de demanda, ponto de pedido e sugestão de compra por fornecedor
+"""
+
+from .base import BaseModel
+from config.settings import REPOSICAO_CONFIG
+from utils.database import DatabaseManager
+from datetime import date, timedelta
+import math
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cache compartilhado: (dia, historico_dias) -> itens; gravações em produtos ou
+# movimentações descartam tudo
+_cache = {'itens': {}, 'versao': 0}
+_lock_cache = threading.Lock()
+
+def invalidar_cache(tabela=None):
+    """Descartar as previsões em cache"""
+    with _lock_cache:
+        _cache['itens'].clear()
+        _cache['versao'] += 1
+
+for _tabela in ('produtos', 'movimentacoes'):
+    BaseModel.observar(_tabela, invalidar_cache)
+
+def pesos_suavizacao(dias, alfa):
+    """Peso de cada idade (0 = hoje) na suavização exponencial, somando 1"""
+    # Sem histórico anterior à janela, os pesos são normalizados para não
+    # subestimar a demanda (correção do valor inicial zero)
+    pesos = [alfa * (1 - alfa) ** idade for idade in range(dias)]
+    total = sum(pesos)
+    return [peso / total for peso in pesos]
+
+class Reposicao:
+    """Demanda diária, ponto de pedido e quantidade sugerida de todos os produtos ativos"""
+    
+    def __init__(self):
+        self.db_manager = DatabaseManager()
+    
+    def get_reposicao(self, historico_dias=None, hoje=None):
+        """Previsão de todos os produtos ativos (com cache até a próxima gravação)"""
+        historico_dias = historico_dias or REPOSICAO_CONFIG['historico_dias']
+        hoje = hoje or date.today()
+        chave = (hoje, historico_dias)
+        
+        with _lock_cache:
+            itens = _cache['itens'].get(chave)
+            versao = _cache['versao']
+        if itens is not None:
+            return [dict(item) for item in itens]
+        
+        itens = self._calcular(historico_dias, hoje)
+        
+        # Se houve gravação durante o cálculo, o resultado já nasce velho
+        with _lock_cache:
+            if _cache['versao'] == versao:
+                _cache['itens'][chave] = itens
+        return [dict(item) for item in itens]
+    
+    def get_sugestoes(self, historico_dias=None, hoje=None):
+        """Itens a comprar, ordenados por fornecedor e pelos dias até a ruptura"""
+        itens = [item for item in self.get_reposicao(historico_dias, hoje) if item['quantidade_sugerida'] > 0]
+        itens.sort(key=lambda item: (
+            item['fornecedor_nome'] or '',
+            item['dias_ate_ruptura'] if item['dias_ate_ruptura'] is not None else 0
+        ))
+        return itens
+    
+    def por_fornecedor(self, itens):
+        """Agrupar sugestões por fornecedor, com quantidade e valor do pedido"""
+        pedidos = {}
+        for item in itens:
+            pedido = pedidos.setdefault(
+                item['fornecedor_nome'] or 'Sem fornecedor',
+                {'itens': [], 'quantidade': 0, 'valor': 0}
+            )
+            pedido['itens'].append(item)
+            pedido['quantidade'] += item['quantidade_sugerida']
+            pedido['valor'] += item['valor_sugerido']
+        return pedidos
+    
+    def _calcular(self, historico_dias, hoje):
+        """Uma passada pelo resumo diário de saídas e uma pelos produtos"""
+        inicio = hoje - timedelta(days=historico_dias - 1)
+        pesos = pesos_suavizacao(historico_dias, REPOSICAO_CONFIG['alfa_suavizacao'])
+        
+        # Totais diários de saída da janela (linhas do resumo, nunca das movimentações)
+        demanda = {}
+        cursor = self.db_manager.abrir_cursor('''
+            SELECT
+                produto_id,
+                CAST(JULIANDAY(?) - JULIANDAY(data) AS INTEGER) as idade,
+                total_quantidade
+            FROM resumo_movimentacoes_diario
+            WHERE tipo = 'saida' AND data >= ? AND data <= ?
+        ''', [hoje.isoformat(), inicio.isoformat(), hoje.isoformat()])
+        try:
+            for produto_id, idade, quantidade in cursor:
+                acumulado = demanda.get(produto_id)
+                if acumulado is None:
+                    acumulado = demanda[produto_id] = [0, 0, 0.0]
+                acumulado[0] += quantidade
+                acumulado[1] += quantidade * quantidade
+                acumulado[2] += quantidade * pesos[idade]
+        finally:
+            cursor.connection.close()
+        
+        produtos = self.db_manager.execute_query('''
+            SELECT
+                p.id,
+                p.codigo,
+                p.nome,
+                p.estoque_atual,
+                p.estoque_minimo,
+                p.preco_compra,
+                f.nome as fornecedor_nome
+            FROM produtos p
+            LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+            WHERE p.ativo = 1
+            ORDER BY p.id
+        ''')
+        
+        vazio = (0, 0, 0.0)
+        return [self._item(dict(produto), demanda.get(produto['id'], vazio), historico_dias) for produto in produtos]
+    
+    def _item(self, produto, demanda, historico_dias):
+        """Ponto de pedido e sugestão de um produto a partir da soma, soma dos quadrados e média suavizada"""
+        soma, soma_quadrados, suavizada = demanda
+        prazo = REPOSICAO_CONFIG['prazo_entrega_dias']
+        
+        media_movel = soma / historico_dias
+        desvio = math.sqrt(max(soma_quadrados / historico_dias - media_movel ** 2, 0))
+        
+        # A média suavizada reage mais rápido a mudanças e é a previsão usada
+        estoque_seguranca = REPOSICAO_CONFIG['fator_seguranca'] * desvio * math.sqrt(prazo)
+        ponto_pedido = max(math.ceil(suavizada * prazo + estoque_seguranca), produto['estoque_minimo'] or 0)
+        estoque_maximo = ponto_pedido + math.ceil(suavizada * REPOSICAO_CONFIG['cobertura_dias'])
+        
+        estoque = produto['estoque_atual']
+        quantidade_sugerida = estoque_maximo - estoque if estoque <= ponto_pedido else 0
+        
+        produto.update({
+            'media_movel': media_movel,
+            'demanda_suavizada': suavizada,
+            'desvio_demanda': desvio,
+            'estoque_seguranca': math.ceil(estoque_seguranca),
+            'ponto_pedido': ponto_pedido,
+            'estoque_maximo': estoque_maximo,
+            'dias_ate_ruptura': estoque / suavizada if suavizada > 0 else None,
+            'quantidade_sugerida': max(quantidade_sugerida, 0),
+            'valor_sugerido': max(quantidade_sugerida, 0) * (produto['preco_compra'] or 0)
+        })
+        return produto
\ No newline at end of file
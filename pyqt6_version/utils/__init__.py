@@ -4,8 +4,9 @@ Utilitários do sistema de controle de estoque
 """
 
 from .database import DatabaseManager
+from .backup import BackupManager
 from .logger import setup_logger
 from .export import ExportManager
 from .validators import Validators
 
-__all__ = ['DatabaseManager', 'setup_logger', 'ExportManager', 'Validators'] 
\ No newline at end of file
+__all__ = ['DatabaseManager', 'BackupManager', 'setup_logger', 'ExportManager', 'Validators'] 
\ No newline at end of file
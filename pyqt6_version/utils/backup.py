@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Backups do banco: compressão, catálogo e política de retenção
+"""
+
+import gzip
+import json
+import shutil
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from config.settings import BACKUPS_DIR, BACKUP_CONFIG
+from utils.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Catálogo e arquivos são compartilhados entre a interface e a thread de backup
+_lock_catalogo = threading.Lock()
+
+def formatar_tamanho(tamanho):
+    """Formatar tamanho em bytes para exibição"""
+    if tamanho is None:
+        return '-'
+    for unidade in ['B', 'KB', 'MB', 'GB']:
+        if tamanho < 1024 or unidade == 'GB':
+            return f"{tamanho:.0f} {unidade}" if unidade == 'B' else f"{tamanho:.1f} {unidade}"
+        tamanho /= 1024
+
+class BackupManager:
+    """Gerenciador de backups com catálogo e retenção avô-pai-filho"""
+    
+    def __init__(self):
+        self.backups_dir = BACKUPS_DIR
+        self.catalogo_path = BACKUPS_DIR / 'catalogo.json'
+        self.config = BACKUP_CONFIG
+    
+    def executar_backup(self, progresso=None, manual=False):
+        """Criar backup, comprimir, registrar no catálogo e aplicar a retenção"""
+        inicio = time.monotonic()
+        
+        backup_path = DatabaseManager().backup_database(progresso=progresso)
+        tamanho_original = backup_path.stat().st_size
+        
+        if self.config.get('comprimir', True):
+            backup_path = self.compactar(backup_path)
+        
+        entrada = {
+            'arquivo': backup_path.name,
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'tamanho': backup_path.stat().st_size,
+            'tamanho_original': tamanho_original,
+            'duracao': round(time.monotonic() - inicio, 3),
+            'manual': manual
+        }
+        
+        with _lock_catalogo:
+            catalogo = self._ler_catalogo()
+            catalogo.append(entrada)
+            self._gravar_catalogo(catalogo)
+        
+        self.aplicar_retencao()
+        
+        logger.info(
+            f"Backup registrado: {entrada['arquivo']} "
+            f"({formatar_tamanho(entrada['tamanho'])}, {entrada['duracao']:.1f}s)"
+        )
+        return entrada
+    
+    def compactar(self, caminho):
+        """Comprimir o arquivo com gzip em blocos e remover o original"""
+        destino = caminho.with_name(caminho.name + '.gz')
+        try:
+            with open(caminho, 'rb') as origem, gzip.open(destino, 'wb') as saida:
+                shutil.copyfileobj(origem, saida, 1024 * 1024)
+        except Exception:
+            if destino.exists():
+                destino.unlink()
+            raise
+        
+        caminho.unlink()
+        return destino
+    
+    def listar_backups(self):
+        """Catálogo de backups existentes, do mais recente para o mais antigo"""
+        with _lock_catalogo:
+            catalogo = self._ler_catalogo()
+        
+        # Arquivos apagados manualmente saem do catálogo; backups antigos
+        # (anteriores ao catálogo) entram com os dados disponíveis no disco
+        registrados = {entrada['arquivo'] for entrada in catalogo}
+        backups = [entrada for entrada in catalogo if (self.backups_dir / entrada['arquivo']).exists()]
+        
+        for caminho in self.backups_dir.glob('backup_*.db*'):
+            if caminho.name not in registrados:
+                backups.append({
+                    'arquivo': caminho.name,
+                    'data': datetime.fromtimestamp(caminho.stat().st_mtime).isoformat(timespec='seconds'),
+                    'tamanho': caminho.stat().st_size,
+                    'tamanho_original': None,
+                    'duracao': None
+                })
+        
+        backups.sort(key=lambda entrada: entrada['data'], reverse=True)
+        return backups
+    
+    def ultimo_backup(self):
+        """Backup mais recente ou None"""
+        backups = self.listar_backups()
+        return backups[0] if backups else None
+    
+    def backup_pendente(self, agora=None):
+        """Verificar se o intervalo de backup automático já passou"""
+        if not self.config.get('auto_backup', False):
+            return False
+        
+        ultimo = self.ultimo_backup()
+        if ultimo is None:
+            return True
+        
+        agora = agora or datetime.now()
+        intervalo = timedelta(hours=self.config.get('backup_interval', 24))
+        return agora - datetime.fromisoformat(ultimo['data']) >= intervalo
+    
+    def aplicar_retencao(self, agora=None):
+        """Remover backups fora da política avô-pai-filho, limitada a max_backups"""
+        agora = agora or datetime.now()
+        backups = self.listar_backups()
+        
+        manter = set()
+        
+        # Filhos: o mais recente de cada dia; pais: de cada semana; avôs: de cada mês.
+        # Nos filhos, os backups manuais não disputam a vaga do dia: todos ficam durante a
+        # retenção diária (um backup tirado antes de uma alteração arriscada não some quando
+        # outro roda no mesmo dia)
+        periodos = [
+            (self.config.get('retencao_diaria', 7), lambda data: data.date(),
+             lambda data: (agora.date() - data.date()).days, True),
+            (self.config.get('retencao_semanal', 4), lambda data: data.isocalendar()[:2],
+             lambda data: (agora.date() - data.date()).days // 7, False),
+            (self.config.get('retencao_mensal', 12), lambda data: (data.year, data.month),
+             lambda data: (agora.year - data.year) * 12 + agora.month - data.month, False),
+        ]
+        
+        for quantidade, chave, idade, manter_manuais in periodos:
+            vistos = set()
+            for entrada in backups:
+                data = datetime.fromisoformat(entrada['data'])
+                if idade(data) >= quantidade:
+                    continue
+                if manter_manuais and entrada.get('manual'):
+                    manter.add(entrada['arquivo'])
+                    continue
+                periodo = chave(data)
+                if periodo not in vistos:
+                    vistos.add(periodo)
+                    manter.add(entrada['arquivo'])
+        
+        # O backup mais recente nunca é removido
+        if backups:
+            manter.add(backups[0]['arquivo'])
+        
+        max_backups = self.config.get('max_backups', 30)
+        mantidos = [entrada for entrada in backups if entrada['arquivo'] in manter][:max_backups]
+        nomes_mantidos = {entrada['arquivo'] for entrada in mantidos}
+        
+        removidos = []
+        for entrada in backups:
+            if entrada['arquivo'] not in nomes_mantidos:
+                try:
+                    (self.backups_dir / entrada['arquivo']).unlink()
+                    removidos.append(entrada['arquivo'])
+                except OSError as e:
+                    logger.error(f"Erro ao remover backup {entrada['arquivo']}: {e}")
+        
+        if removidos:
+            with _lock_catalogo:
+                catalogo = self._ler_catalogo()
+                self._gravar_catalogo([e for e in catalogo if e['arquivo'] not in removidos])
+            logger.info(f"Retenção de backups: {len(removidos)} arquivo(s) removido(s)")
+        
+        return removidos
+    
+    def _ler_catalogo(self):
+        """Ler o catálogo em disco"""
+        if not self.catalogo_path.exists():
+            return []
+        try:
+            with open(self.catalogo_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Catálogo de backups ilegível, será recriado: {e}")
+            return []
+    
+    def _gravar_catalogo(self, catalogo):
+        """Gravar o catálogo de forma atômica"""
+        self.backups_dir.mkdir(exist_ok=True)
+        temporario = self.catalogo_path.with_suffix('.tmp')
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(catalogo, f, indent=2, ensure_ascii=False)
+        temporario.replace(self.catalogo_path)
\ No newline at end of file
@@ -5,31 +5,72 @@ Gerenciador do banco de dados SQLite
 
 import sqlite3
 import logging
-from pathlib import Path
+import threading
+import time
 from datetime import datetime
-from config.settings import DATABASE_CONFIG
+from pathlib import Path
+from config.settings import DATABASE_CONFIG, BACKUPS_DIR, BACKUP_CONFIG, ARQUIVO_CONFIG
+from utils.desempenho import estatisticas, registrar_consulta_lenta
 
 logger = logging.getLogger(__name__)
 
+# Tabelas de resumo: (tabela, coluna do período, expressão do período)
+RESUMOS_MOVIMENTACOES = (
+    ('resumo_movimentacoes_diario', 'data', "DATE({ref}.data_movimentacao)"),
+    ('resumo_movimentacoes_mensal', 'mes', "STRFTIME('%Y-%m', {ref}.data_movimentacao)"),
+)
+
+# Índices FTS5 de produtos: (tabela, opções do fts5)
+# unicode61 atende busca por prefixo; trigram atende busca por trecho (substring)
+INDICES_BUSCA_PRODUTOS = (
+    ('produtos_fts', "tokenize='unicode61 remove_diacritics 2', prefix='2 3'"),
+    ('produtos_fts_trigram', "tokenize='trigram'"),
+)
+
+# Tabelas de referência cuja versão é mantida por triggers (invalidação do cache
+# quando outro processo grava nelas)
+TABELAS_VERSIONADAS = ('categorias', 'fornecedores')
+
+# Colunas de movimentacoes, na mesma ordem no banco principal e no de arquivo
+COLUNAS_MOVIMENTACOES = (
+    "id, produto_id, tipo, quantidade, preco_unitario, valor_total, "
+    "motivo, documento, observacoes, data_movimentacao, usuario"
+)
+
 class DatabaseManager:
     """Gerenciador do banco de dados"""
     
     def __init__(self):
         self.db_path = DATABASE_CONFIG['path']
-        self.connection = None
+        self.arquivo_path = Path(self.db_path).parent / ARQUIVO_CONFIG['nome']
+        # Uma conexão por thread: consultas também rodam nas threads de trabalho
+        self._local = threading.local()
+    
+    @property
+    def connection(self):
+        """Conexão da thread atual (None se ainda não aberta)"""
+        return getattr(self._local, 'connection', None)
     
     def get_connection(self):
         """Obter conexão com o banco de dados"""
         if self.connection is None:
-            self.connection = sqlite3.connect(str(self.db_path))
-            self.connection.row_factory = sqlite3.Row
+            self._local.connection = sqlite3.connect(str(self.db_path))
+            self._local.connection.row_factory = sqlite3.Row
+            self._local.anexado = False
+        
+        # O banco de arquivo pode surgir depois de a conexão abrir (arquivamento em outra
+        # thread ou pelo manutencao.py): anexa assim que existir, para que a escolha da
+        # tabela (filtrar) e a execução vejam o mesmo estado em qualquer thread
+        if not self._local.anexado:
+            self._local.anexado = self._anexar_arquivo(self._local.connection)
         return self.connection
     
     def close_connection(self):
         """Fechar conexão com o banco de dados"""
         if self.connection:
             self.connection.close()
-            self.connection = None
+            self._local.connection = None
+            self._local.anexado = False
     
     def initialize_database(self):
         """Inicializar banco de dados e criar tabelas"""
@@ -37,6 +78,9 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
+            # WAL: leitores não bloqueiam gravações (as tabelas mantêm cursores abertos)
+            cursor.execute("PRAGMA journal_mode=WAL")
+            
             # Tabela de categorias
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS categorias (
@@ -106,6 +150,28 @@ class DatabaseManager:
                 )
             ''')
             
+            # Saldo de cada produto anterior às movimentações do banco principal: estoque
+            # de cadastro e ajustes manuais, mais as movimentações arquivadas até data_corte
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'saldos_iniciais'"
+            )
+            saldos_existiam = cursor.fetchone()[0] > 0
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS saldos_iniciais (
+                    produto_id INTEGER PRIMARY KEY,
+                    quantidade INTEGER NOT NULL DEFAULT 0,
+                    data_corte TEXT,
+                    FOREIGN KEY (produto_id) REFERENCES produtos (id)
+                )
+            ''')
+            
+            # Banco já existente: o estoque que o histórico não explica vira saldo inicial
+            if not saldos_existiam:
+                self._registrar_saldos_iniciais(cursor)
+            
+            # Índices dos filtros das telas
+            self._create_indexes(cursor)
+            
             # Tabela de usuários (básica)
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS usuarios (
@@ -120,6 +186,18 @@ class DatabaseManager:
                 )
             ''')
             
+            # Triggers que mantêm o saldo de estoque
+            self._create_stock_triggers(cursor)
+            
+            # Tabelas de resumo diário/mensal das movimentações
+            self._create_summary_tables(cursor)
+            
+            # Índice de busca textual de produtos (FTS5, quando disponível)
+            self._create_search_index(cursor)
+            
+            # Versão das tabelas de referência
+            self._create_version_triggers(cursor)
+            
             # Inserir dados iniciais
             self._insert_initial_data(cursor)
             
@@ -131,6 +209,284 @@ class DatabaseManager:
             logger.error(f"Erro ao inicializar banco de dados: {e}")
             raise
     
+    def _create_indexes(self, cursor):
+        """Criar os índices usados pelos filtros de produtos e movimentações"""
+        # Período (ex.: movimentações de hoje, histórico por data)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_movimentacoes_data
+            ON movimentacoes (data_movimentacao)
+        ''')
+        
+        # Produto + período; também atende os triggers, que buscam por produto_id
+        cursor.execute('DROP INDEX IF EXISTS idx_movimentacoes_produto')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_movimentacoes_produto_data
+            ON movimentacoes (produto_id, data_movimentacao)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_produtos_categoria
+            ON produtos (categoria_id)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_produtos_fornecedor
+            ON produtos (fornecedor_id)
+        ''')
+        
+        # Índice parcial: só os produtos ativos com estoque baixo, já em ordem de nome
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_produtos_estoque_baixo
+            ON produtos (nome)
+            WHERE ativo = 1 AND estoque_atual <= estoque_minimo
+        ''')
+    
+    def _create_stock_triggers(self, cursor):
+        """Criar triggers que mantêm produtos.estoque_atual a partir das movimentações"""
+        # Entrada soma e saída subtrai; LOWER() tolera tipos gravados em maiúsculas
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_saldo_insert
+            AFTER INSERT ON movimentacoes
+            BEGIN
+                UPDATE produtos
+                SET estoque_atual = estoque_atual + CASE WHEN LOWER(NEW.tipo) = 'entrada'
+                                                         THEN NEW.quantidade
+                                                         ELSE -NEW.quantidade END
+                WHERE id = NEW.produto_id;
+            END
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_saldo_delete
+            AFTER DELETE ON movimentacoes
+            BEGIN
+                UPDATE produtos
+                SET estoque_atual = estoque_atual - CASE WHEN LOWER(OLD.tipo) = 'entrada'
+                                                         THEN OLD.quantidade
+                                                         ELSE -OLD.quantidade END
+                WHERE id = OLD.produto_id;
+            END
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_saldo_update
+            AFTER UPDATE OF produto_id, tipo, quantidade ON movimentacoes
+            BEGIN
+                UPDATE produtos
+                SET estoque_atual = estoque_atual - CASE WHEN LOWER(OLD.tipo) = 'entrada'
+                                                         THEN OLD.quantidade
+                                                         ELSE -OLD.quantidade END
+                WHERE id = OLD.produto_id;
+                UPDATE produtos
+                SET estoque_atual = estoque_atual + CASE WHEN LOWER(NEW.tipo) = 'entrada'
+                                                         THEN NEW.quantidade
+                                                         ELSE -NEW.quantidade END
+                WHERE id = NEW.produto_id;
+            END
+        ''')
+    
+    def _create_version_triggers(self, cursor):
+        """Criar a tabela de versões e os triggers que a incrementam a cada gravação"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS versoes_tabelas (
+                tabela TEXT PRIMARY KEY,
+                versao INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        
+        for tabela in TABELAS_VERSIONADAS:
+            cursor.execute("INSERT OR IGNORE INTO versoes_tabelas (tabela) VALUES (?)", [tabela])
+            for evento in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_{tabela}_versao_{evento.lower()}
+                    AFTER {evento} ON {tabela}
+                    BEGIN
+                        UPDATE versoes_tabelas SET versao = versao + 1 WHERE tabela = '{tabela}';
+                    END
+                ''')
+    
+    def _create_summary_tables(self, cursor):
+        """Criar tabelas de resumo de movimentações e os triggers que as mantêm"""
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?",
+            [RESUMOS_MOVIMENTACOES[0][0]]
+        )
+        tabelas_existiam = cursor.fetchone()[0] > 0
+        
+        for tabela, coluna, _ in RESUMOS_MOVIMENTACOES:
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {tabela} (
+                    {coluna} TEXT NOT NULL,
+                    produto_id INTEGER NOT NULL,
+                    tipo TEXT NOT NULL,
+                    total_movimentacoes INTEGER NOT NULL DEFAULT 0,
+                    total_quantidade INTEGER NOT NULL DEFAULT 0,
+                    valor_total REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY ({coluna}, produto_id, tipo)
+                ) WITHOUT ROWID
+            ''')
+        
+        # Última saída de cada produto (análise de estoque parado) sem varrer o resumo
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_resumo_diario_produto_tipo
+            ON resumo_movimentacoes_diario (produto_id, tipo, data)
+        ''')
+        
+        somar_new = "\n".join(self._sql_resumo_somar(*resumo, 'NEW') for resumo in RESUMOS_MOVIMENTACOES)
+        subtrair_old = "\n".join(self._sql_resumo_subtrair(*resumo, 'OLD') for resumo in RESUMOS_MOVIMENTACOES)
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_resumo_insert
+            AFTER INSERT ON movimentacoes
+            BEGIN
+                {somar_new}
+            END
+        ''')
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_resumo_delete
+            AFTER DELETE ON movimentacoes
+            BEGIN
+                {subtrair_old}
+            END
+        ''')
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_resumo_update
+            AFTER UPDATE OF produto_id, tipo, quantidade, valor_total, data_movimentacao ON movimentacoes
+            BEGIN
+                {subtrair_old}
+                {somar_new}
+            END
+        ''')
+        
+        # Banco já existente: gerar os resumos a partir do histórico
+        if not tabelas_existiam:
+            self._preencher_resumos(cursor)
+    
+    def _sql_resumo_somar(self, tabela, coluna, expressao, ref):
+        """SQL que acumula a movimentação ref (NEW/OLD) na tabela de resumo"""
+        chave = expressao.format(ref=ref)
+        return f'''
+                INSERT INTO {tabela} ({coluna}, produto_id, tipo, total_movimentacoes, total_quantidade, valor_total)
+                VALUES ({chave}, {ref}.produto_id, LOWER({ref}.tipo), 1, {ref}.quantidade, COALESCE({ref}.valor_total, 0))
+                ON CONFLICT ({coluna}, produto_id, tipo) DO UPDATE SET
+                    total_movimentacoes = total_movimentacoes + 1,
+                    total_quantidade = total_quantidade + excluded.total_quantidade,
+                    valor_total = valor_total + excluded.valor_total;'''
+    
+    def _sql_resumo_subtrair(self, tabela, coluna, expressao, ref):
+        """SQL que remove a movimentação ref (NEW/OLD) da tabela de resumo"""
+        chave = expressao.format(ref=ref)
+        filtro = f"{coluna} = {chave} AND produto_id = {ref}.produto_id AND tipo = LOWER({ref}.tipo)"
+        return f'''
+                UPDATE {tabela} SET
+                    total_movimentacoes = total_movimentacoes - 1,
+                    total_quantidade = total_quantidade - {ref}.quantidade,
+                    valor_total = valor_total - COALESCE({ref}.valor_total, 0)
+                WHERE {filtro};
+                DELETE FROM {tabela} WHERE {filtro} AND total_movimentacoes <= 0;'''
+    
+    def _preencher_resumos(self, cursor):
+        """Regenerar as tabelas de resumo a partir de todo o histórico"""
+        for tabela, _, _ in RESUMOS_MOVIMENTACOES:
+            cursor.execute(f"DELETE FROM {tabela}")
+        
+        # Com o banco de arquivo anexado, o histórico inclui as movimentações arquivadas
+        origem = 'movimentacoes_historico' if self._arquivo_anexado(cursor.connection) else 'movimentacoes'
+        cursor.execute(f'''
+            INSERT INTO resumo_movimentacoes_diario
+                (data, produto_id, tipo, total_movimentacoes, total_quantidade, valor_total)
+            SELECT
+                DATE(data_movimentacao),
+                produto_id,
+                LOWER(tipo),
+                COUNT(*),
+                SUM(quantidade),
+                SUM(COALESCE(valor_total, 0))
+            FROM {origem}
+            GROUP BY DATE(data_movimentacao), produto_id, LOWER(tipo)
+        ''')
+        
+        # O mensal é derivado do diário, sem reler as movimentações
+        cursor.execute('''
+            INSERT INTO resumo_movimentacoes_mensal
+                (mes, produto_id, tipo, total_movimentacoes, total_quantidade, valor_total)
+            SELECT
+                SUBSTR(data, 1, 7),
+                produto_id,
+                tipo,
+                SUM(total_movimentacoes),
+                SUM(total_quantidade),
+                SUM(valor_total)
+            FROM resumo_movimentacoes_diario
+            GROUP BY SUBSTR(data, 1, 7), produto_id, tipo
+        ''')
+    
+    def _create_search_index(self, cursor):
+        """Criar tabelas FTS5 de produtos e os triggers que as mantêm sincronizadas"""
+        for tabela, opcoes in INDICES_BUSCA_PRODUTOS:
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?",
+                [tabela]
+            )
+            if cursor.fetchone()[0] > 0:
+                continue
+            
+            try:
+                cursor.execute(f'''
+                    CREATE VIRTUAL TABLE {tabela} USING fts5(
+                        codigo, nome, descricao,
+                        content='produtos', content_rowid='id',
+                        {opcoes}
+                    )
+                ''')
+            except sqlite3.OperationalError as e:
+                # SQLite compilado sem FTS5 (ou sem o tokenizer): a busca usa LIKE
+                logger.warning(f"Índice de busca {tabela} indisponível: {e}")
+                continue
+            
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{tabela}_insert
+                AFTER INSERT ON produtos
+                BEGIN
+                    INSERT INTO {tabela} (rowid, codigo, nome, descricao)
+                    VALUES (NEW.id, NEW.codigo, NEW.nome, NEW.descricao);
+                END
+            ''')
+            
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{tabela}_delete
+                AFTER DELETE ON produtos
+                BEGIN
+                    INSERT INTO {tabela} ({tabela}, rowid, codigo, nome, descricao)
+                    VALUES ('delete', OLD.id, OLD.codigo, OLD.nome, OLD.descricao);
+                END
+            ''')
+            
+            # Só os campos indexados: a atualização de estoque não reescreve o índice
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{tabela}_update
+                AFTER UPDATE OF codigo, nome, descricao ON produtos
+                BEGIN
+                    INSERT INTO {tabela} ({tabela}, rowid, codigo, nome, descricao)
+                    VALUES ('delete', OLD.id, OLD.codigo, OLD.nome, OLD.descricao);
+                    INSERT INTO {tabela} (rowid, codigo, nome, descricao)
+                    VALUES (NEW.id, NEW.codigo, NEW.nome, NEW.descricao);
+                END
+            ''')
+            
+            cursor.execute(f"INSERT INTO {tabela} ({tabela}) VALUES ('rebuild')")
+            logger.info(f"Índice de busca {tabela} criado")
+    
+    def tabela_existe(self, nome):
+        """Verificar se uma tabela (inclusive virtual) existe no banco"""
+        result = self.execute_query(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?",
+            [nome]
+        )
+        return result[0][0] > 0
+    
     def _insert_initial_data(self, cursor):
         """Inserir dados iniciais no banco"""
         # Categoria padrão
@@ -155,6 +511,7 @@ class DatabaseManager:
         """Executar query e retornar resultados"""
         conn = self.get_connection()
         cursor = conn.cursor()
+        inicio = time.perf_counter()
         
         try:
             if params:
@@ -162,33 +519,353 @@ class DatabaseManager:
             else:
                 cursor.execute(query)
             
-            if query.strip().upper().startswith('SELECT'):
-                return cursor.fetchall()
+            if query.strip().upper().startswith(('SELECT', 'WITH')):
+                resultado = cursor.fetchall()
+                linhas = len(resultado)
             else:
                 conn.commit()
-                return cursor.rowcount
+                resultado = linhas = cursor.rowcount
                 
         except Exception as e:
             conn.rollback()
             logger.error(f"Erro ao executar query: {e}")
             raise
+        
+        self._medir(conn, query, params, inicio, linhas)
+        return resultado
+    
+    def _medir(self, conn, query, params, inicio, linhas):
+        """Registrar o tempo da query e gravar no log as lentas"""
+        if not DATABASE_CONFIG.get('instrumentacao', True):
+            return
+        
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        estatisticas.registrar(query, duracao_ms, linhas)
+        
+        if duracao_ms >= DATABASE_CONFIG.get('consulta_lenta_ms', 200):
+            registrar_consulta_lenta(conn, query, params, duracao_ms)
+    
+    def abrir_cursor(self, query, params=None):
+        """Abrir cursor em conexão própria para ler as linhas sob demanda"""
+        # O chamador fecha com cursor.connection.close(); a conexão pode passar entre
+        # threads do pool (uma de cada vez), por isso sem check_same_thread
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        
+        try:
+            self._anexar_arquivo(conn)
+            inicio = time.perf_counter()
+            cursor = conn.execute(query, params or [])
+        except Exception as e:
+            conn.close()
+            logger.error(f"Erro ao abrir cursor: {e}")
+            raise
+        
+        self._medir(conn, query, params, inicio, 0)
+        return cursor
+    
+    def _registrar_saldos_iniciais(self, cursor, filtro="1 = 1", data_corte=None):
+        """Gravar como saldo inicial a parte de estoque_atual não explicada pelas movimentações do banco principal"""
+        # filtro: condição sobre os produtos (alias p) a registrar
+        cursor.execute(f'''
+            INSERT INTO saldos_iniciais (produto_id, quantidade, data_corte)
+            SELECT
+                p.id,
+                p.estoque_atual - COALESCE((
+                    SELECT SUM(CASE WHEN LOWER(m.tipo) = 'entrada' THEN m.quantidade ELSE -m.quantidade END)
+                    FROM main.movimentacoes m
+                    WHERE m.produto_id = p.id
+                ), 0),
+                ?
+            FROM produtos p
+            WHERE {filtro}
+            ON CONFLICT (produto_id) DO UPDATE SET
+                quantidade = excluded.quantidade,
+                data_corte = COALESCE(excluded.data_corte, data_corte)
+        ''', [data_corte])
+    
+    def _gravar_estoque(self, conn, produto_id, quantidade):
+        """Ajustar o saldo inicial pela diferença e gravar estoque_atual (sem commit)"""
+        # Ajuste antes do UPDATE: a diferença é medida sobre o saldo gravado
+        conn.execute('''
+            INSERT INTO saldos_iniciais (produto_id, quantidade)
+            SELECT id, ? - estoque_atual FROM produtos WHERE id = ?
+            ON CONFLICT (produto_id) DO UPDATE SET
+                quantidade = quantidade + excluded.quantidade
+        ''', [quantidade, produto_id])
+        return conn.execute(
+            "UPDATE produtos SET estoque_atual = ? WHERE id = ?", [quantidade, produto_id]
+        ).rowcount
+    
+    def definir_estoque(self, produto_id, quantidade):
+        """Gravar estoque_atual fora de uma movimentação; a diferença vira ajuste do saldo inicial"""
+        conn = self.get_connection()
+        try:
+            linhas = self._gravar_estoque(conn, produto_id, quantidade)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Erro ao definir estoque: {e}")
+            raise
+        return linhas
+    
+    def criar_produto(self, dados, estoque=0):
+        """Inserir produto e, na mesma transação, o estoque do cadastro como saldo inicial"""
+        campos = list(dados)
+        conn = self.get_connection()
+        try:
+            produto_id = conn.execute(
+                f"INSERT INTO produtos ({', '.join(campos)}) VALUES ({', '.join('?' for _ in campos)})",
+                [dados[campo] for campo in campos]
+            ).lastrowid
+            if estoque:
+                self._gravar_estoque(conn, produto_id, estoque)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Erro ao criar produto: {e}")
+            raise
+        return produto_id
+    
+    def verificar_saldos(self, corrigir=False):
+        """Recalcular saldos a partir do histórico e retornar produtos divergentes"""
+        query = '''
+            SELECT
+                p.id,
+                p.codigo,
+                p.nome,
+                p.estoque_atual,
+                COALESCE(si.quantidade, 0) + COALESCE(SUM(CASE WHEN LOWER(m.tipo) = 'entrada'
+                                                               THEN m.quantidade
+                                                               ELSE -m.quantidade END), 0) AS saldo_calculado
+            FROM produtos p
+            LEFT JOIN saldos_iniciais si ON si.produto_id = p.id
+            LEFT JOIN movimentacoes m ON m.produto_id = p.id
+            GROUP BY p.id
+            HAVING p.estoque_atual != saldo_calculado
+            ORDER BY p.codigo
+        '''
+        
+        divergencias = []
+        for row in self.execute_query(query):
+            item = dict(row)
+            item['diferenca'] = item['estoque_atual'] - item['saldo_calculado']
+            item['corrigido'] = False
+            divergencias.append(item)
+        
+        if divergencias:
+            logger.warning(f"{len(divergencias)} produto(s) com saldo divergente do histórico")
+        
+        # Saldo recalculado negativo indica histórico incompleto: o estoque gravado é mantido
+        corrigir_itens = []
+        if corrigir:
+            for item in divergencias:
+                if item['saldo_calculado'] >= 0:
+                    corrigir_itens.append(item)
+                else:
+                    logger.warning(f"Saldo de {item['codigo']} não corrigido: recalculado negativo "
+                                   f"({item['saldo_calculado']})")
+        
+        if corrigir_itens:
+            conn = self.get_connection()
+            try:
+                conn.executemany(
+                    "UPDATE produtos SET estoque_atual = ? WHERE id = ?",
+                    [(item['saldo_calculado'], item['id']) for item in corrigir_itens]
+                )
+                conn.commit()
+                for item in corrigir_itens:
+                    item['corrigido'] = True
+                logger.info(f"Saldos corrigidos: {len(corrigir_itens)} produto(s)")
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Erro ao corrigir saldos: {e}")
+                raise
+        
+        return divergencias
+    
+    def reconstruir_resumos(self):
+        """Reconstruir as tabelas de resumo de movimentações a partir do histórico"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            self._preencher_resumos(cursor)
+            conn.commit()
+            
+            cursor.execute("SELECT COUNT(*) FROM resumo_movimentacoes_diario")
+            total_diario = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM resumo_movimentacoes_mensal")
+            total_mensal = cursor.fetchone()[0]
+            
+            logger.info(f"Resumos reconstruídos: {total_diario} linha(s) diárias, {total_mensal} mensais")
+            return {'diario': total_diario, 'mensal': total_mensal}
+        
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Erro ao reconstruir resumos: {e}")
+            raise
+    
+    def _arquivo_anexado(self, conn):
+        """Verificar se o banco de arquivo está anexado à conexão"""
+        return any(row[1] == 'arquivo' for row in conn.execute("PRAGMA database_list"))
     
-    def backup_database(self):
-        """Criar backup do banco de dados"""
+    def _anexar_arquivo(self, conn, criar=False):
+        """Anexar o banco de arquivo (se existir) e criar a view do histórico completo"""
+        if self._arquivo_anexado(conn):
+            return True
+        if not criar and not self.arquivo_path.exists():
+            return False
+        
+        conn.execute("ATTACH DATABASE ? AS arquivo", [str(self.arquivo_path)])
+        
+        # Mesmas colunas e índices da tabela principal, sem chaves estrangeiras
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS arquivo.movimentacoes (
+                id INTEGER PRIMARY KEY,
+                produto_id INTEGER NOT NULL,
+                tipo TEXT NOT NULL,
+                quantidade INTEGER NOT NULL,
+                preco_unitario REAL,
+                valor_total REAL,
+                motivo TEXT,
+                documento TEXT,
+                observacoes TEXT,
+                data_movimentacao TIMESTAMP,
+                usuario TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS arquivo.idx_movimentacoes_data
+            ON movimentacoes (data_movimentacao)
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS arquivo.idx_movimentacoes_produto_data
+            ON movimentacoes (produto_id, data_movimentacao)
+        ''')
+        
+        # View temporária: existe só nesta conexão, como o próprio ATTACH
+        conn.execute(f'''
+            CREATE TEMP VIEW IF NOT EXISTS movimentacoes_historico AS
+            SELECT {COLUNAS_MOVIMENTACOES} FROM main.movimentacoes
+            UNION ALL
+            SELECT {COLUNAS_MOVIMENTACOES} FROM arquivo.movimentacoes
+        ''')
+        return True
+    
+    def data_corte_arquivo(self):
+        """Data (AAAA-MM-DD) antes da qual as movimentações estão no arquivo, ou None"""
+        conn = self.get_connection()
+        if not self._anexar_arquivo(conn):
+            return None
+        return conn.execute("SELECT MAX(data_corte) FROM saldos_iniciais").fetchone()[0]
+    
+    def arquivar_movimentacoes(self, corte, compactar=False):
+        """Mover as movimentações anteriores à data de corte para o banco de arquivo"""
+        # Uma transação: as linhas vão para o arquivo, o saldo no corte vira saldo inicial
+        # e o que os triggers de exclusão alteram (saldo e resumos) é restaurado, pois
+        # as movimentações continuam existindo, só que no arquivo
+        corte = corte.isoformat() if hasattr(corte, 'isoformat') else str(corte)[:10]
+        conn = self.get_connection()
+        self._anexar_arquivo(conn, criar=True)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("SELECT COUNT(*) FROM main.movimentacoes WHERE data_movimentacao < ?", [corte])
+            if not cursor.fetchone()[0]:
+                return {'movimentacoes': 0, 'produtos': 0, 'corte': corte}
+            
+            # OR IGNORE: refazer após uma falha entre os dois bancos não duplica linhas
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO arquivo.movimentacoes ({COLUNAS_MOVIMENTACOES})
+                SELECT {COLUNAS_MOVIMENTACOES} FROM main.movimentacoes
+                WHERE data_movimentacao < ?
+            ''', [corte])
+            
+            # Estado que os triggers de exclusão vão alterar; o mensal inclui o mês do corte
+            cursor.execute('''
+                CREATE TEMP TABLE arquivar_saldos AS
+                SELECT id, estoque_atual FROM produtos
+                WHERE id IN (SELECT produto_id FROM main.movimentacoes WHERE data_movimentacao < ?)
+            ''', [corte])
+            cursor.execute('''
+                CREATE TEMP TABLE arquivar_resumo_diario AS
+                SELECT * FROM resumo_movimentacoes_diario WHERE data < ?
+            ''', [corte])
+            cursor.execute('''
+                CREATE TEMP TABLE arquivar_resumo_mensal AS
+                SELECT * FROM resumo_movimentacoes_mensal WHERE mes <= ?
+            ''', [corte[:7]])
+            
+            cursor.execute("DELETE FROM main.movimentacoes WHERE data_movimentacao < ?", [corte])
+            total = cursor.rowcount
+            
+            cursor.execute('''
+                UPDATE produtos
+                SET estoque_atual = (SELECT s.estoque_atual FROM arquivar_saldos s WHERE s.id = produtos.id)
+                WHERE id IN (SELECT id FROM arquivar_saldos)
+            ''')
+            cursor.execute("INSERT OR REPLACE INTO resumo_movimentacoes_diario SELECT * FROM arquivar_resumo_diario")
+            cursor.execute("INSERT OR REPLACE INTO resumo_movimentacoes_mensal SELECT * FROM arquivar_resumo_mensal")
+            
+            # Saldo no corte: estoque atual menos as movimentações que ficaram no banco principal
+            self._registrar_saldos_iniciais(cursor, "p.id IN (SELECT id FROM arquivar_saldos)", data_corte=corte)
+            total_produtos = cursor.rowcount
+            
+            for tabela in ('arquivar_saldos', 'arquivar_resumo_diario', 'arquivar_resumo_mensal'):
+                cursor.execute(f"DROP TABLE temp.{tabela}")
+            
+            conn.commit()
+            
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Erro ao arquivar movimentações: {e}")
+            raise
+        
+        # Devolver ao sistema as páginas liberadas no banco principal
+        if compactar:
+            conn.execute("VACUUM main")
+        
+        logger.info(f"Movimentações arquivadas: {total} anteriores a {corte} ({total_produtos} produto(s))")
+        return {'movimentacoes': total, 'produtos': total_produtos, 'corte': corte}
+    
+    def backup_database(self, progresso=None):
+        """Criar backup consistente do banco usando a API de backup do SQLite"""
+        # Cópia em passos de poucas páginas, liberando o banco entre eles; se outra
+        # conexão gravar no meio, o SQLite reinicia a cópia (snapshot consistente).
+        # Abre conexões próprias, então pode rodar em uma thread de trabalho.
+        backup_path = None
         try:
             backup_name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-            backup_path = Path("backups") / backup_name
+            backup_path = BACKUPS_DIR / backup_name
             
             # Criar diretório de backup se não existir
             backup_path.parent.mkdir(exist_ok=True)
             
-            # Copiar banco de dados
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
+            paginas_por_passo = BACKUP_CONFIG.get('paginas_por_passo', 1024)
+            pausa = BACKUP_CONFIG.get('pausa_entre_passos', 0.005)
+            
+            def _progresso(status, restantes, total):
+                if progresso:
+                    progresso(total - restantes, total)
+                # Dar chance às gravações pendentes antes do próximo passo
+                if restantes and pausa:
+                    time.sleep(pausa)
+            
+            origem = sqlite3.connect(str(self.db_path))
+            destino = sqlite3.connect(str(backup_path))
+            try:
+                origem.backup(destino, pages=paginas_por_passo, progress=_progresso)
+            finally:
+                destino.close()
+                origem.close()
             
             logger.info(f"Backup criado: {backup_path}")
             return backup_path
             
         except Exception as e:
             logger.error(f"Erro ao criar backup: {e}")
-            raise 
\ No newline at end of file
+            # Não deixar um arquivo de backup incompleto para trás
+            if backup_path is not None and backup_path.exists():
+                backup_path.unlink()
+            raise
\ No newline at end of file
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação das queries: tempos por instrução e log de queries lentas
+"""
+
+import re
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores (ms) das faixas do histograma de latência
+FAIXAS_LATENCIA = (1, 5, 10, 50, 100, 500, 1000, float('inf'))
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_ESPACOS = re.compile(r"\s+")
+
+def normalizar_sql(query):
+    """Normalizar SQL para agrupar instruções que só diferem nos valores"""
+    sql = _RE_STRING.sub('?', query)
+    sql = _RE_NUMERO.sub('?', sql)
+    sql = _RE_ESPACOS.sub(' ', sql).strip()
+    return _RE_LISTA.sub('(?, ...)', sql)
+
+def rotulo_faixa(limite):
+    """Rótulo de uma faixa do histograma"""
+    return f"> {FAIXAS_LATENCIA[-2]} ms" if limite == float('inf') else f"≤ {limite} ms"
+
+class EstatisticasQueries:
+    """Acumula tempos e linhas por instrução SQL normalizada"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dados = {}
+    
+    def registrar(self, query, duracao_ms, linhas):
+        """Registrar uma execução"""
+        sql = normalizar_sql(query)
+        
+        with self._lock:
+            item = self._dados.get(sql)
+            if item is None:
+                item = self._dados[sql] = {
+                    'sql': sql,
+                    'execucoes': 0,
+                    'tempo_total': 0.0,
+                    'tempo_maximo': 0.0,
+                    'linhas': 0,
+                    'histograma': [0] * len(FAIXAS_LATENCIA)
+                }
+            
+            item['execucoes'] += 1
+            item['tempo_total'] += duracao_ms
+            item['tempo_maximo'] = max(item['tempo_maximo'], duracao_ms)
+            item['linhas'] += max(linhas, 0)
+            
+            for indice, limite in enumerate(FAIXAS_LATENCIA):
+                if duracao_ms <= limite:
+                    item['histograma'][indice] += 1
+                    break
+    
+    def top(self, limite=20):
+        """Instruções ordenadas pelo tempo total gasto"""
+        with self._lock:
+            itens = [dict(item, histograma=list(item['histograma'])) for item in self._dados.values()]
+        
+        for item in itens:
+            item['tempo_medio'] = item['tempo_total'] / item['execucoes']
+        
+        itens.sort(key=lambda item: item['tempo_total'], reverse=True)
+        return itens[:limite] if limite else itens
+    
+    def limpar(self):
+        """Zerar as estatísticas"""
+        with self._lock:
+            self._dados.clear()
+
+# Estatísticas compartilhadas por todas as conexões do processo
+estatisticas = EstatisticasQueries()
+
+def registrar_consulta_lenta(conn, query, params, duracao_ms):
+    """Gravar no log uma query lenta com o plano de execução"""
+    try:
+        cursor = conn.execute(f"EXPLAIN QUERY PLAN {query}", params or [])
+        plano = '\n'.join(f"    {row[0]}|{row[1]}|{row[3]}" for row in cursor.fetchall())
+    except Exception as e:
+        plano = f"    (plano indisponível: {e})"
+    
+    logger.warning(
+        f"Query lenta ({duracao_ms:.1f} ms): {normalizar_sql(query)}\n"
+        f"  Plano de execução:\n{plano}"
+    )
\ No newline at end of file
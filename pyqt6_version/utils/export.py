@@ -3,211 +3,428 @@
 Utilitário para exportação de dados
 """
 
-import pandas as pd
+import csv
+import gzip
+import pickle
+import time
 from pathlib import Path
 from datetime import datetime
+from itertools import chain, islice
 import logging
-from config.settings import EXPORTS_DIR
+from config.settings import EXPORTS_DIR, EXPORT_CONFIG
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+from functools import lru_cache
 from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.platypus import Table, TableStyle
+from reportlab.pdfgen import canvas
 
 logger = logging.getLogger(__name__)
 
+# Linhas usadas para estimar a largura das colunas do Excel
+AMOSTRA_LARGURA = 200
+LARGURA_MAXIMA = 50
+
+# Geometria das páginas do PDF (pontos)
+MARGEM_PDF = 36
+ALTURA_TITULO = 46
+ALTURA_CABECALHO = 20
+ALTURA_LINHA = 14
+ALTURA_RODAPE = 12
+TAMANHO_FONTE_PDF = 8
+
+class ExportacaoCancelada(Exception):
+    """Levantada pelo callback de progresso para interromper uma exportação"""
+
+@lru_cache(maxsize=None)
+def estilo_tabela_pdf():
+    """Estilo das tabelas do PDF, criado uma única vez e reusado em todas as páginas"""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), TAMANHO_FONTE_PDF),
+    ])
+
+def criar_snapshot(linhas):
+    """Serializar linhas (dicts) de forma compacta (cabeçalho único e tuplas); retorna (bytes, linhas)"""
+    cabecalho = None
+    valores = []
+    for linha in linhas:
+        if cabecalho is None:
+            cabecalho = tuple(linha.keys())
+        valores.append(tuple(linha.get(coluna) for coluna in cabecalho))
+    return pickle.dumps((cabecalho or (), valores), protocol=pickle.HIGHEST_PROTOCOL), len(valores)
+
+def exportar_snapshot(export_dir, formato, filename, title, snapshot):
+    """Renderizar um snapshot em um formato (executado em processo separado)"""
+    inicio = time.perf_counter()
+    cabecalho, valores = pickle.loads(snapshot)
+    dados = (dict(zip(cabecalho, linha)) for linha in valores)
+    
+    export_manager = ExportManager(export_dir)
+    if formato == 'xlsx':
+        arquivo = export_manager.export_to_excel(dados, filename)
+    elif formato == 'csv':
+        arquivo = export_manager.export_to_csv(dados, filename)
+    elif formato == 'pdf':
+        arquivo = export_manager.export_to_pdf(dados, filename, title)
+    else:
+        raise ValueError(f"Formato não suportado: {formato}")
+    
+    return {
+        'arquivo': arquivo,
+        'linhas': len(valores),
+        'segundos': time.perf_counter() - inicio
+    }
+
 class ExportManager:
     """Gerenciador de exportações"""
     
-    def __init__(self):
-        self.export_dir = EXPORTS_DIR
+    def __init__(self, export_dir=None):
+        self.export_dir = Path(export_dir) if export_dir else EXPORTS_DIR
         
-    def export_to_excel(self, data, filename, sheet_name="Dados"):
-        """Exportar dados para Excel"""
+    def export_to_excel(self, data, filename, sheet_name="Dados", progresso=None):
+        """Exportar dados (lista ou gerador de dicts) para Excel em modo streaming"""
+        filepath = None
         try:
-            if not data:
+            linhas = iter(data)
+            amostra = list(islice(linhas, AMOSTRA_LARGURA))
+            if not amostra:
                 raise ValueError("Não há dados para exportar")
             
             # Preparar nome do arquivo
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            full_filename = f"{filename}_{timestamp}.xlsx"
-            filepath = self.export_dir / full_filename
+            filepath = self._caminho_exportacao(filename, 'xlsx')
             
-            # Criar DataFrame
-            df = pd.DataFrame(data)
+            # Modo write-only: cada linha vai direto para o arquivo e a memória
+            # não cresce com o número de linhas
+            workbook = Workbook(write_only=True)
+            worksheet = workbook.create_sheet(sheet_name)
+            headers = list(amostra[0].keys())
             
-            # Exportar para Excel
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                
-                # Ajustar largura das colunas
-                worksheet = writer.sheets[sheet_name]
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-            
-            logger.info(f"Dados exportados para Excel: {filepath}")
+            # Larguras estimadas pela amostra (precisam ser definidas antes das linhas)
+            for indice, coluna in enumerate(headers, start=1):
+                max_length = max(
+                    [len(str(coluna))] +
+                    [len(str(row.get(coluna, ''))) for row in amostra]
+                )
+                worksheet.column_dimensions[get_column_letter(indice)].width = min(
+                    max_length + 2, LARGURA_MAXIMA
+                )
+            
+            cabecalho = []
+            for coluna in headers:
+                celula = WriteOnlyCell(worksheet, value=coluna)
+                celula.font = Font(bold=True)
+                cabecalho.append(celula)
+            worksheet.append(cabecalho)
+            
+            total = self._escrever_linhas(
+                chain(amostra, linhas),
+                lambda row: worksheet.append([row.get(coluna) for coluna in headers]),
+                progresso
+            )
+            
+            workbook.save(filepath)
+            
+            logger.info(f"Dados exportados para Excel: {filepath} ({total} linhas)")
             return str(filepath)
             
+        except ExportacaoCancelada:
+            self._remover_parcial(filepath)
+            logger.info("Exportação para Excel cancelada")
+            raise
         except Exception as e:
+            self._remover_parcial(filepath)
             logger.error(f"Erro ao exportar para Excel: {e}")
             raise
     
-    def export_to_csv(self, data, filename):
-        """Exportar dados para CSV"""
+    def export_to_csv(self, data, filename, comprimir=None, progresso=None):
+        """Exportar dados (lista ou gerador de dicts) para CSV em streaming"""
+        filepath = None
         try:
-            if not data:
+            linhas = iter(data)
+            primeira = next(linhas, None)
+            if primeira is None:
                 raise ValueError("Não há dados para exportar")
             
+            if comprimir is None:
+                comprimir = EXPORT_CONFIG.get('comprimir_csv', False)
+            
             # Preparar nome do arquivo
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            full_filename = f"{filename}_{timestamp}.csv"
-            filepath = self.export_dir / full_filename
+            filepath = self._caminho_exportacao(filename, 'csv.gz' if comprimir else 'csv')
             
-            # Criar DataFrame e exportar
-            df = pd.DataFrame(data)
-            df.to_csv(filepath, index=False, encoding='utf-8-sig')
+            # Cada linha é gravada assim que lida; gzip comprime no mesmo fluxo
+            abrir = gzip.open if comprimir else open
+            with abrir(filepath, 'wt', newline='', encoding='utf-8-sig') as arquivo:
+                writer = csv.DictWriter(arquivo, fieldnames=list(primeira.keys()), extrasaction='ignore')
+                writer.writeheader()
+                total = self._escrever_linhas(chain([primeira], linhas), writer.writerow, progresso)
             
-            logger.info(f"Dados exportados para CSV: {filepath}")
+            logger.info(f"Dados exportados para CSV: {filepath} ({total} linhas)")
             return str(filepath)
             
+        except ExportacaoCancelada:
+            self._remover_parcial(filepath)
+            logger.info("Exportação para CSV cancelada")
+            raise
         except Exception as e:
+            self._remover_parcial(filepath)
             logger.error(f"Erro ao exportar para CSV: {e}")
             raise
     
-    def export_to_pdf(self, data, filename, title="Relatório"):
-        """Exportar dados para PDF"""
+    def export_to_pdf(self, data, filename, title="Relatório", progresso=None):
+        """Exportar dados (lista ou gerador de dicts) para PDF, desenhando uma página por vez"""
+        filepath = None
         try:
-            if not data:
+            linhas = iter(data)
+            primeira = next(linhas, None)
+            if primeira is None:
                 raise ValueError("Não há dados para exportar")
             
             # Preparar nome do arquivo
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            full_filename = f"{filename}_{timestamp}.pdf"
-            filepath = self.export_dir / full_filename
-            
-            # Criar documento PDF
-            doc = SimpleDocTemplate(str(filepath), pagesize=A4)
-            elements = []
-            
-            # Estilos
-            styles = getSampleStyleSheet()
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=16,
-                alignment=1,  # Centro
-                spaceAfter=30
-            )
+            filepath = self._caminho_exportacao(filename, 'pdf')
             
-            # Título
-            elements.append(Paragraph(title, title_style))
-            elements.append(Spacer(1, 12))
+            headers = list(primeira.keys())
+            pagesize = landscape(A4) if len(headers) > 6 else A4
+            largura, altura = pagesize
             
-            # Preparar dados da tabela
-            if data:
-                # Cabeçalhos
-                headers = list(data[0].keys())
-                table_data = [headers]
+            # Linhas por página; a primeira perde o espaço do título
+            espaco = altura - 2 * MARGEM_PDF - ALTURA_CABECALHO - ALTURA_RODAPE
+            linhas_por_pagina = max(int(espaco // ALTURA_LINHA), 1)
+            linhas_primeira = max(int((espaco - ALTURA_TITULO) // ALTURA_LINHA), 1)
+            
+            pagina = [primeira] + list(islice(linhas, linhas_primeira - 1))
+            
+            # Larguras fixas, estimadas pela primeira página, mantêm as colunas
+            # alinhadas entre as páginas
+            col_widths = self._larguras_pdf(headers, pagina, largura - 2 * MARGEM_PDF)
+            limites = [max(int(w / (TAMANHO_FONTE_PDF * 0.55)), 3) for w in col_widths]
+            gerado_em = datetime.now().strftime('%d/%m/%Y às %H:%M')
+            
+            # Cada página vira uma tabela pequena desenhada direto no canvas:
+            # o layout não cresce com o relatório e só uma página fica em memória
+            pdf = canvas.Canvas(str(filepath), pagesize=pagesize)
+            pdf.setTitle(title)
+            
+            numero = 0
+            total = 0
+            while pagina:
+                numero += 1
+                topo = altura - MARGEM_PDF
                 
-                # Dados
-                for row in data:
-                    table_data.append([str(row.get(col, '')) for col in headers])
+                if numero == 1:
+                    pdf.setFont('Helvetica-Bold', 16)
+                    pdf.drawCentredString(largura / 2, topo - 16, title)
+                    topo -= ALTURA_TITULO
                 
-                # Criar tabela
-                table = Table(table_data)
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ]))
+                dados = [headers] + [
+                    [self._texto_pdf(row.get(coluna, ''), limite) for coluna, limite in zip(headers, limites)]
+                    for row in pagina
+                ]
+                tabela = Table(
+                    dados, colWidths=col_widths,
+                    rowHeights=[ALTURA_CABECALHO] + [ALTURA_LINHA] * len(pagina)
+                )
+                tabela.setStyle(estilo_tabela_pdf())
+                _, altura_tabela = tabela.wrapOn(pdf, largura, altura)
+                tabela.drawOn(pdf, MARGEM_PDF, topo - altura_tabela)
                 
-                elements.append(table)
-            
-            # Rodapé com data
-            elements.append(Spacer(1, 20))
-            footer = Paragraph(
-                f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}",
-                styles['Normal']
-            )
-            elements.append(footer)
+                # Rodapé com data e página
+                pdf.setFont('Helvetica', 8)
+                pdf.drawString(MARGEM_PDF, MARGEM_PDF / 2, f"Gerado em: {gerado_em}")
+                pdf.drawRightString(largura - MARGEM_PDF, MARGEM_PDF / 2, f"Página {numero}")
+                pdf.showPage()
+                
+                total += len(pagina)
+                if progresso:
+                    progresso(total)
+                
+                pagina = list(islice(linhas, linhas_por_pagina))
             
-            # Construir PDF
-            doc.build(elements)
+            pdf.save()
             
-            logger.info(f"Dados exportados para PDF: {filepath}")
+            logger.info(f"Dados exportados para PDF: {filepath} ({total} linhas, {numero} páginas)")
             return str(filepath)
             
+        except ExportacaoCancelada:
+            self._remover_parcial(filepath)
+            logger.info("Exportação para PDF cancelada")
+            raise
         except Exception as e:
+            self._remover_parcial(filepath)
             logger.error(f"Erro ao exportar para PDF: {e}")
             raise
     
-    def export_produtos(self, produtos, formato='xlsx'):
-        """Exportar lista de produtos"""
-        # Preparar dados para exportação
-        export_data = []
-        for produto in produtos:
-            export_data.append({
-                'Código': produto.get('codigo', ''),
-                'Nome': produto.get('nome', ''),
-                'Categoria': produto.get('categoria_nome', ''),
-                'Fornecedor': produto.get('fornecedor_nome', ''),
-                'Preço Compra': f"R$ {produto.get('preco_compra', 0):.2f}",
-                'Preço Venda': f"R$ {produto.get('preco_venda', 0):.2f}",
-                'Estoque Atual': produto.get('estoque_atual', 0),
-                'Estoque Mínimo': produto.get('estoque_minimo', 0),
-                'Unidade': produto.get('unidade', ''),
-                'Localização': produto.get('localizacao', '')
-            })
+    def _larguras_pdf(self, headers, amostra, largura_total):
+        """Larguras das colunas proporcionais ao texto da amostra"""
+        tamanhos = []
+        for coluna in headers:
+            # Cabeçalho em negrito e fonte maior ocupa cerca de 1,4 vez o corpo
+            maior = max(
+                [int(len(str(coluna)) * 1.4)] +
+                [len(str(row.get(coluna, ''))) for row in amostra]
+            )
+            tamanhos.append(min(max(maior, 4), 40))
+        
+        soma = sum(tamanhos)
+        return [largura_total * tamanho / soma for tamanho in tamanhos]
+    
+    def _texto_pdf(self, valor, limite):
+        """Texto da célula cortado para caber na largura da coluna"""
+        texto = '' if valor is None else str(valor)
+        return texto if len(texto) <= limite else texto[:limite - 3] + '...'
+    
+    def _caminho_exportacao(self, filename, extensao):
+        """Reservar um nome de arquivo único (exportações simultâneas não se sobrescrevem)"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        sufixo = ''
+        for numero in range(2, 1000):
+            filepath = self.export_dir / f"{filename}_{timestamp}{sufixo}.{extensao}"
+            try:
+                # Criação exclusiva: só uma thread consegue reservar cada nome
+                with open(filepath, 'x'):
+                    return filepath
+            except FileExistsError:
+                sufixo = f"_{numero}"
+        raise FileExistsError(f"Não foi possível reservar nome para {filename}")
+    
+    def _remover_parcial(self, filepath):
+        """Apagar o arquivo incompleto de uma exportação interrompida"""
+        if filepath is not None and filepath.exists():
+            try:
+                filepath.unlink()
+            except OSError as e:
+                logger.error(f"Erro ao remover exportação incompleta {filepath}: {e}")
+    
+    def _escrever_linhas(self, linhas, escrever, progresso=None):
+        """Gravar linha a linha chamando progresso(total) a cada intervalo"""
+        intervalo = EXPORT_CONFIG.get('intervalo_progresso', 1000)
+        total = 0
+        for linha in linhas:
+            escrever(linha)
+            total += 1
+            if progresso and total % intervalo == 0:
+                progresso(total)
+        
+        if progresso:
+            progresso(total)
+        return total
+    
+    def linha_produto(self, produto):
+        """Linha de exportação de um produto"""
+        return {
+            'Código': produto.get('codigo', ''),
+            'Nome': produto.get('nome', ''),
+            'Categoria': produto.get('categoria_nome', ''),
+            'Fornecedor': produto.get('fornecedor_nome', ''),
+            'Preço Compra': f"R$ {produto.get('preco_compra', 0):.2f}",
+            'Preço Venda': f"R$ {produto.get('preco_venda', 0):.2f}",
+            'Estoque Atual': produto.get('estoque_atual', 0),
+            'Estoque Mínimo': produto.get('estoque_minimo', 0),
+            'Unidade': produto.get('unidade', ''),
+            'Localização': produto.get('localizacao', '')
+        }
+    
+    def linha_analise(self, item):
+        """Linha de exportação da análise de estoque (Produto.get_analise_estoque)"""
+        return {
+            'Classe': item['classe'],
+            'Código': item['codigo'],
+            'Produto': item['nome'],
+            'Categoria': item.get('categoria_nome') or '',
+            'Estoque': item['estoque_atual'],
+            'Valor em Estoque': f"R$ {item['valor_estoque']:.2f}",
+            'Consumo': item['consumo'],
+            'Valor Consumido': f"R$ {item['valor_consumo']:.2f}",
+            'Acumulado': f"{item['fatia_acumulada']:.1%}",
+            'Giro': f"{item['giro']:.2f}" if item['giro'] is not None else '',
+            'Cobertura (dias)': f"{item['dias_cobertura']:.0f}" if item['dias_cobertura'] is not None else '',
+            'Última Saída': item['ultima_saida'] or '',
+            'Dias sem Saída': item['dias_sem_saida'] if item['dias_sem_saida'] is not None else '',
+            'Parado': 'Sim' if item['estoque_parado'] else ''
+        }
+    
+    def linha_reposicao(self, item):
+        """Linha de exportação da sugestão de compra (Reposicao.get_reposicao)"""
+        return {
+            'Fornecedor': item.get('fornecedor_nome') or '',
+            'Código': item['codigo'],
+            'Produto': item['nome'],
+            'Estoque': item['estoque_atual'],
+            'Média Móvel/dia': f"{item['media_movel']:.2f}",
+            'Previsão/dia': f"{item['demanda_suavizada']:.2f}",
+            'Estoque Segurança': item['estoque_seguranca'],
+            'Ponto de Pedido': item['ponto_pedido'],
+            'Dias até Ruptura': f"{item['dias_ate_ruptura']:.0f}" if item['dias_ate_ruptura'] is not None else '',
+            'Comprar': item['quantidade_sugerida'],
+            'Valor do Pedido': f"R$ {item['valor_sugerido']:.2f}"
+        }
+    
+    def linha_movimentacao(self, mov):
+        """Linha de exportação de uma movimentação"""
+        return {
+            'Data': mov.get('data_movimentacao', ''),
+            'Produto': mov.get('produto_nome', ''),
+            'Código': mov.get('produto_codigo', ''),
+            'Tipo': mov.get('tipo', '').title(),
+            'Quantidade': mov.get('quantidade', 0),
+            'Preço Unitário': f"R$ {mov.get('preco_unitario', 0):.2f}",
+            'Valor Total': f"R$ {mov.get('valor_total', 0):.2f}",
+            'Motivo': mov.get('motivo', ''),
+            'Documento': mov.get('documento', ''),
+            'Usuário': mov.get('usuario', '')
+        }
+    
+    def export_produtos(self, produtos, formato='xlsx', comprimir=None, progresso=None):
+        """Exportar produtos (lista ou gerador)"""
+        # Preparar dados para exportação sob demanda
+        export_data = map(self.linha_produto, produtos)
+        
+        # Exportar conforme formato
+        if formato == 'xlsx':
+            return self.export_to_excel(export_data, 'relatorio_produtos', progresso=progresso)
+        elif formato == 'csv':
+            return self.export_to_csv(export_data, 'relatorio_produtos', comprimir, progresso)
+        elif formato == 'pdf':
+            return self.export_to_pdf(export_data, 'relatorio_produtos', 'Relatório de Produtos', progresso)
+        else:
+            raise ValueError(f"Formato não suportado: {formato}")
+    
+    def export_movimentacoes(self, movimentacoes, formato='xlsx', comprimir=None, progresso=None):
+        """Exportar movimentações de estoque (lista ou gerador)"""
+        # Preparar dados para exportação sob demanda
+        export_data = map(self.linha_movimentacao, movimentacoes)
         
         # Exportar conforme formato
         if formato == 'xlsx':
-            return self.export_to_excel(export_data, 'relatorio_produtos')
+            return self.export_to_excel(export_data, 'relatorio_movimentacoes', progresso=progresso)
         elif formato == 'csv':
-            return self.export_to_csv(export_data, 'relatorio_produtos')
+            return self.export_to_csv(export_data, 'relatorio_movimentacoes', comprimir, progresso)
         elif formato == 'pdf':
-            return self.export_to_pdf(export_data, 'relatorio_produtos', 'Relatório de Produtos')
+            return self.export_to_pdf(export_data, 'relatorio_movimentacoes', 'Relatório de Movimentações', progresso)
         else:
             raise ValueError(f"Formato não suportado: {formato}")
     
-    def export_movimentacoes(self, movimentacoes, formato='xlsx'):
-        """Exportar movimentações de estoque"""
-        # Preparar dados para exportação
-        export_data = []
-        for mov in movimentacoes:
-            export_data.append({
-                'Data': mov.get('data_movimentacao', ''),
-                'Produto': mov.get('produto_nome', ''),
-                'Código': mov.get('produto_codigo', ''),
-                'Tipo': mov.get('tipo', '').title(),
-                'Quantidade': mov.get('quantidade', 0),
-                'Preço Unitário': f"R$ {mov.get('preco_unitario', 0):.2f}",
-                'Valor Total': f"R$ {mov.get('valor_total', 0):.2f}",
-                'Motivo': mov.get('motivo', ''),
-                'Documento': mov.get('documento', ''),
-                'Usuário': mov.get('usuario', '')
-            })
+    def export_reposicao(self, itens, formato='xlsx', comprimir=None, progresso=None):
+        """Exportar sugestão de compra por fornecedor (lista ou gerador)"""
+        # Preparar dados para exportação sob demanda
+        export_data = map(self.linha_reposicao, itens)
         
         # Exportar conforme formato
         if formato == 'xlsx':
-            return self.export_to_excel(export_data, 'relatorio_movimentacoes')
+            return self.export_to_excel(export_data, 'sugestao_compras', 'Sugestão de Compras', progresso)
         elif formato == 'csv':
-            return self.export_to_csv(export_data, 'relatorio_movimentacoes')
+            return self.export_to_csv(export_data, 'sugestao_compras', comprimir, progresso)
         elif formato == 'pdf':
-            return self.export_to_pdf(export_data, 'relatorio_movimentacoes', 'Relatório de Movimentações')
+            return self.export_to_pdf(export_data, 'sugestao_compras', 'Sugestão de Compras', progresso)
         else:
             raise ValueError(f"Formato não suportado: {formato}") 
\ No newline at end of file
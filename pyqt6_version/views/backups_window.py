@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Catálogo de backups do banco de dados
+"""
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
+                             QTableWidget, QTableWidgetItem, QLabel, QHeaderView,
+                             QMessageBox)
+from PyQt6.QtCore import Qt
+from config.settings import BACKUP_CONFIG
+from utils.backup import BackupManager, formatar_tamanho
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BackupsDialog(QDialog):
+    """Dialog com os backups existentes, tamanhos e durações"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.backup_manager = BackupManager()
+        self.setup_ui()
+        self.carregar_dados()
+    
+    def setup_ui(self):
+        """Configurar interface"""
+        self.setWindowTitle('Catálogo de Backups')
+        self.resize(750, 450)
+        
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        
+        # Política de backup configurada
+        politica = (
+            f"Automático: {'sim' if BACKUP_CONFIG.get('auto_backup') else 'não'} | "
+            f"Intervalo: {BACKUP_CONFIG.get('backup_interval', 24)}h | "
+            f"Retenção: {BACKUP_CONFIG.get('retencao_diaria', 7)} diários, "
+            f"{BACKUP_CONFIG.get('retencao_semanal', 4)} semanais, "
+            f"{BACKUP_CONFIG.get('retencao_mensal', 12)} mensais "
+            f"(máximo {BACKUP_CONFIG.get('max_backups', 30)})"
+        )
+        layout.addWidget(QLabel(politica))
+        
+        self.tabela = QTableWidget()
+        self.tabela.setColumnCount(5)
+        self.tabela.setHorizontalHeaderLabels([
+            'Data', 'Arquivo', 'Tamanho', 'Tamanho Original', 'Duração'
+        ])
+        self.tabela.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.tabela.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.tabela.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.tabela)
+        
+        self.label_total = QLabel()
+        layout.addWidget(self.label_total)
+        
+        botoes_layout = QHBoxLayout()
+        botoes_layout.addStretch()
+        
+        btn_atualizar = QPushButton('Atualizar')
+        btn_atualizar.clicked.connect(self.carregar_dados)
+        botoes_layout.addWidget(btn_atualizar)
+        
+        btn_fechar = QPushButton('Fechar')
+        btn_fechar.clicked.connect(self.accept)
+        botoes_layout.addWidget(btn_fechar)
+        
+        layout.addLayout(botoes_layout)
+    
+    def carregar_dados(self):
+        """Carregar o catálogo de backups"""
+        try:
+            backups = self.backup_manager.listar_backups()
+        except Exception as e:
+            logger.error(f"Erro ao carregar catálogo de backups: {e}")
+            QMessageBox.critical(self, 'Erro', f'Erro ao carregar catálogo de backups: {e}')
+            return
+        
+        self.tabela.setRowCount(len(backups))
+        for row, backup in enumerate(backups):
+            data = datetime.fromisoformat(backup['data']).strftime('%d/%m/%Y %H:%M:%S')
+            duracao = f"{backup['duracao']:.1f} s" if backup['duracao'] is not None else '-'
+            
+            self.tabela.setItem(row, 0, QTableWidgetItem(data))
+            self.tabela.setItem(row, 1, QTableWidgetItem(backup['arquivo']))
+            self.tabela.setItem(row, 2, QTableWidgetItem(formatar_tamanho(backup['tamanho'])))
+            self.tabela.setItem(row, 3, QTableWidgetItem(formatar_tamanho(backup['tamanho_original'])))
+            self.tabela.setItem(row, 4, QTableWidgetItem(duracao))
+            
+            for col in (2, 3, 4):
+                self.tabela.item(row, col).setTextAlignment(
+                    Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+                )
+        
+        self.tabela.resizeColumnsToContents()
+        
+        tamanho_total = sum(backup['tamanho'] for backup in backups)
+        self.label_total.setText(
+            f"{len(backups)} backup(s) - {formatar_tamanho(tamanho_total)} em disco"
+        )
\ No newline at end of file
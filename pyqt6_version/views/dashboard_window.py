@@ -7,8 +7,8 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
                              QLabel, QFrame, QPushButton, QTableWidget, QTableWidgetItem)
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
-from models.produto import Produto
-from models.movimentacao import Movimentacao
+from models.indicadores import Indicadores
+from .workers import DataService, criar_indicador_ocupado
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,8 +18,8 @@ class DashboardWindow(QWidget):
     
     def __init__(self):
         super().__init__()
-        self.produto_model = Produto()
-        self.movimentacao_model = Movimentacao()
+        self.indicadores = Indicadores()
+        self.data_service = DataService(self)
         self.setup_ui()
         self.carregar_dados()
         
@@ -42,6 +42,9 @@ class DashboardWindow(QWidget):
         titulo.setFont(font)
         layout.addWidget(titulo)
         
+        # Indicador de carregamento
+        layout.addWidget(criar_indicador_ocupado(self.data_service))
+        
         # Cards com indicadores
         cards_layout = QHBoxLayout()
         layout.addLayout(cards_layout)
@@ -137,33 +140,33 @@ class DashboardWindow(QWidget):
         return frame
     
     def carregar_dados(self):
-        """Carregar dados do dashboard"""
+        """Carregar dados do dashboard em segundo plano"""
+        self.data_service.executar(
+            'dashboard', self.consultar_dados, self.exibir_dados,
+            lambda mensagem: logger.error(f"Erro ao carregar dados do dashboard: {mensagem}")
+        )
+    
+    def consultar_dados(self):
+        """Consultar os dados do dashboard (fora da thread da interface)"""
+        return self.indicadores.get_painel()
+    
+    def exibir_dados(self, painel):
+        """Exibir os dados consultados"""
         try:
-            # Total de produtos
-            produtos = self.produto_model.get_all()
-            total_produtos = len(produtos)
-            self.card_total_produtos.label_valor.setText(str(total_produtos))
+            indicadores = painel['indicadores']
+            
+            self.card_total_produtos.label_valor.setText(str(indicadores['total_produtos']))
+            self.card_produtos_falta.label_valor.setText(str(indicadores['produtos_falta']))
+            self.card_movimentacoes.label_valor.setText(str(indicadores['movimentacoes_hoje']))
             
-            # Produtos com estoque baixo
-            produtos_estoque_baixo = self.produto_model.get_produtos_estoque_baixo()
-            self.card_produtos_falta.label_valor.setText(str(len(produtos_estoque_baixo)))
+            valor_total = indicadores['valor_estoque']
+            self.card_valor_estoque.label_valor.setText(f"R$ {valor_total:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
             
             # Carregar tabela de estoque baixo
-            self.carregar_tabela_estoque_baixo(produtos_estoque_baixo)
+            self.carregar_tabela_estoque_baixo(painel['estoque_baixo'])
             
             # Movimentações recentes
-            movimentacoes = self.movimentacao_model.get_movimentacoes_completas(limit=10)
-            self.carregar_tabela_movimentacoes(movimentacoes)
-            
-            # Contar movimentações de hoje
-            from datetime import date
-            hoje = date.today().strftime('%Y-%m-%d')
-            movimentacoes_hoje = [m for m in movimentacoes if m['data_movimentacao'].startswith(hoje)]
-            self.card_movimentacoes.label_valor.setText(str(len(movimentacoes_hoje)))
-            
-            # Calcular valor total do estoque
-            valor_total = sum(p['preco_venda'] * p['estoque_atual'] for p in produtos)
-            self.card_valor_estoque.label_valor.setText(f"R$ {valor_total:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+            self.carregar_tabela_movimentacoes(painel['movimentacoes'])
             
         except Exception as e:
             logger.error(f"Erro ao carregar dados do dashboard: {e}")
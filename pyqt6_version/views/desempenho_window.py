@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Estatísticas de desempenho das queries
+"""
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
+                             QTableWidget, QTableWidgetItem, QLabel, QHeaderView)
+from PyQt6.QtCore import Qt
+from config.settings import DATABASE_CONFIG
+from utils.desempenho import estatisticas, FAIXAS_LATENCIA, rotulo_faixa
+from models.cache import cache_referencia
+
+class DesempenhoDialog(QDialog):
+    """Dialog com as instruções SQL que mais consomem tempo"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setup_ui()
+        self.carregar_dados()
+    
+    def setup_ui(self):
+        """Configurar interface"""
+        self.setWindowTitle('Desempenho')
+        self.resize(1000, 500)
+        
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        
+        layout.addWidget(QLabel(
+            f"Queries acima de {DATABASE_CONFIG.get('consulta_lenta_ms', 200)} ms "
+            "são registradas no log com o plano de execução"
+        ))
+        
+        colunas = ['SQL', 'Execuções', 'Total (ms)', 'Média (ms)', 'Máx. (ms)', 'Linhas']
+        colunas += [rotulo_faixa(limite) for limite in FAIXAS_LATENCIA]
+        
+        self.tabela = QTableWidget()
+        self.tabela.setColumnCount(len(colunas))
+        self.tabela.setHorizontalHeaderLabels(colunas)
+        self.tabela.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.tabela.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.tabela.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.tabela.setWordWrap(False)
+        layout.addWidget(self.tabela)
+        
+        self.cache_label = QLabel()
+        layout.addWidget(self.cache_label)
+        
+        botoes_layout = QHBoxLayout()
+        botoes_layout.addStretch()
+        
+        btn_atualizar = QPushButton('Atualizar')
+        btn_atualizar.clicked.connect(self.carregar_dados)
+        botoes_layout.addWidget(btn_atualizar)
+        
+        btn_zerar = QPushButton('Zerar')
+        btn_zerar.clicked.connect(self.zerar)
+        botoes_layout.addWidget(btn_zerar)
+        
+        btn_fechar = QPushButton('Fechar')
+        btn_fechar.clicked.connect(self.accept)
+        botoes_layout.addWidget(btn_fechar)
+        
+        layout.addLayout(botoes_layout)
+    
+    def carregar_dados(self):
+        """Carregar as instruções com maior tempo total"""
+        itens = estatisticas.top(50)
+        
+        self.tabela.setRowCount(len(itens))
+        for row, item in enumerate(itens):
+            sql_item = QTableWidgetItem(item['sql'])
+            sql_item.setToolTip(item['sql'])
+            self.tabela.setItem(row, 0, sql_item)
+            
+            valores = [
+                str(item['execucoes']),
+                f"{item['tempo_total']:.1f}",
+                f"{item['tempo_medio']:.2f}",
+                f"{item['tempo_maximo']:.1f}",
+                str(item['linhas'])
+            ] + [str(quantidade) for quantidade in item['histograma']]
+            
+            for col, valor in enumerate(valores, start=1):
+                celula = QTableWidgetItem(valor)
+                celula.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.tabela.setItem(row, col, celula)
+        
+        for col in range(1, self.tabela.columnCount()):
+            self.tabela.resizeColumnToContents(col)
+        
+        cache = cache_referencia.estatisticas()
+        self.cache_label.setText(
+            f"Cache de categorias/fornecedores: {cache['acertos']} acerto(s), "
+            f"{cache['falhas']} falha(s) ({cache['taxa_acerto']:.0%} de acerto), "
+            f"{cache['entradas']} lista(s) em memória"
+        )
+    
+    def zerar(self):
+        """Zerar as estatísticas coletadas"""
+        estatisticas.limpar()
+        cache_referencia.zerar_contadores()
+        self.carregar_dados()
\ No newline at end of file
@@ -5,19 +5,23 @@ Janela principal do sistema
 
 from PyQt6.QtWidgets import (QMainWindow, QMdiArea, QMenuBar, QStatusBar, 
                              QToolBar, QVBoxLayout, QWidget, QLabel, 
-                             QMessageBox, QApplication)
+                             QMessageBox, QApplication, QProgressBar)
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QAction, QIcon
 from datetime import datetime
 import logging
 
 from config.settings import APP_CONFIG
+from utils.backup import formatar_tamanho
 from .produtos_window import ProdutosWindow
 from .categorias_window import CategoriasWindow
 from .fornecedores_window import FornecedoresWindow
 from .movimentacoes_window import MovimentacoesWindow
 from .relatorios_window import RelatoriosWindow
 from .dashboard_window import DashboardWindow
+from .workers import BackupScheduler
+from .backups_window import BackupsDialog
+from .desempenho_window import DesempenhoDialog
 
 logger = logging.getLogger(__name__)
 
@@ -28,10 +32,12 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.mdi_area = None
         self.status_bar = None
+        self.backup_scheduler = None
         self.setup_ui()
         self.setup_menu()
         self.setup_toolbar()
         self.setup_statusbar()
+        self.setup_backup_scheduler()
         self.show_dashboard()
         
         logger.info("Janela principal inicializada")
@@ -55,9 +61,13 @@ class MainWindow(QMainWindow):
         # Menu Arquivo
         arquivo_menu = menubar.addMenu('&Arquivo')
         
-        backup_action = QAction('&Backup do Banco', self)
-        backup_action.triggered.connect(self.fazer_backup)
-        arquivo_menu.addAction(backup_action)
+        self.backup_action = QAction('&Backup do Banco', self)
+        self.backup_action.triggered.connect(self.fazer_backup)
+        arquivo_menu.addAction(self.backup_action)
+        
+        catalogo_backups_action = QAction('&Catálogo de Backups', self)
+        catalogo_backups_action.triggered.connect(self.abrir_catalogo_backups)
+        arquivo_menu.addAction(catalogo_backups_action)
         
         arquivo_menu.addSeparator()
         
@@ -94,6 +104,13 @@ class MainWindow(QMainWindow):
         relatorios_action.triggered.connect(self.abrir_relatorios)
         relatorios_menu.addAction(relatorios_action)
         
+        # Menu Ferramentas
+        ferramentas_menu = menubar.addMenu('F&erramentas')
+        
+        desempenho_action = QAction('&Desempenho', self)
+        desempenho_action.triggered.connect(self.abrir_desempenho)
+        ferramentas_menu.addAction(desempenho_action)
+        
         # Menu Ajuda
         ajuda_menu = menubar.addMenu('&Ajuda')
         
@@ -138,6 +155,13 @@ class MainWindow(QMainWindow):
         self.status_label = QLabel('Sistema iniciado')
         self.status_bar.addWidget(self.status_label)
         
+        # Progresso do backup em segundo plano
+        self.backup_progress = QProgressBar()
+        self.backup_progress.setMaximumWidth(200)
+        self.backup_progress.setFormat('Backup %p%')
+        self.backup_progress.setVisible(False)
+        self.status_bar.addPermanentWidget(self.backup_progress)
+        
         # Label para data/hora
         self.datetime_label = QLabel()
         self.status_bar.addPermanentWidget(self.datetime_label)
@@ -149,6 +173,15 @@ class MainWindow(QMainWindow):
         
         self.atualizar_datetime()
     
+    def setup_backup_scheduler(self):
+        """Configurar backups automáticos e manuais"""
+        self.backup_scheduler = BackupScheduler(self)
+        self.backup_scheduler.iniciado.connect(self.on_backup_iniciado)
+        self.backup_scheduler.progresso.connect(self.on_backup_progresso)
+        self.backup_scheduler.concluido.connect(self.on_backup_concluido)
+        self.backup_scheduler.erro.connect(self.on_backup_erro)
+        self.backup_scheduler.iniciar()
+    
     def atualizar_datetime(self):
         """Atualizar data/hora na barra de status"""
         now = datetime.now()
@@ -231,22 +264,55 @@ class MainWindow(QMainWindow):
             self.mostrar_erro(f"Erro ao abrir relatórios: {e}")
     
     def fazer_backup(self):
-        """Fazer backup do banco de dados"""
-        try:
-            from utils.database import DatabaseManager
-            db_manager = DatabaseManager()
-            backup_path = db_manager.backup_database()
-            
+        """Fazer backup do banco de dados em segundo plano"""
+        if not self.backup_scheduler.executar_agora():
+            self.atualizar_status('Backup já em andamento...')
+    
+    def abrir_catalogo_backups(self):
+        """Mostrar catálogo de backups"""
+        dialog = BackupsDialog(self)
+        dialog.exec()
+    
+    def abrir_desempenho(self):
+        """Mostrar estatísticas de desempenho das queries"""
+        dialog = DesempenhoDialog(self)
+        dialog.exec()
+    
+    def on_backup_iniciado(self, manual):
+        """Backup iniciado (manual ou automático)"""
+        self.backup_action.setEnabled(False)
+        self.backup_progress.setValue(0)
+        self.backup_progress.setVisible(True)
+        self.atualizar_status('Backup em andamento...' if manual else 'Backup automático em andamento...')
+    
+    def on_backup_progresso(self, copiadas, total):
+        """Atualizar progresso do backup na barra de status"""
+        self.backup_progress.setMaximum(max(total, 1))
+        self.backup_progress.setValue(copiadas)
+    
+    def on_backup_concluido(self, entrada, manual):
+        """Backup finalizado com sucesso"""
+        self.backup_progress.setVisible(False)
+        self.backup_action.setEnabled(True)
+        self.atualizar_status(f"Backup realizado: {entrada['arquivo']}")
+        
+        if manual:
             QMessageBox.information(
                 self, 
                 'Backup', 
-                f'Backup criado com sucesso!\nLocal: {backup_path}'
+                f"Backup criado com sucesso!\nArquivo: {entrada['arquivo']}\n"
+                f"Tamanho: {formatar_tamanho(entrada['tamanho'])} "
+                f"(original {formatar_tamanho(entrada['tamanho_original'])})"
             )
-            self.atualizar_status('Backup realizado com sucesso')
-            
-        except Exception as e:
-            logger.error(f"Erro ao fazer backup: {e}")
-            self.mostrar_erro(f"Erro ao fazer backup: {e}")
+    
+    def on_backup_erro(self, mensagem, manual):
+        """Backup finalizado com erro"""
+        self.backup_progress.setVisible(False)
+        self.backup_action.setEnabled(True)
+        self.atualizar_status('Falha no backup')
+        
+        if manual:
+            self.mostrar_erro(f"Erro ao fazer backup: {mensagem}")
     
     def mostrar_sobre(self):
         """Mostrar informações sobre o sistema"""
@@ -281,6 +347,10 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            # Aguardar um backup em andamento para não deixar o arquivo incompleto
+            if self.backup_scheduler.em_andamento():
+                self.atualizar_status('Aguardando conclusão do backup...')
+            self.backup_scheduler.aguardar()
             logger.info("Sistema sendo encerrado")
             event.accept()
         else:
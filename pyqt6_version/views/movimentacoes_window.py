@@ -4,15 +4,17 @@ Janela de movimentações de estoque
 """
 
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QTableWidget, QTableWidgetItem, QLineEdit, QLabel,
+                             QTableView, QAbstractItemView, QLineEdit, QLabel,
                              QComboBox, QSpinBox, QDoubleSpinBox, QTextEdit,
                              QFormLayout, QDialog, QDialogButtonBox, QMessageBox,
                              QHeaderView, QGroupBox, QDateEdit, QTabWidget)
 from PyQt6.QtCore import Qt, QDate
-from PyQt6.QtGui import QFont, QColor
+from PyQt6.QtGui import QFont
 from models.movimentacao import Movimentacao
 from models.produto import Produto
 from datetime import datetime, date
+from .workers import DataService, criar_indicador_ocupado
+from .table_models import MovimentacoesTableModel
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,6 +26,7 @@ class MovimentacoesWindow(QWidget):
         super().__init__()
         self.movimentacao_model = Movimentacao()
         self.produto_model = Produto()
+        self.data_service = DataService(self)
         self.setup_ui()
         self.carregar_dados()
     
@@ -186,18 +189,24 @@ class MovimentacoesWindow(QWidget):
         botoes_historico.addStretch()
         layout.addLayout(botoes_historico)
         
-        # Tabela de histórico
-        self.tabela_historico = QTableWidget()
-        self.tabela_historico.setColumnCount(9)
-        self.tabela_historico.setHorizontalHeaderLabels([
-            'Data', 'Produto', 'Código', 'Tipo', 'Quantidade', 
-            'Preço Unit.', 'Valor Total', 'Motivo', 'Usuário'
-        ])
+        # Indicador de carregamento
+        layout.addWidget(criar_indicador_ocupado(self.data_service))
+        
+        # Tabela de histórico (linhas buscadas do banco sob demanda, no pool)
+        self.historico_model = MovimentacoesTableModel(self, self.data_service)
+        self.historico_model.falhou.connect(
+            lambda mensagem: QMessageBox.critical(self, 'Erro', f'Erro ao carregar histórico: {mensagem}')
+        )
+        self.tabela_historico = QTableView()
+        self.tabela_historico.setModel(self.historico_model)
         
         # Configurar tabela
         header = self.tabela_historico.horizontalHeader()
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)  # Produto
-        self.tabela_historico.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.tabela_historico.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tabela_historico.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.tabela_historico.setSortingEnabled(True)
+        self.tabela_historico.sortByColumn(0, Qt.SortOrder.DescendingOrder)
         
         layout.addWidget(self.tabela_historico)
     
@@ -336,70 +345,21 @@ class MovimentacoesWindow(QWidget):
         self.carregar_produtos()
     
     def carregar_historico(self):
-        """Carregar histórico de movimentações"""
-        try:
-            movimentacoes = self.movimentacao_model.get_movimentacoes_completas(limit=100)
-            self.atualizar_tabela_historico(movimentacoes)
-            
-        except Exception as e:
-            logger.error(f"Erro ao carregar histórico: {e}")
-            QMessageBox.critical(self, 'Erro', f'Erro ao carregar histórico: {e}')
-    
-    def atualizar_tabela_historico(self, movimentacoes):
-        """Atualizar tabela de histórico"""
-        self.tabela_historico.setRowCount(len(movimentacoes))
-        
-        for row, mov in enumerate(movimentacoes):
-            # Formatizar data
-            data_str = mov['data_movimentacao'][:16]  # YYYY-MM-DD HH:MM
-            
-            self.tabela_historico.setItem(row, 0, QTableWidgetItem(data_str))
-            self.tabela_historico.setItem(row, 1, QTableWidgetItem(mov['produto_nome']))
-            self.tabela_historico.setItem(row, 2, QTableWidgetItem(mov['produto_codigo']))
-            self.tabela_historico.setItem(row, 3, QTableWidgetItem(mov['tipo'].title()))
-            self.tabela_historico.setItem(row, 4, QTableWidgetItem(str(mov['quantidade'])))
-            self.tabela_historico.setItem(row, 5, QTableWidgetItem(f"R$ {mov['preco_unitario']:.2f}"))
-            self.tabela_historico.setItem(row, 6, QTableWidgetItem(f"R$ {mov['valor_total']:.2f}"))
-            self.tabela_historico.setItem(row, 7, QTableWidgetItem(mov.get('motivo', '')))
-            self.tabela_historico.setItem(row, 8, QTableWidgetItem(mov.get('usuario', '')))
-            
-            # Colorir por tipo
-            if mov['tipo'] == 'entrada':
-                for col in range(9):
-                    item = self.tabela_historico.item(row, col)
-                    if item:
-                        item.setBackground(QColor(200, 255, 200))  # Verde claro para entrada
-            else:  # saída
-                for col in range(9):
-                    item = self.tabela_historico.item(row, col)
-                    if item:
-                        item.setBackground(QColor(255, 200, 200))  # Rosa claro para saída
-        
-        self.tabela_historico.resizeColumnsToContents()
+        """Carregar histórico completo de movimentações (paginado sob demanda)"""
+        self.historico_model.definir_consulta(self.movimentacao_model.filtrar())
     
     def filtrar_historico(self):
-        """Filtrar histórico por critérios"""
-        try:
-            data_inicio = self.data_inicio.date().toPyDate()
-            data_fim = self.data_fim.date().toPyDate()
-            
-            movimentacoes = self.movimentacao_model.get_movimentacoes_periodo(
-                data_inicio.strftime('%Y-%m-%d'),
-                data_fim.strftime('%Y-%m-%d')
-            )
-            
-            # Filtrar por tipo
-            tipo_filtro = self.combo_tipo_filtro.currentText()
-            if tipo_filtro != 'Todos':
-                movimentacoes = [m for m in movimentacoes if m['tipo'] == tipo_filtro.lower()]
-            
-            # Filtrar por produto
-            produto_id_filtro = self.combo_produto_filtro.currentData()
-            if produto_id_filtro:
-                movimentacoes = [m for m in movimentacoes if m['produto_id'] == produto_id_filtro]
-            
-            self.atualizar_tabela_historico(movimentacoes)
-            
-        except Exception as e:
-            logger.error(f"Erro ao filtrar histórico: {e}")
-            QMessageBox.critical(self, 'Erro', f'Erro ao filtrar histórico: {e}') 
\ No newline at end of file
+        """Filtrar histórico no banco por critérios"""
+        consulta = self.movimentacao_model.filtrar(
+            data_inicio=self.data_inicio.date().toPyDate(),
+            data_fim=self.data_fim.date().toPyDate(),
+            tipo=self.combo_tipo_filtro.currentText(),
+            produto_id=self.combo_produto_filtro.currentData()
+        )
+        
+        self.historico_model.definir_consulta(consulta)
+    
+    def closeEvent(self, event):
+        """Liberar o cursor do histórico ao fechar"""
+        self.historico_model.fechar()
+        super().closeEvent(event) 
\ No newline at end of file
@@ -4,7 +4,7 @@ Janela de gerenciamento de produtos
 """
 
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QTableWidget, QTableWidgetItem, QLineEdit, QLabel,
+                             QTableView, QAbstractItemView, QLineEdit, QLabel,
                              QComboBox, QSpinBox, QDoubleSpinBox, QTextEdit,
                              QFormLayout, QDialog, QDialogButtonBox, QMessageBox,
                              QHeaderView, QGroupBox, QCheckBox)
@@ -14,6 +14,8 @@ from models.produto import Produto
 from models.categoria import Categoria
 from models.fornecedor import Fornecedor
 from utils.validators import Validators
+from .workers import DataService, criar_indicador_ocupado
+from .table_models import ProdutosTableModel
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,7 +28,7 @@ class ProdutosWindow(QWidget):
         self.produto_model = Produto()
         self.categoria_model = Categoria()
         self.fornecedor_model = Fornecedor()
-        self.produtos_data = []
+        self.data_service = DataService(self)
         self.setup_ui()
         self.carregar_dados()
     
@@ -44,6 +46,9 @@ class ProdutosWindow(QWidget):
         titulo.setFont(font)
         layout.addWidget(titulo)
         
+        # Indicador de carregamento
+        layout.addWidget(criar_indicador_ocupado(self.data_service))
+        
         # Área de filtros
         filtros_group = QGroupBox('Filtros')
         filtros_layout = QHBoxLayout(filtros_group)
@@ -94,102 +99,89 @@ class ProdutosWindow(QWidget):
         
         layout.addLayout(botoes_layout)
         
-        # Tabela de produtos
-        self.tabela = QTableWidget()
-        self.tabela.setColumnCount(10)
-        self.tabela.setHorizontalHeaderLabels([
-            'Código', 'Nome', 'Categoria', 'Fornecedor', 'Preço Compra',
-            'Preço Venda', 'Estoque Atual', 'Estoque Mínimo', 'Unidade', 'Localização'
-        ])
+        # Tabela de produtos (linhas buscadas do banco sob demanda)
+        self.tabela_model = ProdutosTableModel(self, self.data_service)
+        self.tabela_model.falhou.connect(
+            lambda mensagem: QMessageBox.critical(self, 'Erro', f'Erro ao carregar produtos: {mensagem}')
+        )
+        self.tabela = QTableView()
+        self.tabela.setModel(self.tabela_model)
         
         # Configurar tabela
         header = self.tabela.horizontalHeader()
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)  # Nome do produto
-        self.tabela.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.tabela.itemSelectionChanged.connect(self.on_selection_changed)
-        self.tabela.itemDoubleClicked.connect(self.editar_produto)
+        self.tabela.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tabela.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.tabela.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.tabela.setSortingEnabled(True)
+        self.tabela.sortByColumn(1, Qt.SortOrder.AscendingOrder)
+        self.tabela.selectionModel().selectionChanged.connect(self.on_selection_changed)
+        self.tabela_model.modelReset.connect(self.on_selection_changed)
+        self.tabela.doubleClicked.connect(self.editar_produto)
         
         layout.addWidget(self.tabela)
         
         # Estilo aplicado globalmente
     
     def carregar_dados(self):
-        """Carregar dados dos produtos"""
-        try:
-            self.produtos_data = self.produto_model.get_produtos_completos()
-            self.carregar_categorias()
-            self.atualizar_tabela(self.produtos_data)
-        except Exception as e:
-            logger.error(f"Erro ao carregar produtos: {e}")
-            QMessageBox.critical(self, 'Erro', f'Erro ao carregar produtos: {e}')
+        """Carregar categorias em segundo plano e recarregar a tabela"""
+        self.data_service.executar(
+            'categorias',
+            self.categoria_model.get_all,
+            self.exibir_dados,
+            lambda mensagem: QMessageBox.critical(self, 'Erro', f'Erro ao carregar produtos: {mensagem}')
+        )
     
-    def carregar_categorias(self):
+    def exibir_dados(self, categorias):
+        """Exibir categorias consultadas e aplicar os filtros"""
+        self.carregar_categorias(categorias)
+        self.filtrar_produtos()
+    
+    def carregar_categorias(self, categorias):
         """Carregar categorias no combo"""
+        categoria_atual = self.combo_categoria_filtro.currentData()
+        
+        self.combo_categoria_filtro.blockSignals(True)
         self.combo_categoria_filtro.clear()
         self.combo_categoria_filtro.addItem('Todas', None)
         
-        categorias = self.categoria_model.get_all()
         for categoria in categorias:
             self.combo_categoria_filtro.addItem(categoria['nome'], categoria['id'])
-    
-    def atualizar_tabela(self, produtos):
-        """Atualizar tabela com os produtos"""
-        self.tabela.setRowCount(len(produtos))
-        
-        for row, produto in enumerate(produtos):
-            self.tabela.setItem(row, 0, QTableWidgetItem(produto['codigo']))
-            self.tabela.setItem(row, 1, QTableWidgetItem(produto['nome']))
-            self.tabela.setItem(row, 2, QTableWidgetItem(produto.get('categoria_nome', '')))
-            self.tabela.setItem(row, 3, QTableWidgetItem(produto.get('fornecedor_nome', '')))
-            self.tabela.setItem(row, 4, QTableWidgetItem(f"R$ {produto['preco_compra']:.2f}"))
-            self.tabela.setItem(row, 5, QTableWidgetItem(f"R$ {produto['preco_venda']:.2f}"))
-            self.tabela.setItem(row, 6, QTableWidgetItem(str(produto['estoque_atual'])))
-            self.tabela.setItem(row, 7, QTableWidgetItem(str(produto['estoque_minimo'])))
-            self.tabela.setItem(row, 8, QTableWidgetItem(produto['unidade']))
-            self.tabela.setItem(row, 9, QTableWidgetItem(produto.get('localizacao', '')))
-            
-            # Destacar produtos com estoque baixo
-            if produto['estoque_atual'] <= produto['estoque_minimo']:
-                for col in range(10):
-                    item = self.tabela.item(row, col)
-                    if item:
-                        item.setBackground(Qt.GlobalColor.yellow)
-        
-        self.tabela.resizeColumnsToContents()
+        
+        indice = self.combo_categoria_filtro.findData(categoria_atual)
+        self.combo_categoria_filtro.setCurrentIndex(max(indice, 0))
+        self.combo_categoria_filtro.blockSignals(False)
     
     def filtrar_produtos(self):
-        """Filtrar produtos conforme critérios"""
-        termo_busca = self.campo_busca.text().lower()
-        categoria_id = self.combo_categoria_filtro.currentData()
-        apenas_estoque_baixo = self.check_estoque_baixo.isChecked()
-        
-        produtos_filtrados = []
-        
-        for produto in self.produtos_data:
-            # Filtro por termo de busca
-            if termo_busca:
-                if (termo_busca not in produto['nome'].lower() and 
-                    termo_busca not in produto['codigo'].lower()):
-                    continue
-            
-            # Filtro por categoria
-            if categoria_id and produto['categoria_id'] != categoria_id:
-                continue
-            
-            # Filtro por estoque baixo
-            if apenas_estoque_baixo and produto['estoque_atual'] > produto['estoque_minimo']:
-                continue
-            
-            produtos_filtrados.append(produto)
+        """Filtrar produtos no banco conforme critérios"""
+        # Termo de busca resolvido pelos índices FTS5; os demais filtros, por índices comuns
+        consulta = self.produto_model.filtrar(
+            termo=self.campo_busca.text().strip(),
+            categoria_id=self.combo_categoria_filtro.currentData(),
+            estoque_baixo=self.check_estoque_baixo.isChecked()
+        )
         
-        self.atualizar_tabela(produtos_filtrados)
+        # Cursor aberto e primeiro lote lidos no pool (erros chegam por tabela_model.falhou)
+        self.tabela_model.definir_consulta(consulta)
+    
+    def produto_selecionado(self):
+        """Registro do produto na linha selecionada"""
+        linhas = self.tabela.selectionModel().selectedRows()
+        if not linhas:
+            return None
+        return self.tabela_model.linha(linhas[0].row())
     
     def on_selection_changed(self):
         """Evento de mudança de seleção na tabela"""
-        tem_selecao = len(self.tabela.selectedItems()) > 0
+        tem_selecao = self.tabela.selectionModel().hasSelection()
         self.btn_editar.setEnabled(tem_selecao)
         self.btn_excluir.setEnabled(tem_selecao)
     
+    def closeEvent(self, event):
+        """Liberar o cursor da tabela ao fechar"""
+        self.tabela_model.fechar()
+        super().closeEvent(event)
+    
     def novo_produto(self):
         """Abrir dialog para novo produto"""
         dialog = ProdutoDialog(self)
@@ -198,12 +190,11 @@ class ProdutosWindow(QWidget):
     
     def editar_produto(self):
         """Editar produto selecionado"""
-        row = self.tabela.currentRow()
-        if row < 0:
+        selecionado = self.produto_selecionado()
+        if not selecionado:
             return
         
-        codigo = self.tabela.item(row, 0).text()
-        produto = self.produto_model.get_by_codigo(codigo)
+        produto = self.produto_model.get_by_id(selecionado['id'])
         
         if produto:
             dialog = ProdutoDialog(self, produto)
@@ -212,12 +203,11 @@ class ProdutosWindow(QWidget):
     
     def excluir_produto(self):
         """Excluir produto selecionado"""
-        row = self.tabela.currentRow()
-        if row < 0:
+        produto = self.produto_selecionado()
+        if not produto:
             return
         
-        codigo = self.tabela.item(row, 0).text()
-        nome = self.tabela.item(row, 1).text()
+        nome = produto['nome']
         
         reply = QMessageBox.question(
             self, 'Confirmar Exclusão',
@@ -227,11 +217,9 @@ class ProdutosWindow(QWidget):
         
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                produto = self.produto_model.get_by_codigo(codigo)
-                if produto:
-                    self.produto_model.delete(produto['id'])
-                    self.carregar_dados()
-                    QMessageBox.information(self, 'Sucesso', 'Produto excluído com sucesso!')
+                self.produto_model.delete(produto['id'])
+                self.carregar_dados()
+                QMessageBox.information(self, 'Sucesso', 'Produto excluído com sucesso!')
             except Exception as e:
                 logger.error(f"Erro ao excluir produto: {e}")
                 QMessageBox.critical(self, 'Erro', f'Erro ao excluir produto: {e}')
@@ -365,6 +353,9 @@ class ProdutoDialog(QDialog):
         self.campo_preco_venda.setValue(self.produto['preco_venda'])
         self.campo_estoque_minimo.setValue(self.produto['estoque_minimo'])
         self.campo_estoque_atual.setValue(self.produto['estoque_atual'])
+        # Depois do cadastro, o estoque só muda por movimentações (mantido pelos triggers)
+        self.campo_estoque_atual.setEnabled(False)
+        self.campo_estoque_atual.setToolTip('Altere o estoque registrando uma movimentação')
         self.campo_unidade.setText(self.produto['unidade'])
         self.campo_localizacao.setText(self.produto.get('localizacao', ''))
     
@@ -400,13 +391,15 @@ class ProdutoDialog(QDialog):
                 'preco_compra': self.campo_preco_compra.value(),
                 'preco_venda': self.campo_preco_venda.value(),
                 'estoque_minimo': self.campo_estoque_minimo.value(),
-                'estoque_atual': self.campo_estoque_atual.value(),
                 'unidade': self.campo_unidade.text().strip(),
                 'localizacao': self.campo_localizacao.text().strip()
             }
             
             if self.produto:
                 dados['id'] = self.produto['id']
+            else:
+                # Estoque de cadastro: registrado como saldo inicial do produto
+                dados['estoque_atual'] = self.campo_estoque_atual.value()
             
             # Salvar
             self.produto_model.save(dados)
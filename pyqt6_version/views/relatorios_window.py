@@ -5,14 +5,18 @@ Janela de relatórios
 
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QLabel, QComboBox, QDateEdit, QGroupBox,
-                             QMessageBox, QProgressBar, QTextEdit, QCheckBox)
-from PyQt6.QtCore import Qt, QDate, QThread, pyqtSignal
+                             QMessageBox, QProgressBar, QCheckBox,
+                             QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt6.QtCore import Qt, QDate
 from PyQt6.QtGui import QFont
 from models.produto import Produto
 from models.movimentacao import Movimentacao
 from models.categoria import Categoria
 from models.fornecedor import Fornecedor
+from models.reposicao import Reposicao
 from utils.export import ExportManager
+from config.settings import EXPORT_CONFIG, ANALISE_CONFIG, REPOSICAO_CONFIG
+from .workers import FilaExportacoes
 import os
 import logging
 
@@ -27,8 +31,14 @@ class RelatoriosWindow(QWidget):
         self.movimentacao_model = Movimentacao()
         self.categoria_model = Categoria()
         self.fornecedor_model = Fornecedor()
+        self.reposicao_model = Reposicao()
         self.export_manager = ExportManager()
+        self.fila = FilaExportacoes(self)
+        self._itens_trabalhos = {}  # id do trabalho -> item da primeira coluna
         self.setup_ui()
+        
+        self.fila.adicionado.connect(self.on_trabalho_adicionado)
+        self.fila.atualizado.connect(self.on_trabalho_atualizado)
     
     def setup_ui(self):
         """Configurar interface"""
@@ -152,26 +162,58 @@ class RelatoriosWindow(QWidget):
         self.btn_resumo_mensal.clicked.connect(self.relatorio_resumo_mensal)
         botoes_especiais.addWidget(self.btn_resumo_mensal)
         
+        self.btn_analise_estoque = QPushButton('Curva ABC e Giro')
+        self.btn_analise_estoque.clicked.connect(self.relatorio_analise_estoque)
+        botoes_especiais.addWidget(self.btn_analise_estoque)
+        
+        self.btn_reposicao = QPushButton('Sugestão de Compras')
+        self.btn_reposicao.clicked.connect(self.relatorio_reposicao)
+        botoes_especiais.addWidget(self.btn_reposicao)
+        
         botoes_especiais.addStretch()
         especiais_layout.addLayout(botoes_especiais)
         
         layout.addWidget(especiais_group)
         
-        # Barra de progresso
+        self.check_comprimir = QCheckBox('Compactar CSV (gzip)')
+        self.check_comprimir.setChecked(EXPORT_CONFIG.get('comprimir_csv', False))
+        layout.addWidget(self.check_comprimir)
+        
+        # Barra de progresso: linhas exportadas de todos os trabalhos em andamento
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
+        self.fila.ocupado.connect(self.progress_bar.setVisible)
         layout.addWidget(self.progress_bar)
         
-        # Log de operações
-        log_group = QGroupBox('Log de Operações')
-        log_layout = QVBoxLayout(log_group)
+        # Histórico de exportações
+        trabalhos_group = QGroupBox('Exportações')
+        trabalhos_layout = QVBoxLayout(trabalhos_group)
+        
+        self.tabela_trabalhos = QTableWidget()
+        self.tabela_trabalhos.setColumnCount(6)
+        self.tabela_trabalhos.setHorizontalHeaderLabels([
+            'Relatório', 'Estado', 'Linhas', 'Arquivo', 'Início', 'Duração'
+        ])
+        self.tabela_trabalhos.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        self.tabela_trabalhos.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.tabela_trabalhos.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.tabela_trabalhos.verticalHeader().setVisible(False)
+        self.tabela_trabalhos.setMaximumHeight(160)
+        trabalhos_layout.addWidget(self.tabela_trabalhos)
+        
+        botoes_trabalhos = QHBoxLayout()
+        botoes_trabalhos.addStretch()
         
-        self.log_text = QTextEdit()
-        self.log_text.setMaximumHeight(100)
-        self.log_text.setReadOnly(True)
-        log_layout.addWidget(self.log_text)
+        self.btn_cancelar = QPushButton('Cancelar')
+        self.btn_cancelar.clicked.connect(self.cancelar_trabalhos)
+        botoes_trabalhos.addWidget(self.btn_cancelar)
         
-        layout.addWidget(log_group)
+        self.btn_limpar = QPushButton('Limpar Finalizados')
+        self.btn_limpar.clicked.connect(self.limpar_trabalhos)
+        botoes_trabalhos.addWidget(self.btn_limpar)
+        
+        trabalhos_layout.addLayout(botoes_trabalhos)
+        layout.addWidget(trabalhos_group)
         
         # Estilo aplicado globalmente
     
@@ -193,122 +235,168 @@ class RelatoriosWindow(QWidget):
         except Exception as e:
             logger.error(f"Erro ao carregar fornecedores: {e}")
     
-    def log_operacao(self, mensagem):
-        """Adicionar mensagem ao log"""
-        self.log_text.append(f"[{QDate.currentDate().toString()}] {mensagem}")
+    def on_trabalho_adicionado(self, id_trabalho):
+        """Incluir o trabalho no topo do histórico"""
+        self.tabela_trabalhos.insertRow(0)
+        item = QTableWidgetItem(self.fila.trabalho(id_trabalho)['descricao'])
+        item.setData(Qt.ItemDataRole.UserRole, id_trabalho)
+        self.tabela_trabalhos.setItem(0, 0, item)
+        self._itens_trabalhos[id_trabalho] = item
+        self.on_trabalho_atualizado(id_trabalho)
+    
+    def on_trabalho_atualizado(self, id_trabalho):
+        """Atualizar a linha do trabalho e a barra de progresso"""
+        trabalho = self.fila.trabalho(id_trabalho)
+        item = self._itens_trabalhos.get(id_trabalho)
+        if trabalho is None or item is None:
+            return
+        
+        row = self.tabela_trabalhos.row(item)
+        
+        linhas = f"{trabalho['linhas']:,}".replace(',', '.')
+        if trabalho['total']:
+            linhas += f" de {trabalho['total']:,}".replace(',', '.')
+        
+        arquivo = os.path.basename(trabalho['arquivo']) if trabalho['arquivo'] else trabalho['mensagem']
+        inicio = trabalho['inicio'].strftime('%H:%M:%S') if trabalho['inicio'] else ''
+        duracao = ''
+        if trabalho['inicio'] and trabalho['fim']:
+            duracao = f"{(trabalho['fim'] - trabalho['inicio']).total_seconds():.1f}s"
+        
+        for col, valor in enumerate([trabalho['estado'], linhas, arquivo, inicio, duracao], start=1):
+            celula = QTableWidgetItem(valor)
+            if col == 3:
+                celula.setToolTip(trabalho['arquivo'] or trabalho['mensagem'])
+            self.tabela_trabalhos.setItem(row, col, celula)
+        
+        self.atualizar_progresso()
+    
+    def atualizar_progresso(self):
+        """Somar o progresso dos trabalhos em andamento"""
+        ativos = [t for t in self.fila.trabalhos() if self.fila.em_andamento(t['id'])]
+        total = sum(t['total'] for t in ativos)
+        
+        # Sem total conhecido a barra fica indeterminada
+        if not ativos or any(not t['total'] for t in ativos):
+            self.progress_bar.setRange(0, 0)
+            return
+        
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(sum(min(t['linhas'], t['total']) for t in ativos))
+    
+    def cancelar_trabalhos(self):
+        """Cancelar os trabalhos selecionados no histórico"""
+        rows = {index.row() for index in self.tabela_trabalhos.selectedIndexes()}
+        if not rows:
+            QMessageBox.warning(self, 'Aviso', 'Selecione uma exportação para cancelar!')
+            return
+        
+        for row in rows:
+            id_trabalho = self.tabela_trabalhos.item(row, 0).data(Qt.ItemDataRole.UserRole)
+            self.fila.cancelar(id_trabalho)
+    
+    def limpar_trabalhos(self):
+        """Remover do histórico as exportações finalizadas"""
+        self.fila.limpar_finalizados()
+        for id_trabalho, item in list(self._itens_trabalhos.items()):
+            if self.fila.trabalho(id_trabalho) is None:
+                self.tabela_trabalhos.removeRow(self.tabela_trabalhos.row(item))
+                del self._itens_trabalhos[id_trabalho]
+    
+    def closeEvent(self, event):
+        """Cancelar as exportações ao fechar a janela"""
+        self.fila.aguardar()
+        super().closeEvent(event)
     
     def exportar_produtos(self, formato):
-        """Exportar relatório de produtos"""
-        try:
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setValue(0)
-            
-            # Obter filtros
-            categoria_id = self.combo_categoria.currentData()
-            fornecedor_id = self.combo_fornecedor.currentData()
-            apenas_estoque_baixo = self.check_estoque_baixo.isChecked()
-            
-            # Buscar produtos
-            if apenas_estoque_baixo:
-                produtos = self.produto_model.get_produtos_estoque_baixo()
-            else:
-                filtros = {}
-                if categoria_id:
-                    filtros['categoria_id'] = categoria_id
-                if fornecedor_id:
-                    filtros['fornecedor_id'] = fornecedor_id
-                
-                if filtros:
-                    produtos = self.produto_model.search_advanced(**filtros)
-                else:
-                    produtos = self.produto_model.get_produtos_completos()
-            
-            self.progress_bar.setValue(50)
+        """Exportar relatório de produtos em segundo plano"""
+        # Obter filtros
+        categoria_id = self.combo_categoria.currentData()
+        fornecedor_id = self.combo_fornecedor.currentData()
+        apenas_estoque_baixo = self.check_estoque_baixo.isChecked()
+        comprimir = self.check_comprimir.isChecked()
+        
+        def gerar(tarefa):
+            # Ler produtos do cursor (todos os filtros aplicados no banco)
+            consulta = self.produto_model.filtrar(
+                categoria_id=categoria_id,
+                fornecedor_id=fornecedor_id,
+                estoque_baixo=apenas_estoque_baixo
+            )
+            tarefa.definir_total(consulta.contar())
             
             # Exportar
-            arquivo = self.export_manager.export_produtos(produtos, formato)
-            
-            self.progress_bar.setValue(100)
-            self.progress_bar.setVisible(False)
-            
-            self.log_operacao(f"Relatório de produtos exportado: {os.path.basename(arquivo)}")
-            
-            QMessageBox.information(
-                self, 'Sucesso', 
-                f'Relatório exportado com sucesso!\nArquivo: {arquivo}'
+            return self.export_manager.export_produtos(
+                consulta.iterar(ordem="p.nome"), formato, comprimir, tarefa.progresso
             )
-            
-        except Exception as e:
-            self.progress_bar.setVisible(False)
-            logger.error(f"Erro ao exportar produtos: {e}")
-            QMessageBox.critical(self, 'Erro', f'Erro ao exportar produtos: {e}')
+        
+        self.fila.enfileirar(
+            f'Produtos ({formato.upper()})', gerar,
+            ao_falhar=lambda mensagem: QMessageBox.critical(self, 'Erro', f'Erro ao exportar produtos: {mensagem}')
+        )
     
     def exportar_movimentacoes(self, formato):
-        """Exportar relatório de movimentações"""
-        try:
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setValue(0)
-            
-            # Obter filtros
-            data_inicio = self.data_inicio.date().toPyDate().strftime('%Y-%m-%d')
-            data_fim = self.data_fim.date().toPyDate().strftime('%Y-%m-%d')
-            tipo = self.combo_tipo.currentText()
-            
-            # Buscar movimentações
-            movimentacoes = self.movimentacao_model.get_movimentacoes_periodo(data_inicio, data_fim)
-            
-            # Filtrar por tipo se necessário
-            if tipo != 'Todos':
-                movimentacoes = [m for m in movimentacoes if m['tipo'] == tipo.lower()]
-            
-            self.progress_bar.setValue(50)
+        """Exportar relatório de movimentações em segundo plano"""
+        # Obter filtros
+        data_inicio = self.data_inicio.date().toPyDate().strftime('%Y-%m-%d')
+        data_fim = self.data_fim.date().toPyDate().strftime('%Y-%m-%d')
+        tipo = self.combo_tipo.currentText()
+        comprimir = self.check_comprimir.isChecked()
+        
+        def gerar(tarefa):
+            # Buscar movimentações (período e tipo filtrados no banco) página a página;
+            # o gerador alimenta a exportação sem carregar o histórico inteiro e sem
+            # manter um cursor aberto enquanto o arquivo é escrito
+            consulta = self.movimentacao_model.filtrar(data_inicio, data_fim, tipo)
+            tarefa.definir_total(consulta.contar())
+            movimentacoes = (
+                mov for pagina in self.movimentacao_model.iterar_paginas(consulta)
+                for mov in pagina
+            )
             
             # Exportar
-            arquivo = self.export_manager.export_movimentacoes(movimentacoes, formato)
-            
-            self.progress_bar.setValue(100)
-            self.progress_bar.setVisible(False)
-            
-            self.log_operacao(f"Relatório de movimentações exportado: {os.path.basename(arquivo)}")
-            
-            QMessageBox.information(
-                self, 'Sucesso', 
-                f'Relatório exportado com sucesso!\nArquivo: {arquivo}'
+            return self.export_manager.export_movimentacoes(
+                movimentacoes, formato, comprimir, tarefa.progresso
             )
-            
-        except Exception as e:
-            self.progress_bar.setVisible(False)
-            logger.error(f"Erro ao exportar movimentações: {e}")
-            QMessageBox.critical(self, 'Erro', f'Erro ao exportar movimentações: {e}')
+        
+        self.fila.enfileirar(
+            f'Movimentações ({formato.upper()})', gerar,
+            ao_falhar=lambda mensagem: QMessageBox.critical(self, 'Erro', f'Erro ao exportar movimentações: {mensagem}')
+        )
     
     def relatorio_estoque_baixo(self):
-        """Gerar relatório de produtos em falta"""
-        try:
+        """Gerar relatório de produtos em falta em segundo plano"""
+        def gerar(tarefa):
             produtos = self.produto_model.get_produtos_estoque_baixo()
-            
             if not produtos:
+                return None, 0
+            tarefa.definir_total(len(produtos))
+            return self.export_manager.export_produtos(
+                produtos, 'xlsx', progresso=tarefa.progresso
+            ), len(produtos)
+        
+        def concluir(resultado):
+            arquivo, total = resultado
+            if arquivo is None:
                 QMessageBox.information(
                     self, 'Informação', 
                     'Não há produtos com estoque baixo!'
                 )
                 return
             
-            arquivo = self.export_manager.export_produtos(produtos, 'xlsx')
-            
-            self.log_operacao(f"Relatório de estoque baixo gerado: {os.path.basename(arquivo)}")
-            
             QMessageBox.information(
                 self, 'Sucesso', 
-                f'Relatório de produtos em falta gerado!\nTotal: {len(produtos)} produtos\nArquivo: {arquivo}'
+                f'Relatório de produtos em falta gerado!\nTotal: {total} produtos\nArquivo: {arquivo}'
             )
-            
-        except Exception as e:
-            logger.error(f"Erro ao gerar relatório de estoque baixo: {e}")
-            QMessageBox.critical(self, 'Erro', f'Erro ao gerar relatório: {e}')
+        
+        self.fila.enfileirar(
+            'Produtos em Falta', gerar, concluir,
+            lambda mensagem: QMessageBox.critical(self, 'Erro', f'Erro ao gerar relatório: {mensagem}')
+        )
     
     def relatorio_valor_estoque(self):
-        """Gerar relatório de valor do estoque"""
-        try:
+        """Gerar relatório de valor do estoque em segundo plano"""
+        def gerar(tarefa):
             produtos = self.produto_model.get_produtos_completos()
             
             # Calcular valores
@@ -338,49 +426,51 @@ class RelatoriosWindow(QWidget):
                 'Valor Total': f"R$ {valor_total:.2f}"
             })
             
+            tarefa.definir_total(len(dados_relatorio))
             arquivo = self.export_manager.export_to_excel(
-                dados_relatorio, 'relatorio_valor_estoque', 'Valor do Estoque'
+                dados_relatorio, 'relatorio_valor_estoque', 'Valor do Estoque', tarefa.progresso
             )
-            
-            self.log_operacao(f"Relatório de valor do estoque gerado: {os.path.basename(arquivo)}")
-            
+            return arquivo, valor_total
+        
+        def concluir(resultado):
+            arquivo, valor_total = resultado
             QMessageBox.information(
                 self, 'Sucesso', 
                 f'Relatório de valor do estoque gerado!\nValor Total: R$ {valor_total:,.2f}\nArquivo: {arquivo}'
             )
-            
-        except Exception as e:
-            logger.error(f"Erro ao gerar relatório de valor: {e}")
-            QMessageBox.critical(self, 'Erro', f'Erro ao gerar relatório: {e}')
+        
+        self.fila.enfileirar(
+            'Valor do Estoque', gerar, concluir,
+            lambda mensagem: QMessageBox.critical(self, 'Erro', f'Erro ao gerar relatório: {mensagem}')
+        )
     
     def relatorio_resumo_mensal(self):
-        """Gerar relatório resumo mensal"""
-        try:
-            # Usar data atual para o mês
-            data_atual = QDate.currentDate()
-            primeiro_dia = QDate(data_atual.year(), data_atual.month(), 1)
-            ultimo_dia = data_atual
-            
-            # Buscar movimentações do mês
-            movimentacoes = self.movimentacao_model.get_movimentacoes_periodo(
-                primeiro_dia.toString('yyyy-MM-dd'),
-                ultimo_dia.toString('yyyy-MM-dd')
-            )
-            
-            # Calcular estatísticas
-            entradas = [m for m in movimentacoes if m['tipo'] == 'entrada']
-            saidas = [m for m in movimentacoes if m['tipo'] == 'saida']
-            
-            total_entradas = sum(m['quantidade'] for m in entradas)
-            total_saidas = sum(m['quantidade'] for m in saidas)
-            valor_entradas = sum(m['valor_total'] for m in entradas)
-            valor_saidas = sum(m['valor_total'] for m in saidas)
+        """Gerar relatório resumo mensal em segundo plano"""
+        # Usar data atual para o mês
+        data_atual = QDate.currentDate()
+        primeiro_dia = QDate(data_atual.year(), data_atual.month(), 1)
+        ultimo_dia = data_atual
+        mes = primeiro_dia.toString('yyyy-MM')
+        
+        def gerar(tarefa):
+            # Totais do mês a partir da tabela de resumo mensal
+            resumo = self.movimentacao_model.get_resumo_mensal(mes)
+            entradas = resumo.get('entrada', {})
+            saidas = resumo.get('saida', {})
+            
+            qtd_entradas = entradas.get('total_movimentacoes', 0)
+            qtd_saidas = saidas.get('total_movimentacoes', 0)
+            total_movimentacoes = qtd_entradas + qtd_saidas
+            total_entradas = entradas.get('total_quantidade', 0)
+            total_saidas = saidas.get('total_quantidade', 0)
+            valor_entradas = entradas.get('valor_total', 0)
+            valor_saidas = saidas.get('valor_total', 0)
             
             # Preparar dados do relatório
             dados_resumo = [
-                {'Indicador': 'Total de Movimentações', 'Valor': len(movimentacoes)},
-                {'Indicador': 'Total de Entradas', 'Valor': len(entradas)},
-                {'Indicador': 'Total de Saídas', 'Valor': len(saidas)},
+                {'Indicador': 'Total de Movimentações', 'Valor': total_movimentacoes},
+                {'Indicador': 'Total de Entradas', 'Valor': qtd_entradas},
+                {'Indicador': 'Total de Saídas', 'Valor': qtd_saidas},
                 {'Indicador': 'Quantidade Entrada', 'Valor': total_entradas},
                 {'Indicador': 'Quantidade Saída', 'Valor': total_saidas},
                 {'Indicador': 'Valor Total Entradas', 'Valor': f"R$ {valor_entradas:.2f}"},
@@ -389,19 +479,95 @@ class RelatoriosWindow(QWidget):
             ]
             
             arquivo = self.export_manager.export_to_excel(
-                dados_resumo, 'resumo_mensal', 'Resumo Mensal'
+                dados_resumo, 'resumo_mensal', 'Resumo Mensal', tarefa.progresso
             )
-            
-            self.log_operacao(f"Resumo mensal gerado: {os.path.basename(arquivo)}")
-            
+            return arquivo, total_movimentacoes
+        
+        def concluir(resultado):
+            arquivo, total_movimentacoes = resultado
             QMessageBox.information(
                 self, 'Sucesso', 
                 f'Resumo mensal gerado!\n'
                 f'Período: {primeiro_dia.toString("dd/MM/yyyy")} a {ultimo_dia.toString("dd/MM/yyyy")}\n'
-                f'Total de movimentações: {len(movimentacoes)}\n'
+                f'Total de movimentações: {total_movimentacoes}\n'
                 f'Arquivo: {arquivo}'
             )
+        
+        self.fila.enfileirar(
+            f'Resumo Mensal ({mes})', gerar, concluir,
+            lambda mensagem: QMessageBox.critical(self, 'Erro', f'Erro ao gerar resumo: {mensagem}')
+        )
+    
+    def relatorio_analise_estoque(self):
+        """Gerar curva ABC, giro, cobertura e estoque parado em segundo plano"""
+        def gerar(tarefa):
+            analise = self.produto_model.get_analise_estoque()
+            if not analise:
+                return None, None
+            
+            resumo = {'A': 0, 'B': 0, 'C': 0, 'parados': 0, 'valor_parado': 0}
+            for item in analise:
+                resumo[item['classe']] += 1
+                if item['estoque_parado']:
+                    resumo['parados'] += 1
+                    resumo['valor_parado'] += item['valor_estoque']
+            
+            tarefa.definir_total(len(analise))
+            arquivo = self.export_manager.export_to_excel(
+                map(self.export_manager.linha_analise, analise),
+                'analise_abc_giro', 'Curva ABC e Giro', tarefa.progresso
+            )
+            return arquivo, resumo
+        
+        def concluir(resultado):
+            arquivo, resumo = resultado
+            if arquivo is None:
+                QMessageBox.information(self, 'Informação', 'Não há produtos para analisar!')
+                return
             
-        except Exception as e:
-            logger.error(f"Erro ao gerar resumo mensal: {e}")
-            QMessageBox.critical(self, 'Erro', f'Erro ao gerar resumo: {e}') 
\ No newline at end of file
+            QMessageBox.information(
+                self, 'Sucesso', 
+                f'Curva ABC e giro gerados (últimos {ANALISE_CONFIG["periodo_dias"]} dias)!\n'
+                f'Classe A: {resumo["A"]} | Classe B: {resumo["B"]} | Classe C: {resumo["C"]}\n'
+                f'Estoque parado: {resumo["parados"]} produtos (R$ {resumo["valor_parado"]:,.2f})\n'
+                f'Arquivo: {arquivo}'
+            )
+        
+        self.fila.enfileirar(
+            'Curva ABC e Giro', gerar, concluir,
+            lambda mensagem: QMessageBox.critical(self, 'Erro', f'Erro ao gerar análise: {mensagem}')
+        )
+    
+    def relatorio_reposicao(self):
+        """Gerar sugestão de compras por fornecedor em segundo plano"""
+        def gerar(tarefa):
+            sugestoes = self.reposicao_model.get_sugestoes()
+            if not sugestoes:
+                return None, None
+            
+            pedidos = self.reposicao_model.por_fornecedor(sugestoes)
+            tarefa.definir_total(len(sugestoes))
+            arquivo = self.export_manager.export_reposicao(sugestoes, 'xlsx', progresso=tarefa.progresso)
+            return arquivo, pedidos
+        
+        def concluir(resultado):
+            arquivo, pedidos = resultado
+            if arquivo is None:
+                QMessageBox.information(self, 'Informação', 'Nenhum produto abaixo do ponto de pedido!')
+                return
+            
+            linhas = '\n'.join(
+                f'{fornecedor}: {len(pedido["itens"])} itens, R$ {pedido["valor"]:,.2f}'
+                for fornecedor, pedido in pedidos.items()
+            )
+            QMessageBox.information(
+                self, 'Sucesso', 
+                f'Sugestão de compras gerada (últimos {REPOSICAO_CONFIG["historico_dias"]} dias de saídas)!\n'
+                f'{linhas}\n'
+                f'Arquivo: {arquivo}'
+            )
+        
+        self.fila.enfileirar(
+            'Sugestão de Compras', gerar, concluir,
+            lambda mensagem: QMessageBox.critical(self, 'Erro', f'Erro ao gerar sugestão de compras: {mensagem}')
+        ) 
\ No newline at end of file
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+Modelos de tabela (model/view) que buscam as linhas do banco sob demanda
+"""
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor
+from utils.database import DatabaseManager
+from .workers import DataService
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+def formatar_moeda(valor):
+    """Formatar valor monetário para a tabela"""
+    return f"R$ {valor or 0:.2f}"
+
+def formatar_data(valor):
+    """Formatar data/hora como AAAA-MM-DD HH:MM"""
+    return (valor or '')[:16].replace('T', ' ')
+
+class _LeitorCursor:
+    """Cursor lido em lotes por threads do pool, uma de cada vez, e fechado ao esgotar"""
+    
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.trava = threading.Lock()
+        # Linha lida além do lote: sem ela, um cursor esgotado no fim de um lote
+        # cheio continuaria aberto, segurando o snapshot de leitura do WAL
+        self.proxima = None
+    
+    def ler(self, tamanho):
+        """Próximo lote e se ainda há linhas depois dele"""
+        with self.trava:
+            if self.cursor is None:
+                return [], False
+            
+            linhas = [self.proxima] if self.proxima is not None else []
+            linhas.extend(self.cursor.fetchmany(tamanho + 1 - len(linhas)))
+            if len(linhas) > tamanho:
+                self.proxima = linhas.pop()
+                return linhas, True
+            
+            self._fechar()
+            return linhas, False
+    
+    def fechar(self):
+        """Fechar o cursor e sua conexão (aguarda um lote em leitura)"""
+        with self.trava:
+            self._fechar()
+    
+    def _fechar(self):
+        """Fechar sem a trava (chamado por quem já a tem)"""
+        if self.cursor is not None:
+            self.cursor.connection.close()
+            self.cursor = None
+            self.proxima = None
+
+class SQLTableModel(QAbstractTableModel):
+    """Modelo de tabela que carrega as linhas do SQLite em lotes, sob demanda"""
+    
+    TAMANHO_LOTE = 200
+    
+    # Definidos nas subclasses
+    colunas = []          # (título, expressão SQL de ordenação, chave na linha, formatador)
+    ordem_padrao = ''     # ORDER BY inicial
+    desempate = ''        # coluna única que estabiliza a ordenação
+    
+    falhou = pyqtSignal(str)  # erro ao ler um lote
+    
+    def __init__(self, parent=None, data_service=None):
+        super().__init__(parent)
+        self.db_manager = DatabaseManager()
+        # Consultas e lotes rodam no pool; a thread da interface só recebe as linhas
+        self.data_service = data_service or DataService(self)
+        self._linhas = []
+        self._leitor = None
+        self._mais_linhas = False
+        self._buscando = False
+        self._consulta = None
+        self._ordem = self.ordem_padrao
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._linhas)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.colunas)
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.colunas[section][0]
+        return None
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        linha = self._linhas[index.row()]
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            _, _, chave, formatador = self.colunas[index.column()]
+            valor = linha[chave]
+            if formatador:
+                return formatador(valor)
+            return '' if valor is None else str(valor)
+        
+        # Cor calculada só para as células visíveis, sem percorrer a tabela
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return self.cor_linha(linha)
+        
+        return None
+    
+    def cor_linha(self, linha):
+        """Cor de fundo da linha (None usa a cor padrão)"""
+        return None
+    
+    def paginar_por_chave(self):
+        """Se a ordem atual é servida por buscar_pagina (keyset) em vez de cursor"""
+        return False
+    
+    def buscar_pagina(self, ultima_linha):
+        """Página seguinte à última linha carregada (subclasses com keyset); sem keyset, nenhuma"""
+        return []
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        # Um lote de cada vez: o próximo só é pedido depois que o anterior chegou
+        return not parent.isValid() and self._mais_linhas and not self._buscando
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        
+        leitor = self._leitor
+        ultima_linha = self._linhas[-1] if self._linhas else None
+        if leitor is not None:
+            funcao = lambda: (leitor,) + leitor.ler(self.TAMANHO_LOTE)
+        else:
+            funcao = lambda: self._ler_pagina(ultima_linha)
+        self._pedir_lote(funcao, self._acrescentar_lote)
+    
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Ordenar no banco pela coluna clicada"""
+        direcao = 'DESC' if order == Qt.SortOrder.DescendingOrder else 'ASC'
+        self._ordem = f"{self.colunas[column][1]} {direcao}, {self.desempate} {direcao}"
+        if self._consulta is not None:
+            self.recarregar()
+    
+    def definir_consulta(self, consulta):
+        """Exibir o resultado de uma consulta composta do modelo (models.base.Consulta)"""
+        self._consulta = consulta
+        self.recarregar()
+    
+    def recarregar(self):
+        """Reabrir a consulta com a ordem atual; o primeiro lote é lido no pool"""
+        self.beginResetModel()
+        self._fechar_cursor()
+        self._linhas = []
+        self._mais_linhas = False
+        self.endResetModel()
+        
+        if self.paginar_por_chave():
+            funcao = lambda: self._ler_pagina(None)
+        else:
+            # SELECT base da consulta: pode ser o histórico com as movimentações arquivadas
+            where, params = self._consulta.where()
+            query = self._consulta.sql + where
+            if self._ordem:
+                query += f" ORDER BY {self._ordem}"
+            funcao = lambda: self._abrir_cursor(query, params)
+        
+        # Um pedido novo descarta o anterior (filtro digitado, outra coluna clicada)
+        self._pedir_lote(funcao, self._exibir_primeiro_lote)
+    
+    def linha(self, row):
+        """Registro da linha como dicionário"""
+        if 0 <= row < len(self._linhas):
+            return dict(self._linhas[row])
+        return None
+    
+    def fechar(self):
+        """Descartar o pedido pendente e liberar o cursor aberto"""
+        self.data_service.cancelar('tabela')
+        self._buscando = False
+        self._fechar_cursor()
+    
+    def _pedir_lote(self, funcao, ao_concluir):
+        """Executar a leitura de um lote no pool"""
+        self._buscando = True
+        self.data_service.executar('tabela', funcao, ao_concluir, self._on_erro)
+    
+    def _abrir_cursor(self, query, params):
+        """(Pool) Abrir o cursor e ler o primeiro lote"""
+        leitor = _LeitorCursor(self.db_manager.abrir_cursor(query, params))
+        try:
+            return (leitor,) + leitor.ler(self.TAMANHO_LOTE)
+        except Exception:
+            leitor.fechar()
+            raise
+    
+    def _ler_pagina(self, ultima_linha):
+        """(Pool) Página por chave a partir da última linha"""
+        linhas = self.buscar_pagina(ultima_linha)
+        return None, linhas, len(linhas) == self.TAMANHO_LOTE
+    
+    def _exibir_primeiro_lote(self, resultado):
+        """Trocar o conteúdo da tabela pelo primeiro lote"""
+        self.beginResetModel()
+        self._receber_lote(resultado)
+        self.endResetModel()
+    
+    def _acrescentar_lote(self, resultado):
+        """Acrescentar um lote ao fim da tabela"""
+        inicio = len(self._linhas)
+        linhas = resultado[1]
+        if linhas:
+            self.beginInsertRows(QModelIndex(), inicio, inicio + len(linhas) - 1)
+        self._receber_lote(resultado)
+        if linhas:
+            self.endInsertRows()
+    
+    def _receber_lote(self, resultado):
+        """Guardar as linhas do lote; o cursor esgotado já foi fechado pelo leitor"""
+        leitor, linhas, mais_linhas = resultado
+        self._linhas.extend(linhas)
+        self._leitor = leitor if mais_linhas else None
+        self._mais_linhas = mais_linhas
+        self._buscando = False
+    
+    def _on_erro(self, mensagem):
+        """Parar de buscar lotes e avisar a janela"""
+        self._buscando = False
+        self._mais_linhas = False
+        self._fechar_cursor()
+        self.falhou.emit(mensagem)
+    
+    def _fechar_cursor(self):
+        """Fechar o cursor e sua conexão"""
+        if self._leitor is not None:
+            self._leitor.fechar()
+            self._leitor = None
+
+class ProdutosTableModel(SQLTableModel):
+    """Produtos com categoria e fornecedor (consulta de Produto.filtrar)"""
+    
+    colunas = [
+        ('Código', 'p.codigo', 'codigo', None),
+        ('Nome', 'p.nome', 'nome', None),
+        ('Categoria', 'c.nome', 'categoria_nome', None),
+        ('Fornecedor', 'f.nome', 'fornecedor_nome', None),
+        ('Preço Compra', 'p.preco_compra', 'preco_compra', formatar_moeda),
+        ('Preço Venda', 'p.preco_venda', 'preco_venda', formatar_moeda),
+        ('Estoque Atual', 'p.estoque_atual', 'estoque_atual', None),
+        ('Estoque Mínimo', 'p.estoque_minimo', 'estoque_minimo', None),
+        ('Unidade', 'p.unidade', 'unidade', None),
+        ('Localização', 'p.localizacao', 'localizacao', None),
+    ]
+    ordem_padrao = 'p.nome, p.id'
+    desempate = 'p.id'
+    
+    def cor_linha(self, linha):
+        """Destacar produtos com estoque baixo"""
+        if linha['estoque_atual'] <= linha['estoque_minimo']:
+            return QColor(Qt.GlobalColor.yellow)
+        return None
+
+class MovimentacoesTableModel(SQLTableModel):
+    """Histórico de movimentações (consulta de Movimentacao.filtrar)"""
+    
+    colunas = [
+        ('Data', 'm.data_movimentacao', 'data_movimentacao', formatar_data),
+        ('Produto', 'p.nome', 'produto_nome', None),
+        ('Código', 'p.codigo', 'produto_codigo', None),
+        ('Tipo', 'm.tipo', 'tipo', lambda tipo: (tipo or '').title()),
+        ('Quantidade', 'm.quantidade', 'quantidade', None),
+        ('Preço Unit.', 'm.preco_unitario', 'preco_unitario', formatar_moeda),
+        ('Valor Total', 'm.valor_total', 'valor_total', formatar_moeda),
+        ('Motivo', 'm.motivo', 'motivo', None),
+        ('Usuário', 'm.usuario', 'usuario', None),
+    ]
+    # Percorre o índice de data_movimentacao: a primeira página sai sem ordenar a tabela
+    ordem_padrao = 'm.data_movimentacao DESC, m.id DESC'
+    desempate = 'm.id'
+    
+    def paginar_por_chave(self):
+        """Na ordem do histórico, páginas por (data_movimentacao, id) sem cursor aberto"""
+        return self._ordem == self._consulta.model.ORDEM_HISTORICO
+    
+    def buscar_pagina(self, ultima_linha):
+        """Próxima página do histórico a partir da última linha"""
+        model = self._consulta.model
+        cursor = model.cursor_pagina(ultima_linha) if ultima_linha else None
+        return model.page_after(cursor, self.TAMANHO_LOTE, self._consulta)
+    
+    def cor_linha(self, linha):
+        """Colorir por tipo"""
+        if linha['tipo'] == 'entrada':
+            return QColor(200, 255, 200)  # Verde claro para entrada
+        return QColor(255, 200, 200)  # Rosa claro para saída
\ No newline at end of file
@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+"""
+Tarefas executadas fora da thread da interface
+"""
+
+from PyQt6.QtCore import QObject, QThread, QTimer, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtWidgets import QProgressBar
+from config.settings import BACKUP_CONFIG, EXPORT_CONFIG
+from utils.backup import BackupManager
+from utils.export import ExportacaoCancelada
+from datetime import datetime
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BackupWorker(QThread):
+    """Thread que cria o backup do banco sem bloquear a interface"""
+    
+    progresso = pyqtSignal(int, int)  # páginas copiadas, total de páginas
+    concluido = pyqtSignal(object)    # entrada do catálogo de backups
+    erro = pyqtSignal(str)
+    
+    def __init__(self, parent=None, manual=False):
+        super().__init__(parent)
+        self.manual = manual
+    
+    def run(self):
+        """Executar o backup em passos, emitindo o progresso"""
+        try:
+            # As conexões do backup são abertas nesta thread
+            entrada = BackupManager().executar_backup(
+                progresso=lambda copiadas, total: self.progresso.emit(copiadas, total),
+                manual=self.manual
+            )
+            self.concluido.emit(entrada)
+        except Exception as e:
+            logger.error(f"Erro no backup em segundo plano: {e}")
+            self.erro.emit(str(e))
+
+class BackupScheduler(QObject):
+    """Agenda backups automáticos conforme BACKUP_CONFIG e executa os manuais"""
+    
+    iniciado = pyqtSignal(bool)           # manual
+    progresso = pyqtSignal(int, int)
+    concluido = pyqtSignal(object, bool)  # entrada do catálogo, manual
+    erro = pyqtSignal(str, bool)          # mensagem, manual
+    
+    INTERVALO_VERIFICACAO = 10 * 60 * 1000  # 10 minutos
+    ATRASO_INICIAL = 60 * 1000  # primeira verificação após 1 minuto
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.backup_manager = BackupManager()
+        self.worker = None
+        self.manual = False
+        
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.verificar)
+    
+    def iniciar(self):
+        """Iniciar o agendamento de backups automáticos"""
+        if not BACKUP_CONFIG.get('auto_backup', False):
+            return
+        
+        self.timer.start(self.INTERVALO_VERIFICACAO)
+        QTimer.singleShot(self.ATRASO_INICIAL, self.verificar)
+        logger.info(f"Backup automático a cada {BACKUP_CONFIG.get('backup_interval', 24)}h")
+    
+    def em_andamento(self):
+        """Verificar se há um backup sendo executado"""
+        return self.worker is not None and self.worker.isRunning()
+    
+    def verificar(self):
+        """Executar backup automático se o intervalo configurado já passou"""
+        try:
+            if not self.em_andamento() and self.backup_manager.backup_pendente():
+                self.executar(manual=False)
+        except Exception as e:
+            logger.error(f"Erro ao verificar backup automático: {e}")
+    
+    def executar_agora(self):
+        """Executar um backup manual"""
+        return self.executar(manual=True)
+    
+    def executar(self, manual):
+        """Disparar o backup em uma thread de trabalho"""
+        if self.em_andamento():
+            return False
+        
+        self.manual = manual
+        self.worker = BackupWorker(self, manual)
+        self.worker.progresso.connect(self.progresso)
+        self.worker.concluido.connect(lambda entrada: self.concluido.emit(entrada, self.manual))
+        self.worker.erro.connect(lambda mensagem: self.erro.emit(mensagem, self.manual))
+        self.worker.start()
+        
+        self.iniciado.emit(manual)
+        return True
+    
+    def aguardar(self):
+        """Aguardar o término de um backup em andamento"""
+        self.timer.stop()
+        if self.em_andamento():
+            self.worker.wait()
+
+class _SinaisTarefa(QObject):
+    """Sinais de uma tarefa do pool (QRunnable não é QObject)"""
+    
+    concluido = pyqtSignal(str, int, object)  # chave, geração, resultado
+    erro = pyqtSignal(str, int, str)          # chave, geração, mensagem
+
+class TarefaDados(QRunnable):
+    """Executa uma consulta em uma thread do pool"""
+    
+    def __init__(self, chave, geracao, funcao):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.chave = chave
+        self.geracao = geracao
+        self.funcao = funcao
+        self.sinais = _SinaisTarefa()
+    
+    def run(self):
+        """Executar a função e devolver o resultado por sinal"""
+        try:
+            resultado = self.funcao()
+        except Exception as e:
+            logger.error(f"Erro na tarefa '{self.chave}': {e}")
+            self.sinais.erro.emit(self.chave, self.geracao, str(e))
+            return
+        self.sinais.concluido.emit(self.chave, self.geracao, resultado)
+
+class DataService(QObject):
+    """Executa consultas dos modelos fora da thread da interface"""
+    
+    # Cada pedido tem uma chave; um novo pedido com a mesma chave torna o
+    # anterior obsoleto e o resultado que chegar dele é descartado
+    ocupado = pyqtSignal(bool)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool.globalInstance()
+        self._geracoes = {}
+        self._pendentes = {}       # chave -> (geração, ao_concluir, ao_falhar)
+        self._em_execucao = set()  # tarefas vivas até devolverem o sinal
+    
+    def executar(self, chave, funcao, ao_concluir, ao_falhar=None):
+        """Agendar funcao(); ao_concluir(resultado) roda na thread da interface"""
+        ocioso = not self._pendentes
+        self._descartar(chave)
+        
+        geracao = self._geracoes.get(chave, 0) + 1
+        self._geracoes[chave] = geracao
+        
+        tarefa = TarefaDados(chave, geracao, funcao)
+        tarefa.sinais.concluido.connect(self._on_concluido)
+        tarefa.sinais.erro.connect(self._on_erro)
+        
+        self._em_execucao.add(tarefa)
+        self._pendentes[chave] = (geracao, ao_concluir, ao_falhar)
+        self.pool.start(tarefa)
+        
+        if ocioso:
+            self.ocupado.emit(True)
+    
+    def cancelar(self, chave):
+        """Descartar o pedido pendente com a chave informada"""
+        if self._descartar(chave) and not self._pendentes:
+            self.ocupado.emit(False)
+    
+    def cancelar_todos(self):
+        """Descartar todos os pedidos pendentes"""
+        for chave in list(self._pendentes):
+            self.cancelar(chave)
+    
+    def em_andamento(self, chave=None):
+        """Verificar se há pedidos pendentes (de uma chave ou de qualquer uma)"""
+        return chave in self._pendentes if chave else bool(self._pendentes)
+    
+    def _descartar(self, chave):
+        """Tornar obsoleto o pedido pendente da chave"""
+        if self._pendentes.pop(chave, None) is None:
+            return False
+        
+        # Se ainda estiver na fila, a tarefa nem chega a executar
+        for tarefa in list(self._em_execucao):
+            if tarefa.chave == chave and self.pool.tryTake(tarefa):
+                self._em_execucao.discard(tarefa)
+        return True
+    
+    def _finalizar(self, chave, geracao):
+        """Liberar a tarefa e retornar os callbacks se o pedido ainda vale"""
+        self._em_execucao = {
+            t for t in self._em_execucao if (t.chave, t.geracao) != (chave, geracao)
+        }
+        
+        pendente = self._pendentes.get(chave)
+        if pendente is None or pendente[0] != geracao:
+            return None
+        
+        del self._pendentes[chave]
+        if not self._pendentes:
+            self.ocupado.emit(False)
+        return pendente
+    
+    def _on_concluido(self, chave, geracao, resultado):
+        """Entregar resultado de um pedido ainda válido"""
+        pendente = self._finalizar(chave, geracao)
+        if pendente:
+            pendente[1](resultado)
+    
+    def _on_erro(self, chave, geracao, mensagem):
+        """Entregar erro de um pedido ainda válido"""
+        pendente = self._finalizar(chave, geracao)
+        if pendente and pendente[2]:
+            pendente[2](mensagem)
+
+def criar_indicador_ocupado(data_service):
+    """Barra de progresso indeterminada visível enquanto o serviço trabalha"""
+    indicador = QProgressBar()
+    indicador.setRange(0, 0)
+    indicador.setTextVisible(False)
+    indicador.setMaximumHeight(8)
+    indicador.setVisible(False)
+    data_service.ocupado.connect(indicador.setVisible)
+    return indicador
+
+class _SinaisExportacao(QObject):
+    """Sinais de uma exportação do pool"""
+    
+    iniciado = pyqtSignal(int)
+    progresso = pyqtSignal(int, int, int)  # id, linhas, total (0 = desconhecido)
+    concluido = pyqtSignal(int, object)    # id, resultado
+    erro = pyqtSignal(int, str)
+    cancelado = pyqtSignal(int)
+
+class TarefaExportacao(QRunnable):
+    """Exportação executada em uma thread do pool"""
+    
+    def __init__(self, id_tarefa, funcao):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.id = id_tarefa
+        self.funcao = funcao
+        self.total = 0
+        self.sinais = _SinaisExportacao()
+        self._cancelada = threading.Event()
+    
+    def cancelar(self):
+        """Pedir o cancelamento (atendido no próximo aviso de progresso)"""
+        self._cancelada.set()
+    
+    def definir_total(self, total):
+        """Informar o total de linhas esperado"""
+        self.total = total or 0
+        self.sinais.progresso.emit(self.id, 0, self.total)
+    
+    def progresso(self, linhas):
+        """Callback de progresso passado ao ExportManager"""
+        if self._cancelada.is_set():
+            raise ExportacaoCancelada()
+        self.sinais.progresso.emit(self.id, linhas, self.total)
+    
+    def run(self):
+        """Executar funcao(tarefa) e devolver o resultado por sinal"""
+        if self._cancelada.is_set():
+            self.sinais.cancelado.emit(self.id)
+            return
+        
+        self.sinais.iniciado.emit(self.id)
+        try:
+            resultado = self.funcao(self)
+        except ExportacaoCancelada:
+            logger.info(f"Exportação {self.id} cancelada")
+            self.sinais.cancelado.emit(self.id)
+            return
+        except Exception as e:
+            logger.error(f"Erro na exportação {self.id}: {e}")
+            self.sinais.erro.emit(self.id, str(e))
+            return
+        self.sinais.concluido.emit(self.id, resultado)
+
+class FilaExportacoes(QObject):
+    """Fila de exportações com histórico, progresso por linha e cancelamento"""
+    
+    # Estados de um trabalho no histórico
+    NA_FILA = 'Na fila'
+    EXECUTANDO = 'Executando'
+    CONCLUIDO = 'Concluído'
+    ERRO = 'Erro'
+    CANCELADO = 'Cancelado'
+    
+    adicionado = pyqtSignal(int)
+    atualizado = pyqtSignal(int)
+    ocupado = pyqtSignal(bool)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Pool próprio: exportações longas não ocupam o pool das consultas
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(EXPORT_CONFIG.get('exportacoes_simultaneas', 2))
+        self._proximo_id = 1
+        self._trabalhos = {}  # id -> registro do histórico
+        self._tarefas = {}    # id -> tarefa ainda não finalizada
+        self._callbacks = {}  # id -> (ao_concluir, ao_falhar)
+    
+    def enfileirar(self, descricao, funcao, ao_concluir=None, ao_falhar=None):
+        """Agendar funcao(tarefa); deve retornar o arquivo gerado ou (arquivo, ...)"""
+        ocioso = not self._tarefas
+        id_tarefa = self._proximo_id
+        self._proximo_id += 1
+        
+        tarefa = TarefaExportacao(id_tarefa, funcao)
+        tarefa.sinais.iniciado.connect(self._on_iniciado)
+        tarefa.sinais.progresso.connect(self._on_progresso)
+        tarefa.sinais.concluido.connect(self._on_concluido)
+        tarefa.sinais.erro.connect(self._on_erro)
+        tarefa.sinais.cancelado.connect(self._on_cancelado)
+        
+        self._trabalhos[id_tarefa] = {
+            'id': id_tarefa,
+            'descricao': descricao,
+            'estado': self.NA_FILA,
+            'linhas': 0,
+            'total': 0,
+            'arquivo': None,
+            'mensagem': '',
+            'criado': datetime.now(),
+            'inicio': None,
+            'fim': None
+        }
+        self._tarefas[id_tarefa] = tarefa
+        self._callbacks[id_tarefa] = (ao_concluir, ao_falhar)
+        self.pool.start(tarefa)
+        
+        self.adicionado.emit(id_tarefa)
+        if ocioso:
+            self.ocupado.emit(True)
+        return id_tarefa
+    
+    def cancelar(self, id_tarefa):
+        """Cancelar um trabalho na fila ou em execução"""
+        tarefa = self._tarefas.get(id_tarefa)
+        if tarefa is None:
+            return False
+        
+        tarefa.cancelar()
+        # Ainda na fila: sai do pool sem executar
+        if self.pool.tryTake(tarefa):
+            self._on_cancelado(id_tarefa)
+        return True
+    
+    def cancelar_todos(self):
+        """Cancelar todos os trabalhos pendentes"""
+        for id_tarefa in list(self._tarefas):
+            self.cancelar(id_tarefa)
+    
+    def aguardar(self):
+        """Cancelar e aguardar as exportações em andamento"""
+        self.cancelar_todos()
+        self.pool.waitForDone()
+    
+    def trabalho(self, id_tarefa):
+        """Registro do histórico de um trabalho"""
+        return self._trabalhos.get(id_tarefa)
+    
+    def trabalhos(self):
+        """Histórico de trabalhos, do mais recente para o mais antigo"""
+        return sorted(self._trabalhos.values(), key=lambda t: t['id'], reverse=True)
+    
+    def em_andamento(self, id_tarefa=None):
+        """Verificar se há trabalhos pendentes (um específico ou qualquer um)"""
+        return id_tarefa in self._tarefas if id_tarefa else bool(self._tarefas)
+    
+    def limpar_finalizados(self):
+        """Remover do histórico os trabalhos que já terminaram"""
+        for id_tarefa in [i for i in self._trabalhos if i not in self._tarefas]:
+            del self._trabalhos[id_tarefa]
+    
+    def _on_iniciado(self, id_tarefa):
+        """Marcar o trabalho como em execução"""
+        trabalho = self._trabalhos[id_tarefa]
+        trabalho['estado'] = self.EXECUTANDO
+        trabalho['inicio'] = datetime.now()
+        self.atualizado.emit(id_tarefa)
+    
+    def _on_progresso(self, id_tarefa, linhas, total):
+        """Atualizar as linhas exportadas"""
+        trabalho = self._trabalhos[id_tarefa]
+        trabalho['linhas'] = linhas
+        trabalho['total'] = total
+        self.atualizado.emit(id_tarefa)
+    
+    def _on_concluido(self, id_tarefa, resultado):
+        """Registrar o arquivo gerado e chamar ao_concluir"""
+        # Arquivo gerado: o resultado ou o primeiro item dele
+        arquivo = resultado[0] if isinstance(resultado, tuple) else resultado
+        self._trabalhos[id_tarefa]['arquivo'] = arquivo
+        ao_concluir, _ = self._finalizar(id_tarefa, self.CONCLUIDO)
+        if ao_concluir:
+            ao_concluir(resultado)
+    
+    def _on_erro(self, id_tarefa, mensagem):
+        """Registrar o erro e chamar ao_falhar"""
+        self._trabalhos[id_tarefa]['mensagem'] = mensagem
+        _, ao_falhar = self._finalizar(id_tarefa, self.ERRO)
+        if ao_falhar:
+            ao_falhar(mensagem)
+    
+    def _on_cancelado(self, id_tarefa):
+        """Registrar o cancelamento"""
+        if id_tarefa in self._tarefas:
+            self._finalizar(id_tarefa, self.CANCELADO)
+    
+    def _finalizar(self, id_tarefa, estado):
+        """Fechar o registro do trabalho e retornar seus callbacks"""
+        self._tarefas.pop(id_tarefa, None)
+        trabalho = self._trabalhos[id_tarefa]
+        trabalho['estado'] = estado
+        trabalho['fim'] = datetime.now()
+        
+        self.atualizado.emit(id_tarefa)
+        if not self._tarefas:
+            self.ocupado.emit(False)
+        return self._callbacks.pop(id_tarefa, (None, None))
\ No newline at end of file
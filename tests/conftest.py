@@ -0,0 +1,17 @@
+"""
+Configuração dos testes: a raiz do projeto no caminho de importação e um diretório de dados vazio
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Executa o teste em um diretório temporário (os caminhos de config são relativos)"""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    return tmp_path
\ No newline at end of file
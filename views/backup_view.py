@@ -5,6 +5,7 @@ View de backup
 import customtkinter as ctk
 from views.base_view import BaseView
 from config import FONT_SIZES, COLORS
+from models.archive import ARCHIVE_HORIZON_MONTHS
 
 class BackupView(BaseView):
     """View de backup do sistema"""
@@ -58,6 +59,33 @@ class BackupView(BaseView):
             font=ctk.CTkFont(size=FONT_SIZES["button"])
         ).pack(side="left", padx=(10, 0), fill="x", expand=True)
         
+        # Seção de Arquivamento
+        archive_frame = ctk.CTkFrame(self.frame)
+        archive_frame.pack(fill="x", padx=20, pady=10)
+        
+        ctk.CTkLabel(
+            archive_frame,
+            text="Arquivar Movimentações",
+            font=ctk.CTkFont(size=FONT_SIZES["subheading"], weight="bold")
+        ).pack(pady=(20, 10))
+        
+        ctk.CTkLabel(
+            archive_frame,
+            text=f"Movimentações com mais de {ARCHIVE_HORIZON_MONTHS} meses vão para arquivos mensais compactados.\n"
+                 "Saldos em datas passadas e totais dos relatórios continuam com todo o histórico.\n"
+                 "O backup completo copia também o arquivo; o rápido inclui só as movimentações ativas.",
+            font=ctk.CTkFont(size=FONT_SIZES["text"]),
+            text_color="gray"
+        ).pack(pady=(0, 20))
+        
+        ctk.CTkButton(
+            archive_frame,
+            text="🗄️ Arquivar Movimentações Antigas",
+            command=self.archive_movements,
+            height=50,
+            font=ctk.CTkFont(size=FONT_SIZES["button"])
+        ).pack(fill="x", padx=20, pady=(0, 20))
+        
         # Seção de Configurações
         config_frame = ctk.CTkFrame(self.frame)
         config_frame.pack(fill="x", padx=20, pady=10)
@@ -92,7 +120,7 @@ class BackupView(BaseView):
         info_text = f"""
 Sistema funcionando normalmente
 Total de produtos: {len(self.manager.products)}
-Total de movimentações: {len(self.manager.movements)}
+Total de movimentações: {self.manager.partitions.count} (+ {self.manager.archive.count} arquivadas)
 Total de fornecedores: {len(self.manager.suppliers)}
 Total de categorias: {len(self.manager.categories)}
         """
@@ -155,7 +183,9 @@ Total de categorias: {len(self.manager.categories)}
                 "suppliers": self.manager.suppliers,
                 "categories": self.manager.categories,
                 "settings": self.manager.settings,
-                "backup_date": datetime.now().isoformat()
+                "backup_date": datetime.now().isoformat(),
+                # Só as movimentações ativas; as anteriores ao corte ficam em data/archive
+                "archive_cutoff": self.manager.archive.cutoff
             }
             
             # Salvar backup
@@ -167,6 +197,18 @@ Total de categorias: {len(self.manager.categories)}
         except Exception as e:
             self.show_message(f"Erro ao criar backup rápido: {str(e)}", "error")
     
+    def archive_movements(self):
+        """Arquivar movimentações antigas"""
+        try:
+            count = self.manager.archive_old_movements()
+            if count:
+                self.show_message(f"{count} movimentação(ões) arquivada(s) com sucesso!", "success")
+                self.refresh()
+            else:
+                self.show_message(f"Nenhuma movimentação com mais de {ARCHIVE_HORIZON_MONTHS} meses para arquivar.")
+        except Exception as e:
+            self.show_message(f"Erro ao arquivar movimentações: {str(e)}", "error")
+    
     def refresh(self):
         """Atualizar dados da view"""
         # Recriar widgets para atualizar informações
@@ -70,22 +70,16 @@ class DashboardView(BaseView):
     
     def calculate_stats(self):
         """Calcular estatísticas para o dashboard"""
-        total_products = len(self.manager.products)
-        total_value = self.manager.get_total_inventory_value()
-        low_stock_count = len(self.manager.get_low_stock_products())
+        stats = self.manager.reports.get_data()
         
         # Movimentações de hoje
-        today = datetime.now().date()
-        recent_movements = len([
-            m for m in self.manager.movements 
-            if datetime.fromisoformat(m['date']).date() == today
-        ])
+        today = self.manager.rollups.day(datetime.now().date())
         
         return {
-            'total_products': total_products,
-            'total_value': total_value,
-            'low_stock_count': low_stock_count,
-            'recent_movements': recent_movements
+            'total_products': stats['total_products'],
+            'total_value': stats['total_value'],
+            'low_stock_count': len(stats['low_stock']),
+            'recent_movements': today['entradas'] + today['saidas']
         }
     
     def load_recent_activities(self):
@@ -93,12 +87,8 @@ class DashboardView(BaseView):
         # Limpar lista
         self.activities_list.delete("1.0", "end")
         
-        # Obter movimentações recentes
-        recent_movements = sorted(
-            self.manager.movements, 
-            key=lambda x: x['date'], 
-            reverse=True
-        )[:10]
+        # Obter movimentações recentes (só as partições mais novas são lidas)
+        recent_movements = self.manager.partitions.recent(10)
         
         if not recent_movements:
             self.activities_list.insert("1.0", "Nenhuma atividade recente encontrada.")
@@ -140,14 +130,19 @@ class DashboardView(BaseView):
             low_stock = 0
             no_stock = 0
             
-            for product in self.manager.products:
-                quantity = product.get('quantity', 0)
-                min_stock = product.get('min_stock', 0)
-                
-                if quantity == 0:
-                    no_stock += 1
-                elif quantity <= min_stock:
-                    low_stock += 1
+            if self.manager.columnar is not None:
+                totals = self.manager.columnar.product_totals(0)
+                low_stock = totals['below_min_count']
+                no_stock = totals['out_of_stock_count']
+            else:
+                for product in self.manager.products:
+                    quantity = product.get('quantity', 0)
+                    min_stock = product.get('min_stock', 0)
+                    
+                    if quantity == 0:
+                        no_stock += 1
+                    elif quantity <= min_stock:
+                        low_stock += 1
             
             return {
                 'total_products': total_products,
@@ -4,7 +4,7 @@ View de movimentações de estoque
 
 import customtkinter as ctk
 from tkinter import ttk
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from views.base_view import BaseView
 from config import FONT_SIZES, COLORS
 
@@ -165,8 +165,8 @@ class MovementsView(BaseView):
             self.movements_tree.delete(item)
         
         try:
-            # Verificar se há movimentações
-            if not hasattr(self.manager, 'movements') or not self.manager.movements:
+            # Verificar se há movimentações (pelo manifesto, sem ler as partições)
+            if not self.manager.partitions.count:
                 print("Nenhuma movimentação encontrada")
                 # Adicionar linha indicando que não há dados
                 self.movements_tree.insert('', 'end', values=(
@@ -174,14 +174,16 @@ class MovementsView(BaseView):
                 ))
                 return
             
-            # Filtrar movimentações
-            movements = self.manager.movements.copy()
-            print(f"Total de movimentações: {len(movements)}")
+            print(f"Total de movimentações: {self.manager.partitions.count}")
             
-            # Filtrar por período primeiro
-            if filter_period and filter_period != "Todos":
+            # Filtrar por período primeiro: só as partições mensais do período são lidas
+            start = self.period_start(filter_period)
+            if start is not None:
+                movements = self.manager.partitions.between(start.isoformat())
                 movements = self.filter_movements_by_period(movements, filter_period)
                 print(f"Movimentações após filtro por período '{filter_period}': {len(movements)}")
+            else:
+                movements = self.manager.movements.copy()
             
             # Filtrar por tipo
             if filter_type and filter_type != "Todos":
@@ -254,6 +256,13 @@ class MovementsView(BaseView):
         self.filter_period_var.set("Todos")
         self.load_movements_data()
     
+    def period_start(self, period):
+        """Primeiro dia que o período do filtro alcança (None para todos)"""
+        days = {"Hoje": 0, "Última Semana": 7, "Último Mês": 30, "Último Ano": 365}.get(period)
+        if days is None:
+            return None
+        return date.today() - timedelta(days=days)
+    
     def filter_movements_by_period(self, movements, period):
         """Filtrar movimentações por período"""
         if period == "Todos":
@@ -308,15 +317,14 @@ class MovementsView(BaseView):
             self.show_message(f"Erro ao filtrar movimentações: {e}", "error")
     
     def calculate_movements_stats(self):
-        """Calcular estatísticas das movimentações"""
-        total = len(self.manager.movements)
-        entradas = len([m for m in self.manager.movements if m['type'] == 'entrada'])
-        saidas = len([m for m in self.manager.movements if m['type'] == 'saída'])
+        """Calcular estatísticas das movimentações (a partir dos totais mensais)"""
+        # Totais de todo o histórico: ativas e arquivadas, como entradas e saídas
+        totals = self.manager.rollups.totals()
         
         return {
-            'total': total,
-            'entradas': entradas,
-            'saidas': saidas
+            'total': self.manager.archive.count + self.manager.partitions.count,
+            'entradas': totals['entradas'],
+            'saidas': totals['saidas']
         }
     
     def refresh(self):
@@ -3,9 +3,16 @@ View de relatórios
 """
 
 import customtkinter as ctk
+from datetime import date, datetime
 from views.base_view import BaseView
 from config import FONT_SIZES, COLORS
 
+# Linhas listadas no relatório de curva ABC (o resumo cobre todos os produtos)
+ANALYTICS_REPORT_ROWS = 50
+
+# Itens listados por fornecedor na sugestão de compras (os totais cobrem todos)
+REPLENISHMENT_REPORT_ROWS = 20
+
 class ReportsView(BaseView):
     """View de relatórios do sistema"""
     
@@ -31,7 +38,10 @@ class ReportsView(BaseView):
             ("💰 Relatório Financeiro", "Valores e custos dos produtos", self.generate_financial_report),
             ("🏢 Relatório de Fornecedores", "Análise de fornecedores", self.generate_suppliers_report),
             ("🏷️ Relatório por Categorias", "Produtos agrupados por categoria", self.generate_categories_report),
-            ("⚠️ Produtos com Estoque Baixo", "Itens que precisam de reposição", self.generate_low_stock_report)
+            ("⚠️ Produtos com Estoque Baixo", "Itens que precisam de reposição", self.generate_low_stock_report),
+            ("🔤 Curva ABC e Giro", "Classes ABC, giro, cobertura e estoque parado", self.generate_analytics_report),
+            ("🛒 Sugestão de Compras", "Previsão de demanda e pedidos por fornecedor", self.generate_replenishment_report),
+            ("📅 Estoque em Data", "Saldo de cada produto em uma data passada", self.generate_stock_at_report)
         ]
         
         # Criar cards em duas colunas usando pack
@@ -74,26 +84,28 @@ class ReportsView(BaseView):
     
     def show_general_summary(self):
         """Mostrar resumo geral"""
-        stats = self.manager.get_dashboard_stats()
+        stats = self.manager.reports.get_data()
+        low_stock_count = len(stats['low_stock'])
+        movements_today = self.manager.reports.count_movements_since(date.today())
         
         summary = f"""
 RESUMO GERAL DO ESTOQUE
 
 Total de Produtos: {stats['total_products']}
 Valor Total: R$ {stats['total_value']:,.2f}
-Produtos em Falta: {stats['low_stock_count']}
-Movimentações Hoje: {stats['recent_movements']}
+Produtos em Falta: {low_stock_count}
+Movimentações Hoje: {movements_today}
 
 Produtos por Status:
-- Normal: {stats['total_products'] - stats['low_stock_count']}
-- Estoque Baixo: {stats['low_stock_count']}
+- Normal: {stats['total_products'] - low_stock_count}
+- Estoque Baixo: {low_stock_count}
 """
         
         self.show_report_dialog("Resumo Geral", summary)
     
     def show_low_stock(self):
         """Mostrar produtos com estoque baixo"""
-        low_stock_products = self.manager.get_low_stock_products()
+        low_stock_products = self.manager.reports.get_data()['low_stock']
         
         if not low_stock_products:
             self.show_message("Não há produtos com estoque baixo!", "info")
@@ -107,17 +119,12 @@ Produtos por Status:
     
     def show_inventory_value(self):
         """Mostrar relatório de valor do estoque"""
-        total_value = self.manager.get_total_inventory_value()
-        products_by_value = sorted(
-            self.manager.products,
-            key=lambda p: p['price'] * p['quantity'],
-            reverse=True
-        )[:10]
-        
-        report = f"VALOR DO ESTOQUE\n\nValor Total: R$ {total_value:,.2f}\n\n"
+        stats = self.manager.reports.get_data()
+        
+        report = f"VALOR DO ESTOQUE\n\nValor Total: R$ {stats['total_value']:,.2f}\n\n"
         report += "TOP 10 PRODUTOS POR VALOR:\n"
         
-        for product in products_by_value:
+        for product in stats['top_products']:
             value = product['price'] * product['quantity']
             report += f"• {product['name']} - R$ {value:,.2f}\n"
         
@@ -125,64 +132,141 @@ Produtos por Status:
     
     def show_movements_report(self):
         """Mostrar relatório de movimentações"""
-        movements = self.manager.movements
-        entradas = len([m for m in movements if m['type'] == 'entrada'])
-        saidas = len([m for m in movements if m['type'] == 'saída'])
+        stats = self.manager.reports.get_data()
         
         report = f"""
 RELATÓRIO DE MOVIMENTAÇÕES
 
-Total de Movimentações: {len(movements)}
-Entradas: {entradas}
-Saídas: {saidas}
+Total de Movimentações: {stats['total_movements']}
+Entradas: {stats['by_type'].get('entrada', 0)}
+Saídas: {stats['by_type'].get('saida', 0)}
 
 Últimas 10 Movimentações:
 """
         
-        recent_movements = sorted(movements, key=lambda x: x['date'], reverse=True)[:10]
-        for movement in recent_movements:
-            product = self.manager.get_product(movement['product_code'])
-            product_name = product['name'] if product else "Produto não encontrado"
+        for movement in stats['recent_movements'][:10]:
+            product_name = stats['product_names'].get(movement['product_code'], "Produto não encontrado")
             report += f"• {movement['type'].title()} - {product_name} (Qtd: {movement['quantity']})\n"
         
         self.show_report_dialog("Movimentações", report)
     
     def show_category_report(self):
         """Mostrar relatório por categoria"""
-        categories_stats = {}
-        
-        for product in self.manager.products:
-            category = product.get('category', 'Sem Categoria')
-            if category not in categories_stats:
-                categories_stats[category] = {'count': 0, 'value': 0}
-            
-            categories_stats[category]['count'] += 1
-            categories_stats[category]['value'] += product['price'] * product['quantity']
+        categories_stats = self.manager.reports.get_data()['categories']
         
         report = "RELATÓRIO POR CATEGORIA\n\n"
         for category, stats in categories_stats.items():
-            report += f"• {category}: {stats['count']} produtos - R$ {stats['value']:,.2f}\n"
+            report += f"• {category or 'Sem Categoria'}: {stats['count']} produtos - R$ {stats['value']:,.2f}\n"
         
         self.show_report_dialog("Por Categoria", report)
     
     def show_supplier_report(self):
         """Mostrar relatório por fornecedor"""
-        suppliers_stats = {}
-        
-        for product in self.manager.products:
-            supplier = product.get('supplier', 'Sem Fornecedor')
-            if supplier not in suppliers_stats:
-                suppliers_stats[supplier] = {'count': 0, 'value': 0}
-            
-            suppliers_stats[supplier]['count'] += 1
-            suppliers_stats[supplier]['value'] += product['price'] * product['quantity']
+        suppliers_stats = self.manager.reports.get_data()['suppliers']
         
         report = "RELATÓRIO POR FORNECEDOR\n\n"
         for supplier, stats in suppliers_stats.items():
-            report += f"• {supplier}: {stats['count']} produtos - R$ {stats['value']:,.2f}\n"
+            report += f"• {supplier or 'Sem Fornecedor'}: {stats['count']} produtos - R$ {stats['value']:,.2f}\n"
         
         self.show_report_dialog("Por Fornecedor", report)
     
+    def show_analytics_report(self):
+        """Mostrar curva ABC, giro, dias de cobertura e estoque parado"""
+        analytics = self.manager.reports.get_stock_analytics()
+        total_value = analytics['total_consumption_value']
+        
+        report = f"CURVA ABC E GIRO DO ESTOQUE (últimos {analytics['period_days']} dias)\n\n"
+        
+        for abc, totals in analytics['classes'].items():
+            share = totals['consumption_value'] / total_value * 100 if total_value else 0
+            report += (
+                f"Classe {abc}: {totals['count']} produtos - "
+                f"R$ {totals['consumption_value']:,.2f} consumidos ({share:.1f}%)\n"
+            )
+        
+        report += (
+            f"\nEstoque parado: {len(analytics['dead_stock'])} produtos - "
+            f"R$ {analytics['dead_stock_value']:,.2f}\n\n"
+        )
+        
+        report += f"{'Cl':<3}{'Código':<10}{'Produto':<24}{'Consumo':>9}{'Giro':>7}{'Cobertura':>11}{'Sem saída':>11}\n"
+        for item in analytics['items'][:ANALYTICS_REPORT_ROWS]:
+            turnover = f"{item['turnover']:.1f}" if item['turnover'] is not None else "-"
+            cover = f"{item['days_of_cover']:.0f} d" if item['days_of_cover'] is not None else "-"
+            idle = f"{item['days_without_exit']} d" if item['days_without_exit'] is not None else "-"
+            report += (
+                f"{item['abc_class']:<3}{item['code'][:9]:<10}{item['name'][:23]:<24}"
+                f"{item['consumption']:>9}{turnover:>7}{cover:>11}{idle:>11}\n"
+            )
+        
+        remaining = len(analytics['items']) - ANALYTICS_REPORT_ROWS
+        if remaining > 0:
+            report += f"... e mais {remaining} produtos\n"
+        
+        if analytics['dead_stock']:
+            report += "\nESTOQUE PARADO (maior valor primeiro):\n"
+            for item in analytics['dead_stock'][:ANALYTICS_REPORT_ROWS]:
+                report += (
+                    f"• {item['name']} ({item['code']}) - {item['days_without_exit']} dias sem saída - "
+                    f"R$ {item['stock_value']:,.2f}\n"
+                )
+        
+        self.show_report_dialog("Curva ABC e Giro", report)
+    
+    def show_replenishment_report(self):
+        """Mostrar ponto de pedido e quantidade sugerida, agrupados por fornecedor"""
+        replenishment = self.manager.reports.get_replenishment()
+        
+        report = f"SUGESTÃO DE COMPRAS (demanda dos últimos {replenishment['history_days']} dias)\n\n"
+        
+        if not replenishment['suggestions']:
+            report += "Nenhum produto abaixo do ponto de pedido.\n"
+        
+        for supplier, order in replenishment['suppliers'].items():
+            report += (
+                f"{supplier or 'Sem fornecedor'}: {len(order['items'])} itens, "
+                f"{order['quantity']} unidades - R$ {order['value']:,.2f}\n"
+            )
+            report += f"  {'Código':<10}{'Produto':<24}{'Estoque':>8}{'Previsão/d':>11}{'Ponto':>7}{'Comprar':>9}\n"
+            for item in order['items'][:REPLENISHMENT_REPORT_ROWS]:
+                report += (
+                    f"  {item['code'][:9]:<10}{item['name'][:23]:<24}{item['quantity']:>8}"
+                    f"{item['smoothed_demand']:>11.2f}{item['reorder_point']:>7}{item['order_quantity']:>9}\n"
+                )
+            
+            remaining = len(order['items']) - REPLENISHMENT_REPORT_ROWS
+            if remaining > 0:
+                report += f"  ... e mais {remaining} produtos\n"
+            report += "\n"
+        
+        report += f"Valor total dos pedidos: R$ {replenishment['total_order_value']:,.2f}\n"
+        
+        self.show_report_dialog("Sugestão de Compras", report)
+    
+    def show_stock_at_report(self, day):
+        """Mostrar o saldo de cada produto no fim de um dia passado"""
+        balances = self.manager.get_stock_at(day)
+        products = {p['code']: p for p in self.manager.products}
+        
+        total_items = sum(balances.values())
+        total_value = sum(
+            quantity * products[code]['price'] for code, quantity in balances.items() if code in products
+        )
+        
+        report = f"ESTOQUE EM {day.strftime('%d/%m/%Y')} (fim do dia)\n\n"
+        report += f"Produtos com saldo: {len(balances)}\n"
+        report += f"Total de itens: {total_items}\n"
+        report += f"Valor (preços atuais): R$ {total_value:,.2f}\n\n"
+        
+        report += f"{'Código':<10}{'Produto':<28}{'Saldo':>8}{'Atual':>8}\n"
+        for code in sorted(balances):
+            product = products.get(code)
+            name = product['name'] if product else "(produto excluído)"
+            current = product['quantity'] if product else 0
+            report += f"{code[:9]:<10}{name[:27]:<28}{balances[code]:>8}{current:>8}\n"
+        
+        self.show_report_dialog("Estoque em Data", report)
+    
     def show_report_dialog(self, title, content):
         """Mostrar diálogo com relatório"""
         dialog = ctk.CTkToplevel(self.parent)
@@ -231,4 +315,27 @@ Saídas: {saidas}
 
     def generate_low_stock_report(self):
         """Gerar relatório de estoque baixo"""
-        self.show_low_stock() 
\ No newline at end of file
+        self.show_low_stock()
+
+    def generate_analytics_report(self):
+        """Gerar relatório de curva ABC e giro"""
+        self.show_analytics_report()
+
+    def generate_replenishment_report(self):
+        """Gerar sugestão de compras por fornecedor"""
+        self.show_replenishment_report()
+
+    def generate_stock_at_report(self):
+        """Pedir a data e gerar o relatório de estoque em data"""
+        dialog = ctk.CTkInputDialog(text="Data (DD/MM/AAAA):", title="Estoque em Data")
+        value = dialog.get_input()
+        if not value:
+            return
+        
+        try:
+            day = datetime.strptime(value.strip(), '%d/%m/%Y').date()
+        except ValueError:
+            self.show_message("Data inválida. Use o formato DD/MM/AAAA.", "error")
+            return
+        
+        self.show_stock_at_report(day) 
\ No newline at end of file